@@ -1,23 +1,134 @@
+import contextlib
+import csv
+import os
+from array import array
+from collections import Counter, deque
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+
+class TablaCodificacion:
+    """
+    Codificación por diccionario de cadenas repetidas (autores, categorías).
+    Cada cadena distinta se interna una sola vez y recibe un ID entero; los libros
+    guardan solo ese ID, de modo que miles de libros comparten la misma cadena.
+    """
+
+    __slots__ = ("_ids", "_valores")
+
+    def __init__(self):
+        self._ids = {}  # Clave: cadena, Valor: ID entero
+        self._valores = []  # Índice: ID, Valor: cadena internada
+
+    def codificar(self, valor: str) -> int:
+        """Retorna el ID de la cadena, registrándola si es nueva."""
+        id_valor = self._ids.get(valor)
+        if id_valor is None:
+            id_valor = len(self._valores)
+            valor = sys.intern(valor)
+            self._ids[valor] = id_valor
+            self._valores.append(valor)
+        return id_valor
+
+    def buscar_id(self, valor: str):
+        """Retorna el ID de la cadena o None si nunca se ha registrado."""
+        return self._ids.get(valor)
+
+    def decodificar(self, id_valor: int) -> str:
+        """Retorna la cadena asociada a un ID."""
+        return self._valores[id_valor]
+
+    def __len__(self):
+        return len(self._valores)
+
+
+# Tablas compartidas por todos los libros
+AUTORES = TablaCodificacion()
+CATEGORIAS = TablaCodificacion()
+
+# Bits del campo de estado compacto de Libro
+_BIT_PRESTADO = 1
+
+
+class _SalidaNula:
+    """Destino de print que descarta el texto (benchmarks y reconstrucción desde disco)."""
+
+    def write(self, texto):
+        return len(texto)
+
+    def flush(self):
+        pass
+
+
 # Definimos la clase Libro
 class Libro:
     """
     Representa un libro en la biblioteca.
-    Los atributos inmutables (título y autor) se almacenan en una tupla.
+    Los atributos inmutables (título y autor) se exponen como una tupla.
+    Internamente usa __slots__, IDs de autor/categoría y un campo de bits para
+    el estado de préstamo, sin cambiar los atributos públicos.
     """
 
+    __slots__ = ("_titulo", "_autor_id", "_categoria_id", "_estado", "isbn")
+
     def __init__(self, titulo: str, autor: str, categoria: str, isbn: str):
-        # Usamos una tupla para el título y el autor, ya que son inmutables
+        # El título y el autor se exponen como tupla, ya que son inmutables
         self.info_basica = (titulo, autor)
         self.categoria = categoria
         self.isbn = isbn
         # Atributo para controlar el estado de préstamo del libro
+        self._estado = 0
         self.prestado = False
 
+    @classmethod
+    def _desde_codigos(cls, titulo: str, autor_id: int, categoria_id: int, isbn: str):
+        """Crea un libro disponible a partir de IDs ya codificados (carga desde disco)."""
+        libro = cls.__new__(cls)
+        libro._titulo = titulo
+        libro._autor_id = autor_id
+        libro._categoria_id = categoria_id
+        libro._estado = 0
+        libro.isbn = isbn
+        return libro
+
+    @property
+    def info_basica(self):
+        """Tupla (título, autor) reconstruida a partir de la representación compacta."""
+        return self._titulo, AUTORES.decodificar(self._autor_id)
+
+    @info_basica.setter
+    def info_basica(self, valor):
+        titulo, autor = valor
+        self._titulo = titulo
+        self._autor_id = AUTORES.codificar(autor)
+
+    @property
+    def categoria(self):
+        return CATEGORIAS.decodificar(self._categoria_id)
+
+    @categoria.setter
+    def categoria(self, valor: str):
+        self._categoria_id = CATEGORIAS.codificar(valor)
+
+    @property
+    def prestado(self):
+        return bool(self._estado & _BIT_PRESTADO)
+
+    @prestado.setter
+    def prestado(self, valor: bool):
+        if valor:
+            self._estado |= _BIT_PRESTADO
+        else:
+            self._estado &= ~_BIT_PRESTADO
+
     def __str__(self):
         """
         Método de cadena para una representación legible del objeto Libro.
         """
-        return f"'{self.info_basica[0]}' por {self.info_basica[1]} (ISBN: {self.isbn})"
+        return f"'{self._titulo}' por {AUTORES.decodificar(self._autor_id)} (ISBN: {self.isbn})"
 
 
 # Definimos la clase Usuario
@@ -27,6 +138,8 @@ class Usuario:
     Cada usuario tiene un ID único y una lista de los libros que ha tomado prestados.
     """
 
+    __slots__ = ("nombre", "id_usuario", "libros_prestados")
+
     def __init__(self, nombre: str, id_usuario: int):
         self.nombre = nombre
         self.id_usuario = id_usuario
@@ -39,6 +152,261 @@ class Usuario:
         return f"Usuario: {self.nombre} (ID: {self.id_usuario})"
 
 
+# Definimos los índices de facetas del catálogo
+class _FacetaCategoria:
+    """
+    Libros de una categoría con un mapa de bits de disponibilidad.
+    Cada libro ocupa una posición fija en 'libros'; el bit de esa posición en
+    'bits' (palabras de 64 bits) está a 1 mientras el libro esté disponible.
+    """
+
+    __slots__ = ("libros", "posiciones", "libres", "bits", "total", "disponibles")
+
+    def __init__(self):
+        self.libros = []  # Índice: posición, Valor: Libro (None si la posición está libre)
+        self.posiciones = {}  # Clave: ISBN, Valor: posición en 'libros'
+        self.libres = []  # Posiciones liberadas por quitar_libro, para reutilizarlas
+        self.bits = array("Q")
+        self.total = 0
+        self.disponibles = 0
+
+    def activar(self, posicion: int):
+        self.bits[posicion >> 6] |= 1 << (posicion & 63)
+
+    def desactivar(self, posicion: int):
+        self.bits[posicion >> 6] &= ~(1 << (posicion & 63)) & 0xFFFFFFFFFFFFFFFF
+
+
+class FacetasCatalogo:
+    """
+    Contadores de facetas (total/disponibles por categoría y por autor) y mapas
+    de bits de disponibilidad por categoría, mantenidos de forma incremental.
+    Las consultas de conteo son O(1) y el listado de disponibles de una categoría
+    recorre solo su mapa de bits, saltando palabras sin libros disponibles.
+    """
+
+    def __init__(self, bloqueo=None):
+        self._categorias = {}  # Clave: ID de categoría, Valor: _FacetaCategoria
+        self._autores = {}  # Clave: ID de autor, Valor: [total, disponibles]
+        # Bloqueo opcional para la variante concurrente de Biblioteca
+        self._bloqueo = bloqueo or contextlib.nullcontext()
+
+    def agregar(self, libro: Libro):
+        """Registra un libro nuevo en las facetas."""
+        self.agregar_lote((libro,))
+
+    def agregar_lote(self, libros):
+        """Igual que agregar, para varios libros con un solo bloqueo (carga inicial)."""
+        categorias = self._categorias
+        autores = self._autores
+        with self._bloqueo:
+            for libro in libros:
+                faceta = categorias.get(libro._categoria_id)
+                if faceta is None:
+                    faceta = categorias[libro._categoria_id] = _FacetaCategoria()
+                if faceta.libres:
+                    posicion = faceta.libres.pop()
+                    faceta.libros[posicion] = libro
+                else:
+                    posicion = len(faceta.libros)
+                    faceta.libros.append(libro)
+                    if posicion >> 6 >= len(faceta.bits):
+                        faceta.bits.append(0)
+                faceta.posiciones[libro.isbn] = posicion
+                faceta.total += 1
+                conteo_autor = autores.get(libro._autor_id)
+                if conteo_autor is None:
+                    conteo_autor = autores[libro._autor_id] = [0, 0]
+                conteo_autor[0] += 1
+                if not libro._estado & _BIT_PRESTADO:
+                    faceta.bits[posicion >> 6] |= 1 << (posicion & 63)
+                    faceta.disponibles += 1
+                    conteo_autor[1] += 1
+
+    def quitar(self, libro: Libro):
+        """Elimina un libro de las facetas."""
+        disponible = not libro._estado & _BIT_PRESTADO
+        with self._bloqueo:
+            faceta = self._categorias[libro._categoria_id]
+            posicion = faceta.posiciones.pop(libro.isbn)
+            faceta.libros[posicion] = None
+            faceta.libres.append(posicion)
+            faceta.total -= 1
+            conteo_autor = self._autores[libro._autor_id]
+            conteo_autor[0] -= 1
+            if disponible:
+                faceta.desactivar(posicion)
+                faceta.disponibles -= 1
+                conteo_autor[1] -= 1
+
+    def cambiar_disponibilidad(self, libro: Libro, disponible: bool):
+        """Actualiza contadores y mapa de bits al prestar (False) o devolver (True) un libro."""
+        self.cambiar_disponibilidad_lote((libro,), disponible)
+
+    def cambiar_disponibilidad_lote(self, libros, disponible: bool):
+        """Igual que cambiar_disponibilidad, para varios libros con un solo bloqueo."""
+        delta = 1 if disponible else -1
+        categorias = self._categorias
+        autores = self._autores
+        with self._bloqueo:
+            for libro in libros:
+                faceta = categorias[libro._categoria_id]
+                posicion = faceta.posiciones[libro.isbn]
+                if disponible:
+                    faceta.activar(posicion)
+                else:
+                    faceta.desactivar(posicion)
+                faceta.disponibles += delta
+                autores[libro._autor_id][1] += delta
+
+    def conteo_categoria(self, categoria: str):
+        """Retorna (total, disponibles) de una categoría."""
+        faceta = self._categorias.get(CATEGORIAS.buscar_id(categoria))
+        return (faceta.total, faceta.disponibles) if faceta else (0, 0)
+
+    def conteo_autor(self, autor: str):
+        """Retorna (total, disponibles) de un autor."""
+        conteo = self._autores.get(AUTORES.buscar_id(autor))
+        return tuple(conteo) if conteo else (0, 0)
+
+    def conteos_por_categoria(self):
+        """Retorna {categoria: (total, disponibles)} para todas las categorías con libros."""
+        return {CATEGORIAS.decodificar(cid): (f.total, f.disponibles)
+                for cid, f in self._categorias.items() if f.total}
+
+    def disponibles_en_categoria(self, categoria: str):
+        """Genera los libros disponibles de una categoría recorriendo su mapa de bits."""
+        faceta = self._categorias.get(CATEGORIAS.buscar_id(categoria))
+        if faceta is None:
+            return
+        libros = faceta.libros
+        for indice, palabra in enumerate(faceta.bits):
+            base = indice << 6
+            while palabra:
+                bajo = palabra & -palabra
+                yield libros[base + bajo.bit_length() - 1]
+                palabra ^= bajo
+
+
+# Definimos el motor de recomendaciones por préstamos conjuntos
+class MotorRecomendaciones:
+    """
+    Recomendaciones "quienes tomaron este libro también tomaron...".
+    Cada préstamo incrementa una matriz dispersa de coocurrencias (diccionario de
+    Counter) con los últimos libros del mismo usuario. Los k vecinos de cada ISBN se
+    precalculan en una caché que se actualiza en segundo plano, de modo que
+    recomendar() solo consulta un diccionario.
+    La memoria se acota limitando el historial por usuario y podando los conteos
+    bajos cuando un libro acumula demasiados vecinos.
+    """
+
+    def __init__(self, k: int = 10, historial_max: int = 50, max_vecinos: int = 500, minimo_poda: int = 2):
+        self.k = k
+        self.historial_max = historial_max
+        self.max_vecinos = max_vecinos
+        self.minimo_poda = minimo_poda
+        self._coocurrencias = {}  # Clave: ISBN, Valor: Counter {ISBN vecino: veces}
+        self._historiales = {}  # Clave: ID de usuario, Valor: deque de ISBN recientes
+        self._pendientes = set()  # ISBN cuyos vecinos cambiaron desde la última actualización
+        self._cache = {}  # Clave: ISBN, Valor: tupla con los k ISBN vecinos
+        self._bloqueo = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def registrar_prestamo(self, id_usuario: int, isbn: str):
+        """Registra un préstamo y actualiza las coocurrencias con el historial del usuario."""
+        with self._bloqueo:
+            historial = self._historiales.get(id_usuario)
+            if historial is None:
+                historial = self._historiales[id_usuario] = deque(maxlen=self.historial_max)
+            elif isbn in historial:
+                return
+            vecinos = self._coocurrencias.get(isbn)
+            if vecinos is None:
+                vecinos = self._coocurrencias[isbn] = Counter()
+            for anterior in historial:
+                vecinos[anterior] += 1
+                conteo_anterior = self._coocurrencias[anterior]
+                conteo_anterior[isbn] += 1
+                if len(conteo_anterior) > self.max_vecinos:
+                    self._podar(conteo_anterior)
+                self._pendientes.add(anterior)
+            if len(vecinos) > self.max_vecinos:
+                self._podar(vecinos)
+            if historial:
+                self._pendientes.add(isbn)
+            historial.append(isbn)
+
+    def _podar(self, vecinos: Counter):
+        """Elimina los vecinos con conteos bajos; si no basta, conserva solo los más frecuentes."""
+        for isbn in [isbn for isbn, veces in vecinos.items() if veces < self.minimo_poda]:
+            del vecinos[isbn]
+        if len(vecinos) > self.max_vecinos:
+            conservar = dict(vecinos.most_common(self.max_vecinos // 2))
+            vecinos.clear()
+            vecinos.update(conservar)
+
+    def olvidar_libro(self, isbn: str):
+        """Elimina un libro de la matriz (por ejemplo, al quitarlo de la biblioteca)."""
+        with self._bloqueo:
+            for vecino in self._coocurrencias.pop(isbn, {}):
+                conteo = self._coocurrencias.get(vecino)
+                if conteo is not None:
+                    conteo.pop(isbn, None)
+                    self._pendientes.add(vecino)
+            self._pendientes.discard(isbn)
+            self._cache.pop(isbn, None)
+            # Sin esto, el siguiente préstamo de esos usuarios buscaría el ISBN borrado
+            for historial in self._historiales.values():
+                if isbn in historial:
+                    historial.remove(isbn)
+
+    def actualizar_cache(self):
+        """Recalcula los k vecinos solo de los libros cuyas coocurrencias cambiaron."""
+        with self._bloqueo:
+            pendientes, self._pendientes = self._pendientes, set()
+            conteos = {isbn: Counter(self._coocurrencias[isbn]) for isbn in pendientes
+                       if isbn in self._coocurrencias}
+        # El ordenamiento se hace fuera del bloqueo para no frenar los préstamos
+        nuevos = {isbn: tuple(vecino for vecino, _ in conteo.most_common(self.k))
+                  for isbn, conteo in conteos.items()}
+        with self._bloqueo:
+            # Se descartan los libros olvidados mientras se ordenaba
+            for isbn, vecinos in nuevos.items():
+                if isbn in self._coocurrencias:
+                    self._cache[isbn] = vecinos
+        return len(nuevos)
+
+    def recomendar(self, isbn: str):
+        """Retorna la tupla precalculada de ISBN recomendados (sin recalcular nada)."""
+        return self._cache.get(isbn, ())
+
+    def iniciar(self, intervalo: float = 5.0):
+        """Inicia un hilo en segundo plano que actualiza la caché cada 'intervalo' segundos."""
+        if self._hilo is not None:
+            return
+        self._detener.clear()
+
+        def ciclo():
+            while not self._detener.wait(intervalo):
+                self.actualizar_cache()
+
+        self._hilo = threading.Thread(target=ciclo, name="recomendaciones", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        """Detiene el hilo de actualización y deja la caché al día."""
+        if self._hilo is not None:
+            self._detener.set()
+            self._hilo.join()
+            self._hilo = None
+        self.actualizar_cache()
+
+    def total_pares(self):
+        """Número de entradas almacenadas en la matriz dispersa."""
+        return sum(len(vecinos) for vecinos in self._coocurrencias.values())
+
+
 # Definimos la clase principal: Biblioteca
 class Biblioteca:
     """
@@ -46,13 +414,24 @@ class Biblioteca:
     Utiliza un diccionario para libros (acceso por ISBN) y un conjunto para usuarios (IDs únicos).
     """
 
-    def __init__(self):
+    def __init__(self, notificar_reserva=None):
         # Diccionario para almacenar libros. La clave es el ISBN para una búsqueda eficiente.
         self.libros_disponibles = {}
         # Conjunto para asegurar IDs de usuario únicos.
         self.usuarios_registrados_ids = set()
         # Diccionario para mapear IDs de usuario a objetos Usuario.
         self.usuarios_registrados_obj = {}
+        # Contadores por categoría/autor y mapas de bits de disponibilidad.
+        self._facetas = FacetasCatalogo()
+        # Colas FIFO de reservas por ISBN (IDs de usuario) y número de reservas por usuario.
+        self._reservas = {}
+        self._reservas_por_usuario = {}
+        # Función notificar_reserva(usuario, libro) llamada al asignar un libro reservado.
+        self.notificar_reserva = notificar_reserva
+        # Motor de recomendaciones opcional (ver activar_recomendaciones).
+        self._recomendador = None
+        # Diario de operaciones en disco opcional (ver activar_persistencia).
+        self._diario = None
 
     # --- Métodos de Gestión de Libros ---
 
@@ -62,6 +441,8 @@ class Biblioteca:
             print(f"Error: El libro con ISBN {libro.isbn} ya existe en la biblioteca.")
         else:
             self.libros_disponibles[libro.isbn] = libro
+            self._facetas.agregar(libro)
+            self._anotar("anadir", libro._titulo, libro.info_basica[1], libro.categoria, libro.isbn)
             print(f"'{libro.info_basica[0]}' añadido a la biblioteca con éxito.")
 
     def quitar_libro(self, isbn: str):
@@ -74,6 +455,10 @@ class Biblioteca:
                 print(f"Error: No se puede quitar el libro '{libro.info_basica[0]}' porque está prestado.")
             else:
                 del self.libros_disponibles[isbn]
+                self._facetas.quitar(libro)
+                if self._recomendador is not None:
+                    self._recomendador.olvidar_libro(isbn)
+                self._anotar("quitar", isbn)
                 print(f"'{libro.info_basica[0]}' eliminado de la biblioteca.")
 
     # --- Métodos de Gestión de Usuarios ---
@@ -85,6 +470,7 @@ class Biblioteca:
         else:
             self.usuarios_registrados_ids.add(usuario.id_usuario)
             self.usuarios_registrados_obj[usuario.id_usuario] = usuario
+            self._anotar("registrar", usuario.nombre, usuario.id_usuario)
             print(f"Usuario '{usuario.nombre}' registrado con éxito.")
 
     def dar_de_baja_usuario(self, id_usuario: int):
@@ -95,51 +481,304 @@ class Biblioteca:
             usuario = self.usuarios_registrados_obj[id_usuario]
             if usuario.libros_prestados:
                 print(f"Error: No se puede dar de baja a '{usuario.nombre}' porque tiene libros prestados.")
+            elif id_usuario in self._reservas_por_usuario:
+                print(f"Error: No se puede dar de baja a '{usuario.nombre}' porque tiene reservas pendientes.")
             else:
                 self.usuarios_registrados_ids.remove(id_usuario)
                 del self.usuarios_registrados_obj[id_usuario]
+                self._anotar("baja", id_usuario)
                 print(f"Usuario '{usuario.nombre}' dado de baja con éxito.")
 
     # --- Métodos de Préstamo y Devolución ---
 
     def prestar_libro(self, isbn: str, id_usuario: int):
-        """Presta un libro a un usuario si está disponible."""
+        """Presta un libro a un usuario si está disponible. Retorna True si se prestó."""
         if id_usuario not in self.usuarios_registrados_ids:
             print(f"Error: Usuario con ID {id_usuario} no está registrado.")
-            return
+            return False
 
         if isbn not in self.libros_disponibles:
             print(f"Error: El libro con ISBN {isbn} no existe en la biblioteca.")
-            return
+            return False
 
         libro = self.libros_disponibles[isbn]
         if libro.prestado:
             print(f"Error: '{libro.info_basica[0]}' ya está prestado.")
+            return False
         else:
             libro.prestado = True
+            self._facetas.cambiar_disponibilidad(libro, False)
             usuario = self.usuarios_registrados_obj[id_usuario]
             usuario.libros_prestados.append(libro)
+            if self._recomendador is not None:
+                self._recomendador.registrar_prestamo(id_usuario, isbn)
+            self._anotar("prestar", isbn, id_usuario)
             print(f"'{libro.info_basica[0]}' prestado a {usuario.nombre}.")
+            return True
 
     def devolver_libro(self, isbn: str, id_usuario: int):
-        """Permite a un usuario devolver un libro."""
+        """Permite a un usuario devolver un libro. Retorna True si se devolvió."""
         if id_usuario not in self.usuarios_registrados_ids:
             print(f"Error: Usuario con ID {id_usuario} no está registrado.")
-            return
+            return False
 
         if isbn not in self.libros_disponibles:
             print(f"Error: El libro con ISBN {isbn} no existe en la biblioteca.")
-            return
+            return False
 
         libro = self.libros_disponibles[isbn]
         usuario = self.usuarios_registrados_obj[id_usuario]
 
         if libro not in usuario.libros_prestados:
             print(f"Error: '{libro.info_basica[0]}' no estaba prestado a {usuario.nombre}.")
+            return False
         else:
-            libro.prestado = False
             usuario.libros_prestados.remove(libro)
             print(f"'{libro.info_basica[0]}' devuelto por {usuario.nombre}.")
+            if not self._entregar_a_reserva(libro):
+                libro.prestado = False
+                self._facetas.cambiar_disponibilidad(libro, True)
+            self._anotar("devolver", isbn, id_usuario)
+            return True
+
+    # --- Métodos de Préstamo y Devolución por Lotes ---
+
+    def prestar_lote(self, id_usuario: int, isbns):
+        """
+        Presta varios libros a un usuario en una sola operación (todo o nada).
+        Valida al usuario una vez y recorre los ISBN una sola vez. Si algún libro
+        no puede prestarse, no se presta ninguno.
+        Retorna (exito, resultados), donde resultados es una lista de tuplas
+        (isbn, estado) con estado: 'prestado', 'cancelado' (válido, pero el lote
+        falló), 'no_existe', 'ya_prestado', 'duplicado' o 'usuario_no_registrado'.
+        """
+        isbns = list(isbns)
+        usuario = self.usuarios_registrados_obj.get(id_usuario)
+        if usuario is None:
+            print(f"Error: Usuario con ID {id_usuario} no está registrado.")
+            return False, [(isbn, "usuario_no_registrado") for isbn in isbns]
+
+        libros = self.libros_disponibles
+        estados = []
+        seleccion = []
+        vistos = set()
+        exito = True
+        for isbn in isbns:
+            libro = libros.get(isbn)
+            if libro is None:
+                estado = "no_existe"
+            elif isbn in vistos:
+                estado = "duplicado"
+            elif libro._estado & _BIT_PRESTADO:
+                estado = "ya_prestado"
+            else:
+                estado = None
+                vistos.add(isbn)
+                seleccion.append(libro)
+            if estado is not None:
+                exito = False
+            estados.append(estado)
+
+        if not exito:
+            print(f"Error: Lote de {len(isbns)} libros rechazado para {usuario.nombre}.")
+            return False, [(isbn, estado or "cancelado") for isbn, estado in zip(isbns, estados)]
+
+        for libro in seleccion:
+            libro._estado |= _BIT_PRESTADO
+        self._facetas.cambiar_disponibilidad_lote(seleccion, False)
+        usuario.libros_prestados.extend(seleccion)
+        if self._recomendador is not None:
+            for libro in seleccion:
+                self._recomendador.registrar_prestamo(id_usuario, libro.isbn)
+        self._anotar("prestar_lote", id_usuario, *isbns)
+        print(f"{len(seleccion)} libros prestados a {usuario.nombre}.")
+        return True, [(isbn, "prestado") for isbn in isbns]
+
+    def devolver_lote(self, id_usuario: int, isbns):
+        """
+        Devuelve varios libros de un usuario en una sola operación (todo o nada).
+        Retorna (exito, resultados) con estado: 'devuelto', 'cancelado', 'no_existe',
+        'no_prestado_al_usuario', 'duplicado' o 'usuario_no_registrado'.
+        """
+        isbns = list(isbns)
+        usuario = self.usuarios_registrados_obj.get(id_usuario)
+        if usuario is None:
+            print(f"Error: Usuario con ID {id_usuario} no está registrado.")
+            return False, [(isbn, "usuario_no_registrado") for isbn in isbns]
+
+        libros = self.libros_disponibles
+        en_prestamo = {libro.isbn for libro in usuario.libros_prestados}
+        estados = []
+        vistos = set()
+        exito = True
+        for isbn in isbns:
+            if isbn not in libros:
+                estado = "no_existe"
+            elif isbn in vistos:
+                estado = "duplicado"
+            elif isbn not in en_prestamo:
+                estado = "no_prestado_al_usuario"
+            else:
+                estado = None
+                vistos.add(isbn)
+            if estado is not None:
+                exito = False
+            estados.append(estado)
+
+        if not exito:
+            print(f"Error: Devolución de {len(isbns)} libros rechazada para {usuario.nombre}.")
+            return False, [(isbn, estado or "cancelado") for isbn, estado in zip(isbns, estados)]
+
+        restantes = []
+        devueltos = []
+        for libro in usuario.libros_prestados:
+            if libro.isbn in vistos:
+                devueltos.append(libro)
+            else:
+                restantes.append(libro)
+        usuario.libros_prestados[:] = restantes
+        print(f"{len(vistos)} libros devueltos por {usuario.nombre}.")
+        liberados = []
+        for libro in devueltos:
+            if not self._entregar_a_reserva(libro):
+                libro._estado &= ~_BIT_PRESTADO
+                liberados.append(libro)
+        self._facetas.cambiar_disponibilidad_lote(liberados, True)
+        self._anotar("devolver_lote", id_usuario, *isbns)
+        return True, [(isbn, "devuelto") for isbn in isbns]
+
+    # --- Métodos de Reservas ---
+
+    def reservar_libro(self, isbn: str, id_usuario: int):
+        """
+        Pone a un usuario en la cola de espera de un libro prestado.
+        Cuando el libro se devuelva, se le prestará automáticamente y se le notificará.
+        Retorna la posición en la cola (1 = siguiente) o 0 si no se pudo reservar.
+        """
+        if id_usuario not in self.usuarios_registrados_ids:
+            print(f"Error: Usuario con ID {id_usuario} no está registrado.")
+            return 0
+
+        libro = self.libros_disponibles.get(isbn)
+        if libro is None:
+            print(f"Error: El libro con ISBN {isbn} no existe en la biblioteca.")
+            return 0
+
+        usuario = self.usuarios_registrados_obj[id_usuario]
+        if not libro.prestado:
+            print(f"Error: '{libro.info_basica[0]}' está disponible; no es necesario reservarlo.")
+            return 0
+        if libro in usuario.libros_prestados:
+            print(f"Error: '{libro.info_basica[0]}' ya está prestado a {usuario.nombre}.")
+            return 0
+
+        cola = self._reservas.get(isbn)
+        if cola is None:
+            cola = self._reservas[isbn] = deque()
+        elif id_usuario in cola:
+            print(f"Error: {usuario.nombre} ya tiene una reserva de '{libro.info_basica[0]}'.")
+            return 0
+        cola.append(id_usuario)
+        self._reservas_por_usuario[id_usuario] = self._reservas_por_usuario.get(id_usuario, 0) + 1
+        self._anotar("reservar", isbn, id_usuario)
+        print(f"'{libro.info_basica[0]}' reservado para {usuario.nombre} (posición {len(cola)}).")
+        return len(cola)
+
+    def cancelar_reserva(self, isbn: str, id_usuario: int):
+        """Retira a un usuario de la cola de espera de un libro."""
+        cola = self._reservas.get(isbn)
+        if not cola or id_usuario not in cola:
+            print(f"Error: El usuario con ID {id_usuario} no tiene reserva del libro con ISBN {isbn}.")
+            return False
+        cola.remove(id_usuario)
+        if not cola:
+            del self._reservas[isbn]
+        self._descontar_reserva(id_usuario)
+        self._anotar("cancelar_reserva", isbn, id_usuario)
+        print(f"Reserva del libro con ISBN {isbn} cancelada para el usuario con ID {id_usuario}.")
+        return True
+
+    def reservas_pendientes(self, isbn: str):
+        """Retorna la lista de IDs de usuario en espera de un libro, en orden."""
+        return list(self._reservas.get(isbn, ()))
+
+    def _descontar_reserva(self, id_usuario: int):
+        restantes = self._reservas_por_usuario[id_usuario] - 1
+        if restantes:
+            self._reservas_por_usuario[id_usuario] = restantes
+        else:
+            del self._reservas_por_usuario[id_usuario]
+
+    def _entregar_a_reserva(self, libro: Libro):
+        """
+        Presta un libro recién devuelto al primer usuario de su cola, en O(1).
+        El libro sigue marcado como prestado. Retorna False si no hay reservas.
+        """
+        cola = self._reservas.get(libro.isbn)
+        if not cola:
+            return False
+        id_usuario = cola.popleft()
+        if not cola:
+            del self._reservas[libro.isbn]
+        self._descontar_reserva(id_usuario)
+        usuario = self.usuarios_registrados_obj[id_usuario]
+        usuario.libros_prestados.append(libro)
+        if self._recomendador is not None:
+            self._recomendador.registrar_prestamo(id_usuario, libro.isbn)
+        if self.notificar_reserva is not None:
+            self.notificar_reserva(usuario, libro)
+        else:
+            print(f"'{libro.info_basica[0]}' reservado: prestado a {usuario.nombre}.")
+        return True
+
+    def guardar_reservas(self, archivo: str):
+        """Guarda las colas de reservas en un archivo CSV (una fila por ISBN: isbn, id1, id2, ...)."""
+        try:
+            with open(archivo, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                for isbn, cola in self._reservas.items():
+                    writer.writerow([isbn, *cola])
+            return True
+        except OSError as e:
+            print(f"Error al guardar las reservas en '{archivo}': {e}")
+            return False
+
+    def cargar_reservas(self, archivo: str):
+        """
+        Carga las colas de reservas desde un archivo CSV creado con guardar_reservas.
+        Se omiten las reservas que reservar_libro no aceptaría: libros que no existen
+        o no están prestados, usuarios no registrados, repetidos o que ya tienen ese
+        libro. Si el archivo no se puede leer, se conservan las reservas actuales.
+        """
+        if not os.path.exists(archivo):
+            print(f"El archivo de reservas '{archivo}' no existe.")
+            return False
+        reservas = {}
+        reservas_por_usuario = {}
+        try:
+            with open(archivo, "r", newline="", encoding="utf-8") as f:
+                for fila in csv.reader(f):
+                    libro = self.libros_disponibles.get(fila[0]) if fila else None
+                    if libro is None or not libro.prestado:
+                        continue
+                    cola = reservas.get(libro.isbn) or deque()
+                    for id_usuario in map(int, fila[1:]):
+                        usuario = self.usuarios_registrados_obj.get(id_usuario)
+                        if usuario is None or id_usuario in cola or libro in usuario.libros_prestados:
+                            continue
+                        cola.append(id_usuario)
+                        reservas_por_usuario[id_usuario] = reservas_por_usuario.get(id_usuario, 0) + 1
+                    if cola:
+                        reservas[libro.isbn] = cola
+        except (OSError, ValueError, csv.Error) as e:
+            print(f"Error al cargar las reservas desde '{archivo}': {e}")
+            return False
+        # Solo se reemplazan las colas cuando todo el archivo es válido
+        self._reservas.clear()
+        self._reservas.update(reservas)
+        self._reservas_por_usuario.clear()
+        self._reservas_por_usuario.update(reservas_por_usuario)
+        return True
 
     # --- Métodos de Búsqueda y Listado ---
 
@@ -180,8 +819,768 @@ class Biblioteca:
                 print(f"  - {libro}")
 
 
+    # --- Métodos de Facetas del Catálogo ---
+
+    def contar_por_categoria(self, categoria: str):
+        """Retorna (total, disponibles) de una categoría en O(1)."""
+        return self._facetas.conteo_categoria(categoria)
+
+    def contar_por_autor(self, autor: str):
+        """Retorna (total, disponibles) de un autor en O(1)."""
+        return self._facetas.conteo_autor(autor)
+
+    def facetas_por_categoria(self):
+        """Retorna {categoria: (total, disponibles)} para mostrar en el catálogo."""
+        return self._facetas.conteos_por_categoria()
+
+    def listar_disponibles_por_categoria(self, categoria: str):
+        """Retorna la lista de libros disponibles de una categoría."""
+        return list(self._facetas.disponibles_en_categoria(categoria))
+
+    # --- Métodos de Recomendaciones ---
+
+    def activar_recomendaciones(self, motor: MotorRecomendaciones = None, intervalo: float = 5.0):
+        """
+        Empieza a registrar los préstamos en un motor de recomendaciones y lanza su
+        actualización en segundo plano. Retorna el motor.
+        """
+        self._recomendador = motor or MotorRecomendaciones()
+        self._recomendador.iniciar(intervalo)
+        return self._recomendador
+
+    def recomendar_libros(self, isbn: str):
+        """Retorna los libros que suelen prestarse junto con el indicado, desde la caché."""
+        if self._recomendador is None:
+            return []
+        libros = self.libros_disponibles
+        return [libros[vecino] for vecino in self._recomendador.recomendar(isbn) if vecino in libros]
+
+    # --- Métodos de Persistencia ---
+
+    def activar_persistencia(self, directorio: str, **opciones):
+        """
+        Restaura la biblioteca desde 'directorio' (instantánea + diario) y a partir de
+        ahí anota cada operación en disco. Debe llamarse con la biblioteca vacía.
+        Las opciones se pasan a PersistenciaBiblioteca. Retorna el objeto de persistencia.
+        """
+        persistencia = PersistenciaBiblioteca(directorio, **opciones)
+        persistencia.restaurar(self)
+        return persistencia
+
+    def _anotar(self, *operacion):
+        # Se llama al final de cada operación, cuando todos sus cambios ya están aplicados
+        if self._diario is not None:
+            self._diario.anotar(operacion)
+
+    def _programar_instantanea(self, tomar_instantanea):
+        """
+        Lanza una instantánea automática. La Biblioteca básica no es segura entre
+        hilos, así que la copia del estado se hace aquí mismo, en el hilo que opera.
+        """
+        tomar_instantanea()
+
+    def _capturar_estado(self, antes=None):
+        """
+        Copia superficial y consistente del estado para una instantánea:
+        (libros, usuarios [(id, nombre, [isbn prestados])], reservas {isbn: (ids)}).
+        'antes' se ejecuta en el mismo punto de corte (rotación del diario).
+        """
+        if antes is not None:
+            antes()
+        libros = list(self.libros_disponibles.values())
+        usuarios = [(u.id_usuario, u.nombre, [libro.isbn for libro in u.libros_prestados])
+                    for u in self.usuarios_registrados_obj.values()]
+        reservas = {isbn: tuple(cola) for isbn, cola in self._reservas.items()}
+        return libros, usuarios, reservas
+
+    def _restaurar_estado(self, libros, usuarios, reservas):
+        """Carga directamente un estado capturado, sin validaciones ni mensajes."""
+        for libro in libros:
+            self.libros_disponibles[libro.isbn] = libro
+        for id_usuario, nombre, isbns in usuarios:
+            usuario = Usuario(nombre, id_usuario)
+            self.usuarios_registrados_ids.add(id_usuario)
+            self.usuarios_registrados_obj[id_usuario] = usuario
+            for isbn in isbns:
+                libro = self.libros_disponibles[isbn]
+                libro._estado |= _BIT_PRESTADO
+                usuario.libros_prestados.append(libro)
+        self._facetas.agregar_lote(libros)
+        for isbn, ids in reservas.items():
+            self._reservas[isbn] = deque(ids)
+            for id_usuario in ids:
+                self._reservas_por_usuario[id_usuario] = self._reservas_por_usuario.get(id_usuario, 0) + 1
+
+
+# Definimos una variante de Biblioteca segura para varios hilos
+class BibliotecaConcurrente(Biblioteca):
+    """
+    Biblioteca que puede atender varios puestos de autopréstamo en paralelo.
+    Usa bloqueos por franjas (lock striping): cada ISBN y cada ID de usuario se
+    asigna a uno de N bloqueos según su hash, de modo que operaciones sobre
+    libros/usuarios distintos no compiten entre sí.
+    Para evitar interbloqueos, las operaciones que necesitan ambos bloqueos los
+    adquieren siempre en el mismo orden: primero los de los usuarios y luego los
+    de los libros, cada grupo en orden creciente de franja.
+    """
+
+    def __init__(self, franjas: int = 64, notificar_reserva=None):
+        super().__init__(notificar_reserva)
+        # Las facetas son compartidas entre franjas, así que llevan su propio bloqueo
+        self._facetas = FacetasCatalogo(threading.Lock())
+        self._franjas = franjas
+        self._bloqueos_libros = [threading.Lock() for _ in range(franjas)]
+        self._bloqueos_usuarios = [threading.Lock() for _ in range(franjas)]
+
+    def _bloqueo_libro(self, isbn: str):
+        return self._bloqueos_libros[hash(isbn) % self._franjas]
+
+    def _bloqueo_usuario(self, id_usuario: int):
+        return self._bloqueos_usuarios[hash(id_usuario) % self._franjas]
+
+    def _bloqueos_de_libros(self, isbns):
+        """Bloqueos de las franjas de varios ISBN, sin repetir y en orden creciente."""
+        franjas = sorted({hash(isbn) % self._franjas for isbn in isbns})
+        return [self._bloqueos_libros[franja] for franja in franjas]
+
+    def anadir_libro(self, libro: Libro):
+        with self._bloqueo_libro(libro.isbn):
+            return super().anadir_libro(libro)
+
+    def quitar_libro(self, isbn: str):
+        with self._bloqueo_libro(isbn):
+            return super().quitar_libro(isbn)
+
+    def registrar_usuario(self, usuario: Usuario):
+        with self._bloqueo_usuario(usuario.id_usuario):
+            return super().registrar_usuario(usuario)
+
+    def dar_de_baja_usuario(self, id_usuario: int):
+        with self._bloqueo_usuario(id_usuario):
+            return super().dar_de_baja_usuario(id_usuario)
+
+    def prestar_libro(self, isbn: str, id_usuario: int):
+        # Orden fijo usuario -> libro: la comprobación de 'prestado' y su
+        # modificación ocurren de forma atómica respecto a otros hilos.
+        with self._bloqueo_usuario(id_usuario), self._bloqueo_libro(isbn):
+            return super().prestar_libro(isbn, id_usuario)
+
+    def devolver_libro(self, isbn: str, id_usuario: int):
+        # Caso habitual sin reservas: basta con los bloqueos del usuario y del libro
+        if isbn not in self._reservas:
+            with self._bloqueo_usuario(id_usuario), self._bloqueo_libro(isbn):
+                if isbn not in self._reservas:
+                    return super().devolver_libro(isbn, id_usuario)
+        return self._devolver_con_reservas(id_usuario, [isbn], lambda: super(BibliotecaConcurrente, self).devolver_libro(isbn, id_usuario))
+
+    def reservar_libro(self, isbn: str, id_usuario: int):
+        with self._bloqueo_usuario(id_usuario), self._bloqueo_libro(isbn):
+            return super().reservar_libro(isbn, id_usuario)
+
+    def cancelar_reserva(self, isbn: str, id_usuario: int):
+        with self._bloqueo_usuario(id_usuario), self._bloqueo_libro(isbn):
+            return super().cancelar_reserva(isbn, id_usuario)
+
+    def _devolver_con_reservas(self, id_usuario: int, isbns, devolver):
+        """
+        Ejecuta una devolución bloqueando también a los usuarios que recibirán los
+        libros por reserva. Los primeros de cada cola se leen antes (bajo los bloqueos
+        de los libros, que cancelar_reserva también toma); si alguna cola cambió
+        mientras tanto, se vuelve a intentar.
+        """
+        while True:
+            with contextlib.ExitStack() as pila:
+                for bloqueo in self._bloqueos_de_libros(isbns):
+                    pila.enter_context(bloqueo)
+                primeros = [cola[0] for cola in map(self._reservas.get, isbns) if cola]
+            franjas_usuarios = sorted({hash(u) % self._franjas for u in (id_usuario, *primeros)})
+            with contextlib.ExitStack() as pila:
+                for franja in franjas_usuarios:
+                    pila.enter_context(self._bloqueos_usuarios[franja])
+                for bloqueo in self._bloqueos_de_libros(isbns):
+                    pila.enter_context(bloqueo)
+                if primeros == [cola[0] for cola in map(self._reservas.get, isbns) if cola]:
+                    return devolver()
+
+    def prestar_lote(self, id_usuario: int, isbns):
+        isbns = list(isbns)
+        with self._bloqueo_usuario(id_usuario), contextlib.ExitStack() as pila:
+            for bloqueo in self._bloqueos_de_libros(isbns):
+                pila.enter_context(bloqueo)
+            return super().prestar_lote(id_usuario, isbns)
+
+    def devolver_lote(self, id_usuario: int, isbns):
+        isbns = list(isbns)
+        return self._devolver_con_reservas(id_usuario, isbns, lambda: super(BibliotecaConcurrente, self).devolver_lote(id_usuario, isbns))
+
+    def _capturar_estado(self, antes=None):
+        # Se toman todos los bloqueos (usuarios y luego libros, en orden) para
+        # obtener un corte consistente; la copia es superficial y breve.
+        with contextlib.ExitStack() as pila:
+            for bloqueo in (*self._bloqueos_usuarios, *self._bloqueos_libros):
+                pila.enter_context(bloqueo)
+            return super()._capturar_estado(antes)
+
+    def _programar_instantanea(self, tomar_instantanea):
+        # El hilo actual aún tiene bloqueos de la operación en curso; la captura
+        # (que necesita todos) se hace desde otro hilo cuando estos se liberen.
+        threading.Thread(target=tomar_instantanea, daemon=True).start()
+
+
+# Definimos el motor de persistencia
+class PersistenciaBiblioteca:
+    """
+    Persistencia de una Biblioteca en un directorio:
+      - instantanea.csv: copia compacta de libros (autores y categorías codificados
+        por ID), usuarios con sus préstamos y reservas.
+      - diario-NNNNNN.log: segmentos de solo anexado con una operación CSV por línea.
+    Al tomar una instantánea se rota el diario en el mismo punto de corte en que se
+    copia el estado; la escritura a disco se hace en un hilo aparte y, al terminar,
+    se borran los segmentos que la instantánea ya incluye. Restaurar = cargar la
+    instantánea y reaplicar los segmentos posteriores. Una última línea incompleta
+    (caída a mitad de escritura) se descarta.
+    """
+
+    ARCHIVO_INSTANTANEA = "instantanea.csv"
+
+    def __init__(self, directorio: str, sincronizar: bool = False, operaciones_por_instantanea: int = 100_000):
+        # sincronizar=True hace os.fsync tras cada operación (sobrevive a caídas del
+        # sistema operativo); con False basta con vaciar el búfer (caídas del proceso).
+        self.directorio = directorio
+        self.sincronizar = sincronizar
+        self.operaciones_por_instantanea = operaciones_por_instantanea
+        self.biblioteca = None
+        self._segmento = 0
+        self._archivo = None
+        self._escritor = None
+        self._operaciones = 0
+        self._bloqueo = threading.Lock()
+        self._hilo_instantanea = None
+        # Avisa cuando termina la instantánea en curso (_hilo_instantanea vuelve a None)
+        self._instantanea_terminada = threading.Condition(self._bloqueo)
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta_segmento(self, numero: int):
+        return os.path.join(self.directorio, f"diario-{numero:06d}.log")
+
+    def _segmentos(self):
+        numeros = []
+        for nombre in os.listdir(self.directorio):
+            if nombre.startswith("diario-") and nombre.endswith(".log"):
+                numeros.append(int(nombre[7:-4]))
+        return sorted(numeros)
+
+    def _abrir_segmento(self, numero: int):
+        self._segmento = numero
+        self._archivo = open(self._ruta_segmento(numero), "a", newline="", encoding="utf-8")
+        self._escritor = csv.writer(self._archivo, lineterminator="\n")
+
+    # --- Escritura ---
+
+    def anotar(self, operacion):
+        """Añade una operación al segmento actual del diario."""
+        with self._bloqueo:
+            self._escritor.writerow(operacion)
+            self._archivo.flush()
+            if self.sincronizar:
+                os.fsync(self._archivo.fileno())
+            self._operaciones += 1
+            lanzar = self._operaciones >= self.operaciones_por_instantanea and self._hilo_instantanea is None
+            if lanzar:
+                self._operaciones = 0
+        if lanzar:
+            self.biblioteca._programar_instantanea(self.tomar_instantanea)
+
+    def _rotar(self):
+        """Cierra el segmento actual y abre el siguiente. Retorna el número del cerrado."""
+        with self._bloqueo:
+            cerrado = self._segmento
+            self._archivo.close()
+            self._abrir_segmento(cerrado + 1)
+            self._operaciones = 0
+            return cerrado
+
+    def tomar_instantanea(self, esperar: bool = False):
+        """
+        Copia el estado (breve, en el hilo que llama) y lo escribe a disco en segundo
+        plano sin bloquear préstamos ni devoluciones. Si ya hay una instantánea en
+        curso no se inicia otra. Con esperar=True retorna cuando está en disco.
+        Con la Biblioteca básica debe llamarse desde el hilo que la usa.
+        """
+        with self._bloqueo:
+            if self._hilo_instantanea is not None:
+                if esperar:
+                    # Se espera con la condición (suelta el bloqueo): el escritor lo necesita para terminar
+                    self._esperar_instantanea()
+                return
+            self._hilo_instantanea = threading.current_thread()
+        try:
+            cubiertos = []
+            libros, usuarios, reservas = self.biblioteca._capturar_estado(lambda: cubiertos.append(self._rotar()))
+            hilo = threading.Thread(target=self._escribir_instantanea,
+                                    args=(libros, usuarios, reservas, cubiertos[0]), daemon=True)
+            hilo.start()
+        except BaseException:
+            with self._bloqueo:
+                self._hilo_instantanea = None
+                self._instantanea_terminada.notify_all()
+            raise
+        with self._bloqueo:
+            # Se publica ya arrancado, y solo si el escritor no terminó antes
+            if self._hilo_instantanea is threading.current_thread():
+                self._hilo_instantanea = hilo
+        if esperar:
+            hilo.join()
+
+    def _esperar_instantanea(self):
+        """Espera (con el bloqueo tomado) a que termine la instantánea en curso de otro hilo."""
+        while self._hilo_instantanea not in (None, threading.current_thread()):
+            self._instantanea_terminada.wait()
+
+    def _escribir_instantanea(self, libros, usuarios, reservas, segmento: int):
+        ruta = os.path.join(self.directorio, self.ARCHIVO_INSTANTANEA)
+        temporal = ruta + ".tmp"
+        try:
+            with open(temporal, "w", newline="", encoding="utf-8") as f:
+                escritor = csv.writer(f, lineterminator="\n")
+                escritor.writerow(["instantanea", 1, segmento])
+                # Autores y categorías se escriben una vez; cada libro guarda sus IDs
+                autores = sorted({libro._autor_id for libro in libros})
+                categorias = sorted({libro._categoria_id for libro in libros})
+                escritor.writerow(["A", *map(AUTORES.decodificar, autores)])
+                escritor.writerow(["C", *map(CATEGORIAS.decodificar, categorias)])
+                local_autor = {id_global: i for i, id_global in enumerate(autores)}
+                local_categoria = {id_global: i for i, id_global in enumerate(categorias)}
+                escritor.writerows(["L", libro.isbn, libro._titulo, local_autor[libro._autor_id],
+                                    local_categoria[libro._categoria_id]] for libro in libros)
+                escritor.writerows(["U", id_usuario, nombre, *isbns] for id_usuario, nombre, isbns in usuarios)
+                escritor.writerows(["R", isbn, *ids] for isbn, ids in reservas.items())
+                f.flush()
+                os.fsync(f.fileno())
+            # Reemplazo atómico: una caída deja la instantánea anterior o la nueva, nunca una mezcla
+            os.replace(temporal, ruta)
+            for numero in self._segmentos():
+                if numero <= segmento:
+                    os.remove(self._ruta_segmento(numero))
+        except OSError as e:
+            print(f"Error al escribir la instantánea en '{ruta}': {e}")
+        finally:
+            with self._bloqueo:
+                self._hilo_instantanea = None
+                self._instantanea_terminada.notify_all()
+
+    def cerrar(self):
+        """Espera a la instantánea en curso y cierra el diario."""
+        with self._bloqueo:
+            self._esperar_instantanea()
+            if self._archivo is not None:
+                self._archivo.close()
+                self._archivo = None
+        if self.biblioteca is not None:
+            self.biblioteca._diario = None
+
+    # --- Lectura ---
+
+    def restaurar(self, biblioteca: "Biblioteca"):
+        """Reconstruye 'biblioteca' (vacía) desde disco y empieza a anotar sus operaciones."""
+        segmento_instantanea = 0
+        ruta = os.path.join(self.directorio, self.ARCHIVO_INSTANTANEA)
+        if os.path.exists(ruta):
+            segmento_instantanea = self._cargar_instantanea(biblioteca, ruta)
+
+        segmentos = [n for n in self._segmentos() if n > segmento_instantanea]
+        notificar, biblioteca.notificar_reserva = biblioteca.notificar_reserva, None
+        try:
+            with contextlib.redirect_stdout(_SalidaNula()):
+                for numero in segmentos:
+                    self._reaplicar_segmento(biblioteca, self._ruta_segmento(numero))
+        finally:
+            biblioteca.notificar_reserva = notificar
+
+        self.biblioteca = biblioteca
+        self._abrir_segmento(max(segmentos, default=segmento_instantanea) + 1)
+        biblioteca._diario = self
+
+    def _cargar_instantanea(self, biblioteca, ruta: str):
+        libros, usuarios, reservas = [], [], {}
+        with open(ruta, "r", newline="", encoding="utf-8") as f:
+            lector = csv.reader(f)
+            _, _, segmento = next(lector)
+            autores = [AUTORES.codificar(autor) for autor in next(lector)[1:]]
+            categorias = [CATEGORIAS.codificar(categoria) for categoria in next(lector)[1:]]
+            desde_codigos = Libro._desde_codigos
+            for fila in lector:
+                tipo = fila[0]
+                if tipo == "L":
+                    libros.append(desde_codigos(fila[2], autores[int(fila[3])], categorias[int(fila[4])], fila[1]))
+                elif tipo == "U":
+                    usuarios.append((int(fila[1]), fila[2], fila[3:]))
+                elif tipo == "R":
+                    reservas[fila[1]] = [int(id_usuario) for id_usuario in fila[2:]]
+        biblioteca._restaurar_estado(libros, usuarios, reservas)
+        return int(segmento)
+
+    def _reaplicar_segmento(self, biblioteca, ruta: str):
+        with open(ruta, "rb") as f:
+            contenido = f.read()
+        completo = contenido.rfind(b"\n") + 1
+        if completo < len(contenido):
+            # Línea final truncada por una caída: se descarta
+            with open(ruta, "r+b") as f:
+                f.truncate(completo)
+        lineas = contenido[:completo].decode("utf-8").splitlines()
+        for fila in csv.reader(lineas):
+            self._aplicar(biblioteca, fila)
+
+    @staticmethod
+    def _aplicar(biblioteca, fila):
+        operacion, datos = fila[0], fila[1:]
+        if operacion == "anadir":
+            biblioteca.anadir_libro(Libro(*datos))
+        elif operacion == "quitar":
+            biblioteca.quitar_libro(datos[0])
+        elif operacion == "registrar":
+            biblioteca.registrar_usuario(Usuario(datos[0], int(datos[1])))
+        elif operacion == "baja":
+            biblioteca.dar_de_baja_usuario(int(datos[0]))
+        elif operacion == "prestar":
+            biblioteca.prestar_libro(datos[0], int(datos[1]))
+        elif operacion == "devolver":
+            biblioteca.devolver_libro(datos[0], int(datos[1]))
+        elif operacion == "prestar_lote":
+            biblioteca.prestar_lote(int(datos[0]), datos[1:])
+        elif operacion == "devolver_lote":
+            biblioteca.devolver_lote(int(datos[0]), datos[1:])
+        elif operacion == "reservar":
+            biblioteca.reservar_libro(datos[0], int(datos[1]))
+        elif operacion == "cancelar_reserva":
+            biblioteca.cancelar_reserva(datos[0], int(datos[1]))
+
+
+# --- Benchmarks ---
+
+def medir_memoria_libros(cantidad=200_000, autores=3_000, categorias=50):
+    """
+    Mide la memoria por libro de la representación original (__dict__, tupla y
+    cadenas duplicadas) frente a la representación compacta actual.
+    Las cadenas se construyen en cada iteración, como ocurriría al leerlas de un archivo.
+    """
+
+    class LibroOriginal:
+        def __init__(self, titulo, autor, categoria, isbn):
+            self.info_basica = (titulo, autor)
+            self.categoria = categoria
+            self.isbn = isbn
+            self.prestado = False
+
+    def medir(clase):
+        tracemalloc.start()
+        inicio = tracemalloc.get_traced_memory()[0]
+        libros = [
+            clase(f"Título {i}", f"Autor {i % autores}", f"Categoría {i % categorias}", f"ISBN-{i:010d}")
+            for i in range(cantidad)
+        ]
+        usado = tracemalloc.get_traced_memory()[0] - inicio
+        tracemalloc.stop()
+        del libros
+        return usado / cantidad
+
+    original = medir(LibroOriginal)
+    compacto = medir(Libro)
+    print(f"\nMemoria por libro ({cantidad} libros, {autores} autores, {categorias} categorías):")
+    print(f"  - Original: {original:.1f} bytes")
+    print(f"  - Compacto: {compacto:.1f} bytes ({100 * (1 - compacto / original):.1f}% menos)")
+
+
+def prueba_estres_concurrente(libros=2_000, hilos=(1, 2, 4, 8), operaciones=20_000):
+    """
+    Prueba de estrés de BibliotecaConcurrente.
+    1. Corrección: todos los hilos intentan prestar todos los libros a la vez;
+       cada libro debe prestarse exactamente una vez.
+    2. Rendimiento: préstamos y devoluciones aleatorios con distinto número de hilos.
+    """
+    with contextlib.redirect_stdout(_SalidaNula()):
+        biblioteca = BibliotecaConcurrente()
+        isbns = [f"ISBN-{i:06d}" for i in range(libros)]
+        for i, isbn in enumerate(isbns):
+            biblioteca.anadir_libro(Libro(f"Título {i}", f"Autor {i % 100}", f"Categoría {i % 10}", isbn))
+        for id_usuario in range(max(hilos)):
+            biblioteca.registrar_usuario(Usuario(f"Usuario {id_usuario}", id_usuario))
+
+        # 1. Corrección
+        exitos = [0] * max(hilos)
+
+        def acaparar(id_usuario):
+            orden = isbns[:]
+            random.Random(id_usuario).shuffle(orden)
+            for isbn in orden:
+                if biblioteca.prestar_libro(isbn, id_usuario):
+                    exitos[id_usuario] += 1
+
+        trabajadores = [threading.Thread(target=acaparar, args=(u,)) for u in range(max(hilos))]
+        for t in trabajadores:
+            t.start()
+        for t in trabajadores:
+            t.join()
+        prestados = [libro.isbn for u in biblioteca.usuarios_registrados_obj.values() for libro in u.libros_prestados]
+        correcto = sum(exitos) == libros and len(set(prestados)) == len(prestados) == libros
+        for usuario in biblioteca.usuarios_registrados_obj.values():
+            for libro in usuario.libros_prestados[:]:
+                biblioteca.devolver_libro(libro.isbn, usuario.id_usuario)
+
+        # 2. Rendimiento
+        resultados = []
+        for n_hilos in hilos:
+            por_hilo = operaciones // n_hilos
+
+            def prestar_y_devolver(id_usuario):
+                aleatorio = random.Random(id_usuario)
+                for _ in range(por_hilo):
+                    isbn = aleatorio.choice(isbns)
+                    if biblioteca.prestar_libro(isbn, id_usuario):
+                        biblioteca.devolver_libro(isbn, id_usuario)
+
+            trabajadores = [threading.Thread(target=prestar_y_devolver, args=(u,)) for u in range(n_hilos)]
+            inicio = time.perf_counter()
+            for t in trabajadores:
+                t.start()
+            for t in trabajadores:
+                t.join()
+            duracion = time.perf_counter() - inicio
+            resultados.append((n_hilos, por_hilo * n_hilos / duracion))
+
+    print(f"\nPrueba de estrés concurrente ({libros} libros, {max(hilos)} hilos):")
+    print(f"  - Cada libro prestado exactamente una vez: {'sí' if correcto else 'NO'}")
+    for n_hilos, por_segundo in resultados:
+        print(f"  - {n_hilos} hilo(s): {por_segundo:,.0f} operaciones/s")
+
+
+def medir_lotes(tamano_lote=200, repeticiones=200):
+    """Compara préstamo/devolución libro a libro frente a prestar_lote/devolver_lote."""
+    with contextlib.redirect_stdout(_SalidaNula()):
+        biblioteca = Biblioteca()
+        isbns = [f"ISBN-{i:06d}" for i in range(tamano_lote)]
+        for i, isbn in enumerate(isbns):
+            biblioteca.anadir_libro(Libro(f"Título {i}", f"Autor {i % 20}", "Escolar", isbn))
+        biblioteca.registrar_usuario(Usuario("Clase 5A", 1))
+
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            for isbn in isbns:
+                biblioteca.prestar_libro(isbn, 1)
+            for isbn in isbns:
+                biblioteca.devolver_libro(isbn, 1)
+        individual = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            biblioteca.prestar_lote(1, isbns)
+            biblioteca.devolver_lote(1, isbns)
+        por_lotes = time.perf_counter() - inicio
+
+    print(f"\nPréstamo y devolución de {tamano_lote} libros ({repeticiones} repeticiones):")
+    print(f"  - Libro a libro: {individual * 1000 / repeticiones:.2f} ms por ciclo")
+    print(f"  - Por lotes:     {por_lotes * 1000 / repeticiones:.2f} ms por ciclo ({individual / por_lotes:.1f}x)")
+
+
+def medir_facetas(cantidad=200_000, categorias=50, consultas=200):
+    """Compara contar/listar disponibles por categoría recorriendo todos los libros frente a las facetas."""
+    with contextlib.redirect_stdout(_SalidaNula()):
+        biblioteca = Biblioteca()
+        for i in range(cantidad):
+            biblioteca.anadir_libro(Libro(f"Título {i}", f"Autor {i % 3000}", f"Categoría {i % categorias}", f"ISBN-{i:08d}"))
+        biblioteca.registrar_usuario(Usuario("Lector", 1))
+        biblioteca.prestar_lote(1, [f"ISBN-{i:08d}" for i in range(0, cantidad, 3)])
+    nombres = [f"Categoría {i % categorias}" for i in range(consultas)]
+
+    inicio = time.perf_counter()
+    for categoria in nombres:
+        sum(1 for libro in biblioteca.libros_disponibles.values()
+            if libro.categoria == categoria and not libro.prestado)
+    conteo_recorrido = (time.perf_counter() - inicio) / consultas
+
+    inicio = time.perf_counter()
+    for categoria in nombres:
+        biblioteca.contar_por_categoria(categoria)
+    conteo_facetas = (time.perf_counter() - inicio) / consultas
+
+    inicio = time.perf_counter()
+    for categoria in nombres[:20]:
+        biblioteca.listar_disponibles_por_categoria(categoria)
+    listado_bits = (time.perf_counter() - inicio) / 20
+
+    print(f"\nFacetas por categoría ({cantidad} libros, {categorias} categorías):")
+    print(f"  - Conteo recorriendo libros: {conteo_recorrido * 1000:.2f} ms")
+    print(f"  - Conteo con facetas:        {conteo_facetas * 1e6:.2f} µs")
+    print(f"  - Listado con mapa de bits:  {listado_bits * 1000:.2f} ms")
+
+
+def simular_reservas(usuarios=2_000, titulos_populares=20, rondas=200, prob_devolucion=0.1):
+    """
+    Simulación con mucha demanda sobre pocos títulos populares. Compara usuarios
+    que reintentan prestar_libro en cada ronda (sondeo) frente a colas de reservas
+    con notificación. Reporta llamadas a la biblioteca, préstamos logrados y tiempo.
+    """
+    def simular(con_reservas):
+        aleatorio = random.Random(7)
+        notificados = []
+        with contextlib.redirect_stdout(_SalidaNula()):
+            biblioteca = Biblioteca(notificar_reserva=lambda usuario, libro: notificados.append(usuario.id_usuario))
+            isbns = [f"POP-{i:03d}" for i in range(titulos_populares)]
+            for i, isbn in enumerate(isbns):
+                biblioteca.anadir_libro(Libro(f"Éxito {i}", f"Autor {i}", "Novedades", isbn))
+            for id_usuario in range(usuarios):
+                biblioteca.registrar_usuario(Usuario(f"Lector {id_usuario}", id_usuario))
+            deseos = {id_usuario: aleatorio.choice(isbns) for id_usuario in range(usuarios)}
+            titulares = {}  # Clave: ISBN, Valor: ID de usuario que lo tiene
+            esperando = set(deseos)
+            llamadas = prestamos = 0
+            inicio = time.perf_counter()
+            for _ in range(rondas):
+                for isbn, id_usuario in list(titulares.items()):
+                    if aleatorio.random() < prob_devolucion:
+                        llamadas += 1
+                        del titulares[isbn]
+                        biblioteca.devolver_libro(isbn, id_usuario)
+                for id_usuario in notificados:
+                    titulares[deseos[id_usuario]] = id_usuario
+                    prestamos += 1
+                notificados.clear()
+                for id_usuario in list(esperando):
+                    isbn = deseos[id_usuario]
+                    llamadas += 1
+                    if biblioteca.prestar_libro(isbn, id_usuario):
+                        titulares[isbn] = id_usuario
+                        prestamos += 1
+                        esperando.discard(id_usuario)
+                    elif con_reservas:
+                        llamadas += 1
+                        biblioteca.reservar_libro(isbn, id_usuario)
+                        esperando.discard(id_usuario)
+            duracion = time.perf_counter() - inicio
+        return llamadas, prestamos, duracion
+
+    print(f"\nSimulación de reservas ({usuarios} usuarios, {titulos_populares} títulos, {rondas} rondas):")
+    for nombre, con_reservas in (("Sondeo", False), ("Reservas", True)):
+        llamadas, prestamos, duracion = simular(con_reservas)
+        print(f"  - {nombre:8}: {llamadas:>9,} llamadas, {prestamos:>5} préstamos, {duracion * 1000:.1f} ms")
+
+
+def medir_recomendaciones(usuarios=5_000, libros=2_000, prestamos=100_000, consultas=100_000):
+    """Mide el coste de registrar préstamos, actualizar la caché y servir recomendaciones."""
+    aleatorio = random.Random(3)
+    isbns = [f"ISBN-{i:06d}" for i in range(libros)]
+    # Popularidad tipo Zipf: pocos libros concentran la mayoría de los préstamos
+    pesos = [1 / (i + 1) for i in range(libros)]
+    eventos = list(zip(aleatorio.choices(range(usuarios), k=prestamos), aleatorio.choices(isbns, pesos, k=prestamos)))
+    motor = MotorRecomendaciones()
+
+    inicio = time.perf_counter()
+    for id_usuario, isbn in eventos:
+        motor.registrar_prestamo(id_usuario, isbn)
+    registro = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    actualizados = motor.actualizar_cache()
+    actualizacion = time.perf_counter() - inicio
+
+    consultados = aleatorio.choices(isbns, k=consultas)
+    inicio = time.perf_counter()
+    for isbn in consultados:
+        motor.recomendar(isbn)
+    servicio = time.perf_counter() - inicio
+
+    print(f"\nRecomendaciones ({prestamos:,} préstamos, {usuarios} usuarios, {libros} libros):")
+    print(f"  - Registro:     {registro * 1e6 / prestamos:.2f} µs por préstamo")
+    print(f"  - Actualización de caché: {actualizacion * 1000:.1f} ms ({actualizados} libros)")
+    print(f"  - Consulta:     {servicio * 1e9 / consultas:.0f} ns por recomendación")
+    print(f"  - Pares almacenados: {motor.total_pares():,}")
+
+
+def medir_persistencia(libros=200_000, usuarios=20_000, operaciones=50_000):
+    """
+    Mide el coste por operación de anotar en el diario (con y sin fsync), la
+    escritura de una instantánea y el tiempo de reinicio frente a reconstruir
+    la biblioteca con los métodos públicos.
+    """
+    import shutil
+    import tempfile
+
+    aleatorio = random.Random(11)
+    isbns = [f"ISBN-{i:08d}" for i in range(libros)]
+    directorio = tempfile.mkdtemp(prefix="biblioteca-")
+    print(f"\nPersistencia ({libros:,} libros, {usuarios:,} usuarios):")
+    try:
+        with contextlib.redirect_stdout(_SalidaNula()):
+            inicio = time.perf_counter()
+            biblioteca = Biblioteca()
+            for i, isbn in enumerate(isbns):
+                biblioteca.anadir_libro(Libro(f"Título {i}", f"Autor {i % 3000}", f"Categoría {i % 50}", isbn))
+            for id_usuario in range(usuarios):
+                biblioteca.registrar_usuario(Usuario(f"Lector {id_usuario}", id_usuario))
+            for isbn in isbns[::4]:
+                biblioteca.prestar_libro(isbn, aleatorio.randrange(usuarios))
+            reconstruccion = time.perf_counter() - inicio
+
+            def prestar_o_devolver(eventos):
+                inicio = time.perf_counter()
+                for isbn, id_usuario in eventos:
+                    if not biblioteca.prestar_libro(isbn, id_usuario):
+                        biblioteca.devolver_libro(isbn, id_usuario)
+                return (time.perf_counter() - inicio) / len(eventos)
+
+            def generar(cantidad):
+                return [(aleatorio.choice(isbns), aleatorio.randrange(usuarios)) for _ in range(cantidad)]
+
+            # Referencia sin diario (antes de la instantánea, para que el estado final coincida)
+            sin_diario = prestar_o_devolver(generar(operaciones))
+
+            # Pasar la biblioteca ya construida a disco con una instantánea
+            persistencia = PersistenciaBiblioteca(directorio, operaciones_por_instantanea=10 ** 9)
+            persistencia.restaurar(Biblioteca())
+            persistencia.biblioteca = biblioteca
+            biblioteca._diario = persistencia
+            inicio = time.perf_counter()
+            persistencia.tomar_instantanea(esperar=True)
+            instantanea = time.perf_counter() - inicio
+
+            costes = {False: prestar_o_devolver(generar(operaciones)) - sin_diario}
+            persistencia.sincronizar = True
+            costes[True] = prestar_o_devolver(generar(operaciones // 50)) - sin_diario
+            persistencia.cerrar()
+
+            inicio = time.perf_counter()
+            restaurada = Biblioteca()
+            PersistenciaBiblioteca(directorio).restaurar(restaurada)
+            reinicio = time.perf_counter() - inicio
+            restaurada._diario._archivo.close()
+            iguales = ({i: [l.isbn for l in u.libros_prestados] for i, u in restaurada.usuarios_registrados_obj.items()}
+                       == {i: [l.isbn for l in u.libros_prestados] for i, u in biblioteca.usuarios_registrados_obj.items()})
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    print(f"  - Reconstrucción con métodos públicos: {reconstruccion:.2f} s")
+    print(f"  - Reinicio desde disco ({operaciones + operaciones // 50:,} operaciones en el diario): {reinicio:.2f} s")
+    print(f"  - Estado restaurado idéntico: {'sí' if iguales else 'NO'}")
+    print(f"  - Escritura de instantánea: {instantanea:.2f} s")
+    print(f"  - Coste del diario por operación: {costes[False] * 1e6:.1f} µs (sin fsync), {costes[True] * 1e6:.1f} µs (con fsync)")
+
+
+def ejecutar_benchmarks():
+    """Ejecuta los benchmarks del sistema de biblioteca."""
+    medir_memoria_libros()
+    prueba_estres_concurrente()
+    medir_lotes()
+    medir_facetas()
+    simular_reservas()
+    medir_recomendaciones()
+    medir_persistencia()
+
+
 # --- Bloque de Pruebas ---
-if __name__ == "__main__":
+if __name__ == "__main__" and "--benchmark" in sys.argv:
+    ejecutar_benchmarks()
+elif __name__ == "__main__":
     # 1. Inicializar la biblioteca y crear objetos de prueba
     mi_biblioteca = Biblioteca()
 
@@ -1,76 +1,107 @@
+import os
+import sys
 import tkinter as tk
 from tkinter import ttk
 
+# Módulos compartidos con la Semana 15 (Parciaal 02/lista_virtual.py, modelo_tareas.py y monitor_tk.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lista_virtual import ListaVirtual
+from modelo_tareas import ListaTareas
+from monitor_tk import activar_si_se_pide
 
-# --- Función para agregar un elemento a la lista ---
-def agregar_item():
+
+class AplicacionGestionDatos:
     """
-    Obtiene el texto del campo de entrada y lo agrega a la lista (ListBox).
+    Vista de la aplicación: crea los widgets y pasa las acciones al modelo
+    (ListaTareas), que se puede usar y medir sin pantalla.
     """
-    # Obtener el texto del campo de entrada
-    item = entry_texto.get()
-
-    # Verificar que el campo no esté vacío
-    if item:
-        # Agregar el texto al final de la lista
-        lista_datos.insert(tk.END, item)
-        # Limpiar el campo de entrada después de agregar
-        entry_texto.delete(0, tk.END)
-
 
-# --- Función para limpiar la lista y el campo de texto ---
-def limpiar_todo():
+    def __init__(self, ventana, datos=None):
+        """
+        Args:
+            ventana: Ventana principal (tk.Tk).
+            datos (ListaTareas): Modelo con los elementos de la lista (por defecto, uno vacío).
+        """
+        # Datos mostrados en la lista; la lista virtual solo dibuja los visibles
+        self.datos = datos if datos is not None else ListaTareas()
+
+        # --- Diseño de la Interfaz con Widgets ---
+        # Crear y colocar una etiqueta de título
+        label_titulo = ttk.Label(ventana, text="Gestor de Tareas", font=("Arial", 16, "bold"))
+        label_titulo.pack(pady=10)  # pady agrega espacio vertical
+
+        # --- Marco para los controles de entrada (Entry y Botones) ---
+        frame_entrada = ttk.Frame(ventana)
+        frame_entrada.pack(pady=5)
+
+        # Crear un campo de entrada de texto
+        self.entry_texto = ttk.Entry(frame_entrada, width=30)
+        self.entry_texto.pack(side=tk.LEFT, padx=5)
+
+        # Crear el botón "Agregar" y asociarlo al método agregar_item
+        btn_agregar = ttk.Button(frame_entrada, text="Agregar", command=self.agregar_item)
+        btn_agregar.pack(side=tk.LEFT, padx=5)
+
+        # --- Lista para mostrar los datos ---
+        # Crear un marco para la lista
+        frame_lista = ttk.Frame(ventana)
+        frame_lista.pack(pady=10, fill=tk.BOTH, expand=True)
+
+        # Crear una lista virtual (con su propio scrollbar) para mostrar los datos
+        self.lista_datos = ListaVirtual(frame_lista, modelo=self.datos, formato=lambda dato: dato[0],
+                                        alto_fila=18, filas=8, ancho=360)
+        self.lista_datos.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        # --- Botón para limpiar ---
+        # Crear el botón "Limpiar" y asociarlo al método limpiar_todo
+        btn_limpiar = ttk.Button(ventana, text="Limpiar Todo", command=self.limpiar_todo)
+        btn_limpiar.pack(pady=10)
+
+    # --- Método para agregar un elemento a la lista ---
+    def agregar_item(self):
+        """
+        Obtiene el texto del campo de entrada y lo agrega a la lista.
+        """
+        # Obtener el texto del campo de entrada
+        item = self.entry_texto.get()
+
+        # Verificar que el campo no esté vacío
+        if item:
+            # Agregar el texto tal cual al final de la lista (agregar() le quitaría los espacios)
+            self.datos.insertar(len(self.datos), [(item, False)])
+            self.lista_datos.actualizar()
+            # Limpiar el campo de entrada después de agregar
+            self.entry_texto.delete(0, tk.END)
+
+    # --- Método para limpiar la lista y el campo de texto ---
+    def limpiar_todo(self):
+        """
+        Borra todos los elementos de la lista y el contenido del campo de entrada.
+        """
+        # Eliminar todos los elementos de la lista
+        self.datos.limpiar()
+        self.lista_datos.actualizar()
+
+        # Limpiar el campo de entrada
+        self.entry_texto.delete(0, tk.END)
+
+
+def main():
     """
-    Borra todos los elementos de la lista y el contenido del campo de entrada.
+    Crea la ventana principal y arranca el bucle de la aplicación.
     """
-    # Eliminar todos los elementos de la lista, desde el inicio (0) hasta el final (tk.END)
-    lista_datos.delete(0, tk.END)
-
-    # Limpiar el campo de entrada
-    entry_texto.delete(0, tk.END)
-
-
-# --- Configuración de la ventana principal ---
-# Crear la ventana principal
-ventana = tk.Tk()
-ventana.title("Aplicación de Gestión de Datos")  # Título de la ventana
-ventana.geometry("400x300")  # Tamaño inicial de la ventana
-
-# --- Diseño de la Interfaz con Widgets ---
-# Crear y colocar una etiqueta de título
-label_titulo = ttk.Label(ventana, text="Gestor de Tareas", font=("Arial", 16, "bold"))
-label_titulo.pack(pady=10)  # pady agrega espacio vertical
-
-# --- Marco para los controles de entrada (Entry y Botones) ---
-frame_entrada = ttk.Frame(ventana)
-frame_entrada.pack(pady=5)
-
-# Crear un campo de entrada de texto
-entry_texto = ttk.Entry(frame_entrada, width=30)
-entry_texto.pack(side=tk.LEFT, padx=5)
-
-# Crear el botón "Agregar" y asociarlo a la función agregar_item
-btn_agregar = ttk.Button(frame_entrada, text="Agregar", command=agregar_item)
-btn_agregar.pack(side=tk.LEFT, padx=5)
-
-# --- Lista para mostrar los datos ---
-# Crear un marco para la lista
-frame_lista = ttk.Frame(ventana)
-frame_lista.pack(pady=10, fill=tk.BOTH, expand=True)
+    # --- Configuración de la ventana principal ---
+    # Crear la ventana principal
+    ventana = tk.Tk()
+    ventana.title("Aplicación de Gestión de Datos")  # Título de la ventana
+    ventana.geometry("400x300")  # Tamaño inicial de la ventana
+    activar_si_se_pide(ventana)  # Con --monitor mide cuánto bloquea cada callback el bucle de Tk
 
-# Crear una lista (ListBox) para mostrar los datos
-lista_datos = tk.Listbox(frame_lista)
-lista_datos.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10, pady=5)
+    AplicacionGestionDatos(ventana)
 
-# Añadir un scrollbar a la lista para manejar más elementos
-scrollbar = ttk.Scrollbar(frame_lista, orient="vertical", command=lista_datos.yview)
-scrollbar.pack(side=tk.RIGHT, fill="y")
-lista_datos.config(yscrollcommand=scrollbar.set)
+    # Iniciar el bucle principal de la aplicación
+    ventana.mainloop()
 
-# --- Botón para limpiar ---
-# Crear el botón "Limpiar" y asociarlo a la función limpiar_todo
-btn_limpiar = ttk.Button(ventana, text="Limpiar Todo", command=limpiar_todo)
-btn_limpiar.pack(pady=10)
 
-# Iniciar el bucle principal de la aplicación
-ventana.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,118 +1,272 @@
+import os
+import sys
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from tkcalendar import DateEntry
 
 from datetime import datetime
 
-# Se crea la ventana principal del programa.
-root = tk.Tk()
-root.title("Agenda Personal")
-root.geometry("800x600")
-
-# Lista de eventos (se almacena en memoria).
-events = []
-
-# Configuración de estilo.
-style = ttk.Style()
-style.configure("TButton", font=("Helvetica", 10), padding=5)
-style.configure("TLabel", font=("Helvetica", 10))
-style.configure("TEntry", font=("Helvetica", 10))
-style.configure("Treeview.Heading", font=("Helvetica", 10, "bold"))
-
-# --- Frame de Entrada de Datos ---
-input_frame = ttk.Frame(root, padding="10")
-input_frame.pack(side=tk.TOP, fill=tk.X)
-
-date_label = ttk.Label(input_frame, text="Fecha:")
-date_label.grid(row=0, column=0, padx=5, pady=5, sticky="w")
-date_entry = DateEntry(input_frame, width=12, background="darkblue", foreground="white", borderwidth=2, locale='es_ES',
-                       date_pattern='dd/mm/yyyy')
-date_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
-
-time_label = ttk.Label(input_frame, text="Hora (HH:MM):")
-time_label.grid(row=0, column=2, padx=5, pady=5, sticky="w")
-time_entry = ttk.Entry(input_frame, width=10)
-time_entry.grid(row=0, column=3, padx=5, pady=5, sticky="ew")
-
-desc_label = ttk.Label(input_frame, text="Descripción:")
-desc_label.grid(row=1, column=0, padx=5, pady=5, sticky="w")
-desc_entry = ttk.Entry(input_frame, width=40)
-desc_entry.grid(row=1, column=1, columnspan=3, padx=5, pady=5, sticky="ew")
-
-# --- Frame de Botones de Acción ---
-button_frame = ttk.Frame(root, padding="10")
-button_frame.pack(side=tk.TOP, fill=tk.X)
-
-# --- Frame de Visualización de Eventos (TreeView) ---
-tree_frame = ttk.Frame(root, padding="10")
-tree_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
-
-columns = ("#1", "#2", "#3")
-tree = ttk.Treeview(tree_frame, columns=columns, show="headings")
-tree.pack(fill=tk.BOTH, expand=True)
-
-tree.heading("#1", text="Fecha")
-tree.heading("#2", text="Hora")
-tree.heading("#3", text="Descripción")
-
-tree.column("#1", width=120, anchor=tk.CENTER)
-tree.column("#2", width=80, anchor=tk.CENTER)
-tree.column("#3", width=400, anchor=tk.W)
-
-
-# --- Funciones de Manejo de Eventos ---
-def add_event():
-    """Agrega un nuevo evento a la lista y actualiza el TreeView."""
-    date = date_entry.get()
-    time = time_entry.get()
-    description = desc_entry.get().strip()
-
-    if not all([date, time, description]):
-        messagebox.showwarning("Campos Incompletos", "Por favor, complete todos los campos.")
-        return
-
-    try:
-        datetime.strptime(time, "%H:%M")
-    except ValueError:
-        messagebox.showerror("Formato de Hora Inválido", "Introduzca la hora en formato HH:MM.")
-        return
-
-    event_data = (date, time, description)
-    events.append(event_data)
-    tree.insert("", tk.END, values=event_data)
-
-    time_entry.delete(0, tk.END)
-    desc_entry.delete(0, tk.END)
-    messagebox.showinfo("Evento Agregado", "El evento ha sido agregado correctamente.")
-
-
-def delete_event():
-    """Elimina el evento seleccionado después de una confirmación."""
-    selected_item = tree.selection()
-    if not selected_item:
-        messagebox.showwarning("Selección Vacía", "Seleccione un evento para eliminar.")
-        return
-
-    if messagebox.askyesno("Confirmar Eliminación", "¿Está seguro de que desea eliminar este evento?"):
-        event_values_tuple = tree.item(selected_item[0], 'values')
+# Modelo de la agenda (sin Tk) y monitor de latencia, compartidos en Parciaal 02
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modelo_agenda import DATE_FORMAT, TIME_FORMAT, EventImporter, EventStore, ReminderScheduler, Series
+from monitor_tk import activar_si_se_pide
+
+
+def main():
+    """
+    Crea la ventana de la agenda y arranca el bucle de Tk. La interfaz solo
+    traduce las acciones del usuario al modelo (modelo_agenda.EventStore) y
+    muestra lo que este retorna.
+    """
+    # Se crea la ventana principal del programa.
+    root = tk.Tk()
+    root.title("Agenda Personal")
+    root.geometry("800x600")
+    # Con --monitor (o MONITOR_TK=1) se mide cuánto bloquea cada callback el bucle de Tk.
+    activar_si_se_pide(root)
+
+    # Eventos de la agenda (se almacenan en memoria, ordenados por fecha y hora).
+    events = EventStore()
+    # Llenado del TreeView por tramos: temporizador pendiente y si la vista quedó desactualizada
+    ROWS_PER_TURN = 500
+    fill_job = None
+    stale = False
+
+    # Configuración de estilo.
+    style = ttk.Style()
+    style.configure("TButton", font=("Helvetica", 10), padding=5)
+    style.configure("TLabel", font=("Helvetica", 10))
+    style.configure("TEntry", font=("Helvetica", 10))
+    style.configure("Treeview.Heading", font=("Helvetica", 10, "bold"))
+
+    # --- Frame de Entrada de Datos ---
+    input_frame = ttk.Frame(root, padding="10")
+    input_frame.pack(side=tk.TOP, fill=tk.X)
+
+    date_label = ttk.Label(input_frame, text="Fecha:")
+    date_label.grid(row=0, column=0, padx=5, pady=5, sticky="w")
+    date_entry = DateEntry(input_frame, width=12, background="darkblue", foreground="white", borderwidth=2, locale='es_ES',
+                           date_pattern='dd/mm/yyyy')
+    date_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+
+    time_label = ttk.Label(input_frame, text="Hora (HH:MM):")
+    time_label.grid(row=0, column=2, padx=5, pady=5, sticky="w")
+    time_entry = ttk.Entry(input_frame, width=10)
+    time_entry.grid(row=0, column=3, padx=5, pady=5, sticky="ew")
+
+    desc_label = ttk.Label(input_frame, text="Descripción:")
+    desc_label.grid(row=1, column=0, padx=5, pady=5, sticky="w")
+    desc_entry = ttk.Entry(input_frame, width=40)
+    desc_entry.grid(row=1, column=1, columnspan=3, padx=5, pady=5, sticky="ew")
+
+    # Repetición: se guarda una serie que se expande solo en la vista actual
+    REPEAT_OPTIONS = {"No se repite": None, "Cada día": "DAILY", "Cada semana": "WEEKLY", "Cada mes": "MONTHLY"}
+    repeat_label = ttk.Label(input_frame, text="Repetir:")
+    repeat_label.grid(row=0, column=4, padx=5, pady=5, sticky="w")
+    repeat_combo = ttk.Combobox(input_frame, values=tuple(REPEAT_OPTIONS), width=14, state="readonly")
+    repeat_combo.set("No se repite")
+    repeat_combo.grid(row=0, column=5, padx=5, pady=5, sticky="ew")
+
+    # --- Frame de Botones de Acción ---
+    button_frame = ttk.Frame(root, padding="10")
+    button_frame.pack(side=tk.TOP, fill=tk.X)
+
+    # --- Frame de Visualización de Eventos (TreeView) ---
+    tree_frame = ttk.Frame(root, padding="10")
+    tree_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+
+    columns = ("#1", "#2", "#3")
+    tree = ttk.Treeview(tree_frame, columns=columns, show="headings")
+    tree.pack(fill=tk.BOTH, expand=True)
+
+    tree.heading("#1", text="Fecha")
+    tree.heading("#2", text="Hora")
+    tree.heading("#3", text="Descripción")
+
+    tree.column("#1", width=120, anchor=tk.CENTER)
+    tree.column("#2", width=80, anchor=tk.CENTER)
+    tree.column("#3", width=400, anchor=tk.W)
+
+    # --- Funciones de Manejo de Eventos ---
+    def add_event():
+        """Agrega un nuevo evento a la lista y actualiza el TreeView."""
+        date = date_entry.get()
+        time = time_entry.get()
+        description = desc_entry.get().strip()
+
+        if not all([date, time, description]):
+            messagebox.showwarning("Campos Incompletos", "Por favor, complete todos los campos.")
+            return
 
         try:
-            events.remove(event_values_tuple)
-            tree.delete(selected_item[0])
-            messagebox.showinfo("Evento Eliminado", "El evento ha sido eliminado correctamente.")
+            start = datetime.strptime(f"{date} {time}", f"{DATE_FORMAT} {TIME_FORMAT}")
         except ValueError:
-            messagebox.showerror("Error", "No se pudo encontrar el evento.")
+            messagebox.showerror("Formato de Hora Inválido", "Introduzca la hora en formato HH:MM.")
+            return
+
+        freq = REPEAT_OPTIONS[repeat_combo.get()]
+        if freq:
+            reminders.add(events.add_series(start, description, freq))
+            refresh_view()
+        else:
+            event = events.add(start, description)
+            reminders.add(event)
+            # Solo se muestra si cae en la vista actual, en su posición cronológica
+            window_start, window_end = current_window()
+            if fill_job is not None:
+                refresh_view()  # A medio llenar, la posición del evento aún no tiene fila
+            elif (window_start is None or window_start <= start) and (window_end is None or start < window_end):
+                tree.insert("", events.position(event, window_start, window_end), iid=str(event.id),
+                            values=event.values())
+
+        time_entry.delete(0, tk.END)
+        desc_entry.delete(0, tk.END)
+        messagebox.showinfo("Evento Agregado", "El evento ha sido agregado correctamente.")
+
+    def delete_event():
+        """Elimina el evento seleccionado después de una confirmación."""
+        selected_item = tree.selection()
+        if not selected_item:
+            messagebox.showwarning("Selección Vacía", "Seleccione un evento para eliminar.")
+            return
+
+        iid = selected_item[0]
+        if ":" in iid:
+            # Repetición de una serie (iid "serie:fecha"): se elige entre esa fecha o la serie completa
+            series_id, stamp = iid.split(":")
+            answer = messagebox.askyesnocancel("Confirmar Eliminación",
+                                               "¿Eliminar toda la serie? (No = solo esta repetición)")
+            if answer is None:
+                return
+            if answer:
+                events.remove(int(series_id))
+                reminders.remove(int(series_id))
+            else:
+                events.exclude(int(series_id), datetime.strptime(stamp, "%Y%m%d%H%M"))
+                reminders.add(events.get(int(series_id)))
+            refresh_view()
+            return
+
+        if messagebox.askyesno("Confirmar Eliminación", "¿Está seguro de que desea eliminar este evento?"):
+            # El iid de cada fila es el id del evento: se borra exactamente ese, aunque haya duplicados
+            if events.remove(int(iid)) is not None:
+                reminders.remove(int(iid))
+                tree.delete(iid)
+                messagebox.showinfo("Evento Eliminado", "El evento ha sido eliminado correctamente.")
+            else:
+                messagebox.showerror("Error", "No se pudo encontrar el evento.")
+
+    def show_reminder(event):
+        """Muestra el aviso de un evento cuya hora llegó."""
+        messagebox.showinfo("Recordatorio", f"{event.start.strftime(TIME_FORMAT)} - {event.description}")
+
+    def current_window():
+        """Límites [inicio, fin) de la vista elegida alrededor de la fecha seleccionada."""
+        return EventStore.window(view_combo.get(), date_entry.get_date())
+
+    def refresh_view(event=None):
+        """
+        Carga en el TreeView solo los eventos del rango de la vista actual, por tramos
+        de ROWS_PER_TURN filas para no bloquear la ventana (la vista "Todo" puede
+        tener cientos de miles).
+        """
+        nonlocal fill_job, stale
+        if fill_job is not None:
+            root.after_cancel(fill_job)
+            fill_job = None
+        stale = False
+        tree.delete(*tree.get_children())
+        fill_rows(events.range(*current_window()), 0)
+
+    def fill_rows(items, first):
+        """Inserta un tramo de filas y programa el siguiente."""
+        nonlocal fill_job
+        for item in items[first:first + ROWS_PER_TURN]:
+            tree.insert("", tk.END, iid=str(item.id), values=item.values())
+        first += ROWS_PER_TURN
+        fill_job = root.after(1, fill_rows, items, first) if first < len(items) else None
+
+    def import_events():
+        """Pide un fichero .ics o .csv (fecha,hora,descripción) y lo importa en segundo plano."""
+        path = filedialog.askopenfilename(title="Importar calendario",
+                                          filetypes=[("Calendarios", "*.ics *.csv"), ("Todos los archivos", "*.*")])
+        if not path or importer.running:
+            return
+        import_button.config(state=tk.DISABLED)
+        cancel_import_button.config(state=tk.NORMAL)
+        importer.start(path)
+
+    def on_imported(added):
+        """Programa los avisos de un bloque importado y muestra sus filas si caen en la vista."""
+        nonlocal stale
+        if fill_job is not None:
+            # La vista todavía se está llenando: sus posiciones no valen, se recarga al terminar
+            stale = True
+        window_start, window_end = current_window()
+        visible = []
+        for item in added:
+            reminders.add(item)
+            if isinstance(item, Series):
+                continue  # Las series se muestran al terminar (refresh_view)
+            if (window_start is None or window_start <= item.start) and (window_end is None or item.start < window_end):
+                visible.append(item)
+        if stale:
+            return
+        # El bloque entero ya está en el almacén: insertando en orden, position() solo
+        # cuenta los eventos del bloque que ya tienen su fila en el TreeView
+        visible.sort(key=lambda item: (item.start, item.id))
+        for item in visible:
+            tree.insert("", events.position(item, window_start, window_end), iid=str(item.id), values=item.values())
+
+    def on_import_progress(fraction):
+        import_progress["value"] = fraction * 100
+
+    def on_import_done(imported, invalid, cancelled, error):
+        import_button.config(state=tk.NORMAL)
+        cancel_import_button.config(state=tk.DISABLED)
+        import_progress["value"] = 0
+        if importer.series or stale:
+            refresh_view()
+        if error:
+            messagebox.showerror("Error de Importación", f"No se pudo leer el archivo: {error}")
+        else:
+            status = "Importación cancelada" if cancelled else "Importación terminada"
+            messagebox.showinfo(status, f"Eventos importados: {imported}. Filas no válidas: {invalid}.")
+
+    # Botones con sus comandos
+    add_button = ttk.Button(button_frame, text="Agregar Evento", command=add_event)
+    add_button.pack(side=tk.LEFT, padx=5)
+
+    delete_button = ttk.Button(button_frame, text="Eliminar Evento Seleccionado", command=delete_event)
+    delete_button.pack(side=tk.LEFT, padx=5)
+
+    exit_button = ttk.Button(button_frame, text="Salir", command=root.quit)
+    exit_button.pack(side=tk.RIGHT, padx=5)
+
+    # Vista: eventos del día, la semana o el mes de la fecha seleccionada, o todos.
+    # Empieza en una vista acotada: "Todo" se llena por tramos y puede tardar
+    view_combo = ttk.Combobox(button_frame, values=("Todo", "Día", "Semana", "Mes"), width=8, state="readonly")
+    view_combo.set("Semana")
+    view_combo.pack(side=tk.RIGHT, padx=5)
+    ttk.Label(button_frame, text="Vista:").pack(side=tk.RIGHT)
+    view_combo.bind("<<ComboboxSelected>>", refresh_view)
+    date_entry.bind("<<DateEntrySelected>>", refresh_view)
 
+    # Recordatorios: un solo temporizador de Tk armado para el próximo evento
+    reminders = ReminderScheduler(root, show_reminder)
 
-# Botones con sus comandos
-add_button = ttk.Button(button_frame, text="Agregar Evento", command=add_event)
-add_button.pack(side=tk.LEFT, padx=5)
+    # Importación de calendarios por bloques, con progreso y cancelación
+    importer = EventImporter(root, events, on_imported, on_import_progress, on_import_done)
+    import_button = ttk.Button(button_frame, text="Importar...", command=import_events)
+    import_button.pack(side=tk.LEFT, padx=5)
+    cancel_import_button = ttk.Button(button_frame, text="Cancelar", command=importer.cancel, state=tk.DISABLED)
+    cancel_import_button.pack(side=tk.LEFT, padx=5)
+    import_progress = ttk.Progressbar(button_frame, length=120, maximum=100)
+    import_progress.pack(side=tk.LEFT, padx=5)
 
-delete_button = ttk.Button(button_frame, text="Eliminar Evento Seleccionado", command=delete_event)
-delete_button.pack(side=tk.LEFT, padx=5)
+    # Bucle principal para mantener la ventana abierta
+    root.mainloop()
 
-exit_button = ttk.Button(button_frame, text="Salir", command=root.quit)
-exit_button.pack(side=tk.RIGHT, padx=5)
 
-# Bucle principal para mantener la ventana abierta
-root.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
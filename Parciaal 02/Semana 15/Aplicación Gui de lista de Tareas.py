@@ -1,22 +1,234 @@
+import csv
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
 import tkinter as tk
 from tkinter import messagebox
 
+# Módulos compartidos con la Semana 13 (Parciaal 02/lista_virtual.py, modelo_tareas.py y monitor_tk.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lista_virtual import LienzoSinPantalla, ListaVirtual
+from modelo_tareas import FiltroTareas, ListaTareas
+from monitor_tk import activar_si_se_pide
+
+# Estilo de las filas de tareas completadas
+ESTILO_COMPLETADA = {'bg': '#d9d9d9', 'fg': 'gray'}
+
+# Fichero donde se guardan las tareas entre ejecuciones
+RUTA_TAREAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tareas.csv")
+
+
+class AlmacenTareas:
+    """
+    Guarda la lista de tareas en un fichero CSV desde un hilo de fondo, para no
+    bloquear el bucle de Tk. Los cambios seguidos se agrupan: se escribe una sola
+    vez cuando pasan 'espera' segundos sin cambios nuevos. Cada escritura va a un
+    fichero temporal que reemplaza al anterior de forma atómica.
+    """
+
+    def __init__(self, ruta, espera=0.5):
+        """
+        Inicia el hilo de escritura.
+
+        Args:
+            ruta (str): Fichero de las tareas.
+            espera (float): Segundos sin cambios antes de escribir.
+        """
+        self.ruta = ruta
+        self.espera = espera
+        self.escrituras = 0
+        self.ultima_duracion = 0.0  # Segundos que tardó la última escritura
+        self.solo_lectura = False  # Se activa si el fichero no se pudo leer, para no escribir encima
+        self._tareas = None  # Lista a guardar (se copia en el hilo al escribir)
+        self._ultimo_cambio = None  # Momento del último cambio pendiente de guardar
+        self._cargado = False  # No se escribe hasta terminar de cargar, para no perder tareas
+        self._activo = True
+        self._condicion = threading.Condition()
+        self._hilo = threading.Thread(target=self._escritor, daemon=True)
+        self._hilo.start()
+
+    def cargar(self, tamano_bloque=5_000):
+        """
+        Lee el fichero en un hilo de fondo y entrega las tareas por bloques, para que
+        la ventana aparezca antes de terminar de leer un fichero grande.
+
+        Args:
+            tamano_bloque (int): Tareas por bloque.
+
+        Returns:
+            queue.Queue: Bloques (listas de tuplas (texto, completada)); None marca el final.
+        """
+        bloques = queue.Queue()
+
+        def leer():
+            bloque = []
+            try:
+                with open(self.ruta, newline="", encoding="utf-8") as archivo:
+                    for completada, texto in csv.reader(archivo):
+                        bloque.append((texto, completada == "1"))
+                        if len(bloque) == tamano_bloque:
+                            bloques.put(bloque)
+                            bloque = []
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, csv.Error) as error:
+                print(f"Error al cargar las tareas de {self.ruta}: {error}", file=sys.stderr)
+                self.solo_lectura = True
+            if bloque:
+                bloques.put(bloque)
+            bloques.put(None)
+
+        threading.Thread(target=leer, daemon=True).start()
+        return bloques
+
+    def carga_terminada(self):
+        """
+        Indica que las tareas cargadas ya están en la lista; desde ahora se puede guardar.
+        """
+        with self._condicion:
+            self._cargado = True
+            self._condicion.notify()
+
+    @property
+    def hay_cambios(self):
+        """Indica si hay cambios que todavía no se escribieron."""
+        return self._ultimo_cambio is not None
+
+    def programar(self, tareas):
+        """
+        Marca la lista como modificada. Es O(1): la copia y la escritura ocurren en el hilo de fondo.
+
+        Args:
+            tareas (ListaTareas): Las tareas (texto, completada) a guardar.
+        """
+        with self._condicion:
+            self._tareas = tareas
+            self._ultimo_cambio = time.monotonic()
+            self._condicion.notify()
+
+    def _escritor(self):
+        with self._condicion:
+            while True:
+                while self._activo and (self._ultimo_cambio is None or not self._cargado):
+                    self._condicion.wait()
+                if self._ultimo_cambio is None or not self._cargado:
+                    return  # Cerrado sin cambios pendientes (o antes de terminar la carga)
+                restante = self._ultimo_cambio + self.espera - time.monotonic()
+                if restante > 0 and self._activo:
+                    self._condicion.wait(restante)
+                    continue
+                # list() recorre la lista interna sin soltar el GIL: se copia un estado consistente
+                tareas = list(self._tareas)
+                self._ultimo_cambio = None
+                self._condicion.release()
+                try:
+                    self._escribir(tareas)
+                finally:
+                    self._condicion.acquire()
+
+    def _escribir(self, tareas):
+        if self.solo_lectura:
+            return
+        inicio = time.perf_counter()
+        temporal = self.ruta + ".tmp"
+        try:
+            with open(temporal, "w", newline="", encoding="utf-8") as archivo:
+                csv.writer(archivo).writerows((int(completada), texto) for texto, completada in tareas)
+                archivo.flush()
+                os.fsync(archivo.fileno())
+            os.replace(temporal, self.ruta)
+            self.escrituras += 1
+        except OSError as error:
+            print(f"Error al guardar las tareas en {self.ruta}: {error}", file=sys.stderr)
+        self.ultima_duracion = time.perf_counter() - inicio
+
+    def cerrar(self):
+        """
+        Escribe los cambios pendientes sin esperar y detiene el hilo.
+        """
+        with self._condicion:
+            self._activo = False
+            self._condicion.notify()
+        self._hilo.join()
+
+
+class RenderizadorLista:
+    """
+    Mantiene un Listbox sincronizado con una lista de tareas (texto, completada)
+    tocando solo las filas que cambiaron desde la última actualización. La
+    aplicación usa ListaVirtual; este renderizador sirve cuando se prefiere un
+    Listbox normal con listas cortas.
+    """
+
+    def __init__(self, listbox):
+        self.listbox = listbox
+        self.mostradas = []  # Copia de las tareas tal como están ahora en el Listbox
+
+    @staticmethod
+    def texto_fila(texto, completada):
+        # Formato condicional: añade un prefijo (✔) si está completada
+        return f"✔ {texto}" if completada else texto
+
+    def actualizar(self, tareas):
+        """
+        Aplica al Listbox la diferencia entre las tareas mostradas y las nuevas:
+        se conservan el prefijo y el sufijo comunes y solo se reemplazan, borran o
+        insertan las filas del medio.
+        """
+        mostradas = self.mostradas
+        inicio = 0
+        limite = min(len(mostradas), len(tareas))
+        while inicio < limite and mostradas[inicio] == tareas[inicio]:
+            inicio += 1
+        fin_viejo, fin_nuevo = len(mostradas), len(tareas)
+        while fin_viejo > inicio and fin_nuevo > inicio and mostradas[fin_viejo - 1] == tareas[fin_nuevo - 1]:
+            fin_viejo -= 1
+            fin_nuevo -= 1
+
+        # Filas que existen en ambas versiones: se reemplazan solo las distintas
+        comunes = min(fin_viejo, fin_nuevo) - inicio
+        for i in range(inicio, inicio + comunes):
+            if mostradas[i] != tareas[i]:
+                self.listbox.delete(i)
+                self._insertar(i, *tareas[i])
+        # Filas sobrantes o nuevas
+        if fin_viejo > fin_nuevo:
+            self.listbox.delete(inicio + comunes, fin_viejo - 1)
+        else:
+            for i in range(inicio + comunes, fin_nuevo):
+                self._insertar(i, *tareas[i])
+        self.mostradas = list(tareas)
+
+    def _insertar(self, indice, texto, completada):
+        self.listbox.insert(indice, self.texto_fila(texto, completada))
+        if completada:
+            # El Listbox maneja estilos por fila; las filas nuevas ya tienen el estilo normal
+            self.listbox.itemconfig(indice, ESTILO_COMPLETADA)
+
 
 class AplicacionListaTareas:
     """
-    Clase principal que gestiona la interfaz gráfica de usuario (GUI)
-    y la lógica de la aplicación de Lista de Tareas.
+    Clase principal que gestiona la interfaz gráfica de usuario (GUI) de la
+    aplicación de Lista de Tareas. La lógica está en el modelo (ListaTareas):
+    los manejadores de eventos solo le pasan las acciones, a través del filtro
+    (FiltroTareas) que decide qué tareas se ven, y refrescan la lista.
     """
 
-    def __init__(self, master):
+    def __init__(self, master, ruta_datos=RUTA_TAREAS):
         # Configuración de la ventana principal
         self.master = master
         master.title("Lista de Tareas - Gemini")
-        master.geometry("450x400")  # Establece un tamaño inicial
+        master.geometry("450x440")  # Establece un tamaño inicial
 
-        # Lista interna para almacenar el estado de las tareas (texto y si está completada)
-        # Esto es crucial para la lógica de marcado visual.
-        self.tareas = []
+        # Modelo con el estado de las tareas (texto y si está completada)
+        # Esto es crucial para la lógica de marcado visual. El índice de palabras del
+        # filtro se mantiene desde el principio: las tareas se indexan al cargarlas.
+        self.tareas = ListaTareas(indexar=True)
+        # Tareas visibles según el texto del filtro (todas si está vacío)
+        self.filtro = FiltroTareas(self.tareas)
 
         # --- Configuración de Widgets ---
 
@@ -28,63 +240,145 @@ class AplicacionListaTareas:
         self.btn_anadir = tk.Button(master, text="Añadir Tarea", command=self.anadir_tarea, bg='#4CAF50', fg='white')
         self.btn_anadir.grid(row=0, column=2, padx=5, pady=10)
 
-        # 3. Componente de Lista (Listbox) para mostrar tareas
-        # El Listbox almacenará solo el texto visible, la lógica de estado se maneja en 'self.tareas'.
-        self.lista_tareas_gui = tk.Listbox(master, height=15, width=60, selectmode=tk.SINGLE, font=('Arial', 10))
-        self.lista_tareas_gui.grid(row=1, column=0, padx=10, pady=10, columnspan=3)
-
-        # 4. Botones de Acción
+        # 3. Campo para filtrar las tareas mientras se escribe
+        self.texto_filtro = tk.StringVar()
+        marco_filtro = tk.Frame(master)
+        marco_filtro.grid(row=1, column=0, padx=10, columnspan=3, sticky="w")
+        tk.Label(marco_filtro, text="Filtrar:").pack(side=tk.LEFT)
+        self.entrada_filtro = tk.Entry(marco_filtro, textvariable=self.texto_filtro, width=40, font=('Arial', 10))
+        self.entrada_filtro.pack(side=tk.LEFT, padx=5)
+
+        # 4. Componente de Lista para mostrar tareas
+        # Lista virtual: lee 'self.filtro' y solo dibuja las filas visibles, así que
+        # funciona igual con miles o millones de tareas.
+        self.lista_tareas_gui = ListaVirtual(master, modelo=self.filtro,
+                                             formato=lambda tarea: RenderizadorLista.texto_fila(*tarea),
+                                             estilo=lambda tarea: ESTILO_COMPLETADA if tarea[1] else None,
+                                             alto_fila=18, filas=15, ancho=410, fuente=('Arial', 10))
+        self.lista_tareas_gui.grid(row=2, column=0, padx=10, pady=10, columnspan=3)
+
+        # 5. Botones de Acción
         self.btn_completar = tk.Button(master, text="Marcar como Completada", command=self.marcar_completada,
                                        bg='#2196F3', fg='white')
-        self.btn_completar.grid(row=2, column=0, padx=10, pady=5)
+        self.btn_completar.grid(row=3, column=0, padx=10, pady=5)
 
         self.btn_eliminar = tk.Button(master, text="Eliminar Tarea", command=self.eliminar_tarea, bg='#F44336',
                                       fg='white')
-        self.btn_eliminar.grid(row=2, column=2, padx=10, pady=5)
+        self.btn_eliminar.grid(row=3, column=2, padx=10, pady=5)
 
         # --- Manejo de Eventos Adicionales ---
 
         # Permite añadir tarea al presionar la tecla ENTER en el campo de entrada
         self.entrada_tarea.bind('<Return>', lambda event: self.anadir_tarea())
 
+        # Cada cambio del texto del filtro (teclas, pegar, borrar) refiltra la lista
+        self.texto_filtro.trace_add("write", lambda *argumentos: self.filtrar_tareas())
+
         # Opcional: Permite marcar como completada al hacer doble clic en un elemento de la lista
         self.lista_tareas_gui.bind('<Double-1>', lambda event: self.marcar_completada())
 
+        # --- Persistencia ---
+        # Las tareas guardadas se cargan por bloques después de mostrar la ventana
+        # y cada cambio se guarda en segundo plano. Con ruta_datos=None no se guarda nada.
+        self.almacen = AlmacenTareas(ruta_datos) if ruta_datos else None
+        if self.almacen:
+            self._bloques = self.almacen.cargar(tamano_bloque=2_000)
+            self._cargadas = 0
+            self._cargando = True
+            master.after(0, self._recibir_bloques)
+            master.protocol("WM_DELETE_WINDOW", self.cerrar)
+
     # ----------------------------------------------------------------------
     # --- Lógica de la Aplicación y Manejadores de Eventos ---
     # ----------------------------------------------------------------------
 
     def actualizar_lista_gui(self):
         """
-        Refresca el Listbox (GUI) basándose en el contenido de la lista interna 'self.tareas'.
-        Esto permite aplicar el marcado visual de tareas completadas.
+        Refresca la lista (GUI) basándose en el contenido del modelo 'self.tareas'.
+        Esto permite aplicar el marcado visual de tareas completadas. Solo se
+        redibujan las filas visibles que cambiaron.
         """
-        self.lista_tareas_gui.delete(0, tk.END)  # Borra todo el contenido actual del Listbox
+        self.lista_tareas_gui.actualizar()
 
-        for i, (texto, completada) in enumerate(self.tareas):
-            # Formato condicional: añade un prefijo (✔) si está completada
-            display_texto = f"✔ {texto}" if completada else texto
-            self.lista_tareas_gui.insert(tk.END, display_texto)
+    def _tareas_modificadas(self):
+        """
+        Refresca la lista y programa el guardado de las tareas.
+        """
+        # Como el Listbox al redibujarse, se anula la selección (y se redibuja): tras
+        # eliminar, el mismo índice ya señala otra tarea
+        self.lista_tareas_gui.selection_clear()
+        if self.almacen:
+            self.almacen.programar(self.tareas)
 
-            # Aplica color de fondo gris claro para tareas completadas
-            if completada:
-                # El Listbox maneja etiquetas (tags) para aplicar estilos
-                self.lista_tareas_gui.itemconfig(tk.END, {'bg': '#d9d9d9', 'fg': 'gray'})
+    def _recibir_bloques(self):
+        """
+        Añade a la lista los bloques ya leídos del fichero, sin bloquear la ventana
+        (unos 15 ms por turno, incluido indexarlos para el filtro). Las tareas
+        cargadas quedan antes de las añadidas mientras se cargaba.
+        """
+        limite = time.perf_counter() + 0.015
+        try:
+            while True:
+                bloque = self._bloques.get_nowait()
+                if bloque is None:
+                    self._cargando = False
+                    self.almacen.carga_terminada()
+                    self.actualizar_lista_gui()
+                    return
+                seleccion = self.lista_tareas_gui.curselection()
+                if seleccion and (self.filtro.consulta or seleccion[0] >= self._cargadas):
+                    # La fila seleccionada se desplaza con el bloque insertado
+                    self.lista_tareas_gui.selection_clear()
+                self.filtro.insertar(self._cargadas, bloque)
+                self._cargadas += len(bloque)
+                if time.perf_counter() >= limite:
+                    break
+        except queue.Empty:
+            pass
+        self.actualizar_lista_gui()
+        self.master.after(20, self._recibir_bloques)
+
+    def cerrar(self):
+        """
+        Guarda los cambios pendientes y cierra la ventana. Si se cierra con cambios
+        antes de terminar la carga, primero se leen las tareas restantes: el almacén
+        no escribe una lista incompleta y esos cambios se perderían.
+        """
+        if self.almacen:
+            if self._cargando and self.almacen.hay_cambios:
+                bloque = self._bloques.get()
+                while bloque is not None:
+                    self.filtro.insertar(self._cargadas, bloque)
+                    self._cargadas += len(bloque)
+                    bloque = self._bloques.get()
+                self._cargando = False
+                self.almacen.carga_terminada()
+            self.almacen.cerrar()
+        self.master.destroy()
+
+    def filtrar_tareas(self):
+        """
+        Manejador del campo de filtro: aplica el texto escrito. Al alargar la consulta
+        solo se reduce el resultado anterior, y la lista redibuja solo las filas
+        visibles que cambiaron.
+        """
+        if self.filtro.filtrar(self.texto_filtro.get()):
+            self.lista_tareas_gui.selection_clear()
+            self.lista_tareas_gui.yview("moveto", 0)
 
     def anadir_tarea(self):
         """
         Manejador de evento para añadir una nueva tarea.
         Se llama al hacer clic en 'Añadir Tarea' o al presionar 'Enter'.
         """
-        nueva_tarea = self.entrada_tarea.get().strip()  # Obtiene y limpia el texto de entrada
-
-        if nueva_tarea:
-            # Añade la tarea a la lista interna: (texto, estado_completada=False)
-            self.tareas.append((nueva_tarea, False))
-            self.entrada_tarea.delete(0, tk.END)  # Limpia el campo de entrada
-            self.actualizar_lista_gui()
-        else:
+        try:
+            # Añade la tarea al modelo: (texto, estado_completada=False); el texto vacío se rechaza
+            self.filtro.agregar(self.entrada_tarea.get())
+        except ValueError:
             messagebox.showwarning("Advertencia", "Por favor, introduce una tarea.")
+            return
+        self.entrada_tarea.delete(0, tk.END)  # Limpia el campo de entrada
+        self._tareas_modificadas()
 
     def marcar_completada(self):
         """
@@ -92,18 +386,13 @@ class AplicacionListaTareas:
         Se llama al hacer clic en 'Marcar como Completada' o al hacer doble clic.
         """
         try:
-            # Obtiene el índice de la tarea seleccionada en el Listbox
+            # Obtiene el índice de la tarea seleccionada en la lista
             indice_seleccionado = self.lista_tareas_gui.curselection()[0]
 
-            # Actualiza el estado de la tarea en la lista interna 'self.tareas'
-            texto_actual, estado_actual = self.tareas[indice_seleccionado]
-            # Invierte el estado: Si está False, pasa a True; si está True, pasa a False
-            nuevo_estado = not estado_actual
+            # Invierte el estado en el modelo: Si está False, pasa a True; si está True, pasa a False
+            self.filtro.alternar(indice_seleccionado)
 
-            # Reemplaza el elemento en la lista interna con el nuevo estado
-            self.tareas[indice_seleccionado] = (texto_actual, nuevo_estado)
-
-            self.actualizar_lista_gui()
+            self._tareas_modificadas()
 
         except IndexError:
             messagebox.showwarning("Advertencia", "Debes seleccionar una tarea para marcarla.")
@@ -116,23 +405,152 @@ class AplicacionListaTareas:
             # Obtiene el índice de la tarea seleccionada
             indice_seleccionado = self.lista_tareas_gui.curselection()[0]
 
-            # Elimina el elemento de la lista interna
-            del self.tareas[indice_seleccionado]
+            # Elimina la tarea del modelo
+            self.filtro.eliminar(indice_seleccionado)
 
-            self.actualizar_lista_gui()
+            self._tareas_modificadas()
 
         except IndexError:
             messagebox.showwarning("Advertencia", "Debes seleccionar una tarea para eliminarla.")
 
 
+# ----------------------------------------------------------------------
+# --- Benchmark sin pantalla ---
+# ----------------------------------------------------------------------
+
+class _ListboxContador:
+    """
+    Sustituto de Listbox que solo cuenta las llamadas a Tk (para medir sin pantalla).
+    """
+
+    def __init__(self):
+        self.llamadas = 0
+        self.filas = 0
+
+    def insert(self, indice, *elementos):
+        self.llamadas += 1
+        self.filas += len(elementos)
+
+    def delete(self, primero, ultimo=None):
+        self.llamadas += 1
+        if ultimo is None:
+            self.filas -= 1
+        else:
+            ultimo = self.filas - 1 if ultimo == tk.END else ultimo
+            self.filas -= ultimo - primero + 1
+
+    def itemconfig(self, indice, opciones):
+        self.llamadas += 1
+
+
+def _redibujar_todo(listbox, tareas):
+    """Estrategia anterior: borrar el Listbox y volver a insertar todas las tareas."""
+    listbox.delete(0, tk.END)
+    for texto, completada in tareas:
+        listbox.insert(tk.END, RenderizadorLista.texto_fila(texto, completada))
+        if completada:
+            listbox.itemconfig(tk.END, ESTILO_COMPLETADA)
+
+
+def ejecutar_benchmark(tareas=5_000, operaciones=300):
+    """
+    Cuenta las llamadas a Tk por operación (añadir, marcar, eliminar) con una
+    lista de tareas grande, redibujando todo frente a actualizar por diferencias.
+
+    Args:
+        tareas (int): Tareas iniciales (un tercio completadas).
+        operaciones (int): Operaciones de cada tipo.
+    """
+    print(f"Llamadas a Tk por operación con {tareas:,} tareas:")
+    for nombre in ("Redibujar todo", "Por diferencias", "Lista virtual"):
+        lista = [(f"Tarea {i}", i % 3 == 0) for i in range(tareas)]
+        if nombre == "Lista virtual":
+            listbox = LienzoSinPantalla()
+            virtual = ListaVirtual.sin_pantalla(listbox, listbox, lista,
+                                                formato=lambda tarea: RenderizadorLista.texto_fila(*tarea),
+                                                estilo=lambda tarea: ESTILO_COMPLETADA if tarea[1] else None)
+            refrescar = lambda t: virtual.actualizar()
+        else:
+            listbox = _ListboxContador()
+            renderizador = RenderizadorLista(listbox)
+            refrescar = renderizador.actualizar if nombre == "Por diferencias" else lambda t: _redibujar_todo(listbox, t)
+        refrescar(lista)
+        resultados = []
+        for operacion in ("añadir", "marcar", "eliminar"):
+            listbox.llamadas = 0
+            inicio = time.perf_counter()
+            for i in range(operaciones):
+                if operacion == "añadir":
+                    lista.append((f"Nueva {i}", False))
+                elif operacion == "marcar":
+                    indice = (i * 7919) % len(lista)
+                    texto, completada = lista[indice]
+                    lista[indice] = (texto, not completada)
+                else:
+                    del lista[(i * 7919) % len(lista)]
+                refrescar(lista)
+            duracion = (time.perf_counter() - inicio) / operaciones
+            resultados.append(f"{operacion} {listbox.llamadas / operaciones:,.1f} ({duracion * 1e6:,.0f} µs)")
+        if nombre != "Lista virtual" and listbox.filas != len(lista):
+            print("  Error: el Listbox quedó desincronizado.")
+        print(f"  - {nombre}: " + ", ".join(resultados))
+
+
+
+def medir_persistencia(tareas=1_000_000, ediciones=1_000):
+    """
+    Mide el coste en el hilo de Tk de programar el guardado, cuántas escrituras
+    produce una ráfaga de ediciones y cuánto tarda en llegar el primer bloque al
+    cargar un fichero grande frente a leerlo completo.
+
+    Args:
+        tareas (int): Tareas en la lista.
+        ediciones (int): Ediciones seguidas de la ráfaga.
+    """
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "tareas.csv")
+        lista = [(f"Tarea {i}", i % 3 == 0) for i in range(tareas)]
+        almacen = AlmacenTareas(ruta, espera=0.2)
+        almacen.carga_terminada()
+        inicio = time.perf_counter()
+        for i in range(ediciones):
+            texto, completada = lista[i]
+            lista[i] = (texto, not completada)
+            almacen.programar(lista)
+        programar = (time.perf_counter() - inicio) / ediciones
+        almacen.cerrar()
+        escrituras, escritura = almacen.escrituras, almacen.ultima_duracion
+
+        almacen = AlmacenTareas(ruta)
+        inicio = time.perf_counter()
+        bloques = almacen.cargar()
+        cargadas = len(bloques.get())
+        primer_bloque = time.perf_counter() - inicio
+        while (bloque := bloques.get()) is not None:
+            cargadas += len(bloque)
+        completa = time.perf_counter() - inicio
+        almacen.cerrar()
+
+    print(f"\nPersistencia de {tareas:,} tareas:")
+    print(f"  - Programar el guardado en el hilo de Tk: {programar * 1e6:.1f} µs por edición")
+    print(f"  - {ediciones:,} ediciones seguidas -> {escrituras} escritura(s) de {escritura * 1000:,.0f} ms en segundo plano")
+    print(f"  - Carga: primer bloque en {primer_bloque * 1000:.1f} ms, {cargadas:,} tareas en {completa * 1000:,.0f} ms")
+
+
 # ----------------------------------------------------------------------
 # --- Ejecución de la Aplicación ---
 # ----------------------------------------------------------------------
 
-if __name__ == "__main__":
+if __name__ == "__main__" and "--benchmark" in sys.argv:
+    ejecutar_benchmark()
+    medir_persistencia()
+elif __name__ == "__main__":
     # Crea la ventana raíz de Tkinter
     root = tk.Tk()
 
+    # Con --monitor (o MONITOR_TK=1) mide cuánto bloquea cada callback el bucle de Tk
+    activar_si_se_pide(root)
+
     # Crea una instancia de la aplicación
     app = AplicacionListaTareas(root)
 
@@ -0,0 +1,167 @@
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from lista_virtual import LienzoSinPantalla, ListaVirtual
+from modelo_agenda import EventStore, ReminderScheduler
+from modelo_tareas import FiltroTareas, ListaTareas, palabras
+
+# Vocabulario de las tareas del benchmark del filtro
+PALABRAS_TAREAS = ("comprar", "leche", "pan", "llamar", "médico", "pagar", "luz", "agua", "enviar", "correo",
+                   "revisar", "informe", "limpiar", "cocina", "lavar", "ropa", "estudiar", "examen", "reunión",
+                   "equipo", "regar", "plantas", "reservar", "mesa", "cortar", "césped", "recoger", "paquete")
+
+
+class _RaizSinPantalla:
+    """Sustituto de la ventana de Tk para el planificador: after solo devuelve un id."""
+
+    def __init__(self):
+        self._siguiente = 0
+
+    def after(self, ms, funcion):
+        self._siguiente += 1
+        return self._siguiente
+
+    def after_cancel(self, temporizador):
+        pass
+
+
+def _medir(nombre, operaciones, funcion):
+    """Ejecuta funcion() y muestra el tiempo total y por operación."""
+    inicio = time.perf_counter()
+    resultado = funcion()
+    duracion = time.perf_counter() - inicio
+    print(f"  - {nombre}: {duracion * 1000:,.1f} ms ({duracion / operaciones * 1e6:,.2f} µs por operación)")
+    return resultado
+
+
+def medir_lista_tareas(elementos=1_000_000, operaciones=10_000, semilla=1):
+    """
+    Mide el modelo de la lista de tareas con un millón de tareas: añadir, marcar,
+    buscar y eliminar, sin crear ninguna ventana.
+
+    Args:
+        elementos (int): Tareas en la lista.
+        operaciones (int): Operaciones de cada tipo sobre la lista llena.
+        semilla (int): Semilla de los índices aleatorios.
+    """
+    azar = random.Random(semilla)
+    tareas = ListaTareas()
+    print(f"Lista de tareas con {elementos:,} tareas:")
+    _medir("Añadir", elementos, lambda: [tareas.agregar(f"Tarea {i}") for i in range(elementos)])
+    indices = [azar.randrange(elementos) for _ in range(operaciones)]
+    _medir("Marcar o desmarcar", operaciones, lambda: [tareas.alternar(i) for i in indices])
+    _medir("Contar completadas", operaciones, lambda: [tareas.completadas for _ in range(operaciones)])
+    encontradas = _medir("Buscar un texto (recorre la lista)", 1, lambda: tareas.buscar("tarea 99999"))
+    _medir("Eliminar la última", operaciones, lambda: [tareas.eliminar(-1) for _ in range(operaciones)])
+    _medir("Eliminar una del medio (desplaza las siguientes)", operaciones,
+           lambda: [tareas.eliminar(azar.randrange(len(tareas))) for _ in range(operaciones)])
+    print(f"    ({len(encontradas)} coincidencias; quedan {len(tareas):,} tareas, {tareas.completadas:,} completadas)")
+
+
+def medir_filtro(elementos=1_000_000, consulta="comprar leche", semilla=1):
+    """
+    Mide el filtro mientras se escribe sobre un millón de tareas: el coste de
+    indexar cada bloque al cargar (como la Semana 15), y la consulta tecleada letra
+    a letra y luego borrada, con el filtro incremental y con el recorrido completo
+    de la lista en cada tecla, contando las llamadas a Tk de la lista virtual.
+
+    Args:
+        elementos (int): Tareas en la lista.
+        consulta (str): Texto que se escribe.
+        semilla (int): Semilla de los textos aleatorios.
+    """
+    azar = random.Random(semilla)
+    textos = [(" ".join(azar.sample(PALABRAS_TAREAS, 3)) + f" {i}", i % 3 == 0) for i in range(elementos)]
+    tareas = ListaTareas(indexar=True)
+    filtro = FiltroTareas(tareas)
+    print(f"\nFiltro mientras se escribe \"{consulta}\" sobre {elementos:,} tareas:")
+    bloques = []
+    for i in range(0, elementos, 2_000):
+        inicio = time.perf_counter()
+        filtro.insertar(len(tareas), textos[i:i + 2_000])
+        bloques.append(time.perf_counter() - inicio)
+    print(f"  - Cargar e indexar por bloques de 2.000: {sum(bloques):,.1f} s en total, "
+          f"{sum(bloques) / len(bloques) * 1000:.1f} ms por bloque (peor {max(bloques) * 1000:.1f} ms)")
+    lienzo = LienzoSinPantalla()
+    lista = ListaVirtual.sin_pantalla(lienzo, lienzo, filtro, formato=lambda tarea: tarea[0])
+    teclas = [consulta[:i] for i in range(1, len(consulta) + 1)]
+    teclas += teclas[-2::-1] + [""]  # Y se borra letra a letra
+    duraciones, llamadas = [], 0
+    for texto in teclas:
+        lienzo.llamadas = 0
+        inicio = time.perf_counter()
+        if filtro.filtrar(texto):
+            lista.selection_clear()
+        duraciones.append(time.perf_counter() - inicio)
+        llamadas += lienzo.llamadas
+    duraciones.sort()
+    print(f"  - Incremental: media {sum(duraciones) / len(duraciones) * 1000:,.1f} ms por tecla, "
+          f"peor {duraciones[-1] * 1000:,.1f} ms, {llamadas / len(teclas):.1f} llamadas a Tk por tecla")
+
+    def recorrer(texto):
+        terminos = palabras(texto)
+        return [tarea for tarea in tareas if all(any(palabra.startswith(termino) for palabra in palabras(tarea[0]))
+                                                 for termino in terminos)]
+
+    _medir("Recorrer la lista completa con la consulta entera (una tecla)", 1, lambda: recorrer(consulta))
+    filtro.filtrar(consulta)
+    print(f"    ({len(filtro):,} coincidencias; a 60 fps cada cuadro dispone de 16,7 ms)")
+
+
+def medir_agenda(elementos=1_000_000, operaciones=10_000, series=1_000, semilla=1):
+    """
+    Mide el almacén de eventos y los recordatorios con un millón de eventos
+    repartidos en dos años: carga completa, bloques de importación, altas y bajas
+    sueltas, consultas de las vistas Día, Semana y Mes y expansión de series.
+
+    Args:
+        elementos (int): Eventos en el almacén.
+        operaciones (int): Operaciones de cada tipo sobre el almacén lleno.
+        series (int): Eventos que se repiten cada semana.
+        semilla (int): Semilla de las fechas aleatorias.
+    """
+    azar = random.Random(semilla)
+    base = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    minutos = 2 * 365 * 24 * 60
+
+    def fecha():
+        return base + timedelta(minutes=azar.randrange(minutos))
+
+    pares = [(fecha(), f"Evento {i}") for i in range(elementos)]
+    almacen = EventStore()
+    print(f"\nAgenda con {elementos:,} eventos en dos años:")
+    _medir("Cargar todos de una vez", elementos, lambda: almacen.add_many(pares))
+    # Cada bloque se mezcla con las claves existentes: cuesta O(n) por bloque en el hilo de Tk
+    bloques = [[(fecha(), "Importado") for _ in range(500)] for _ in range(20)]
+    _medir("Importar un bloque de 500 en el almacén lleno", len(bloques),
+           lambda: [almacen.add_many(bloque) for bloque in bloques])
+    nuevos = _medir("Agregar uno", operaciones, lambda: [almacen.add(fecha(), "Nuevo") for _ in range(operaciones)])
+    dias = [base + timedelta(days=azar.randrange(2 * 365)) for _ in range(100)]
+    for vista in ("Día", "Semana", "Mes"):
+        filas = _medir(f"Consultar la vista {vista}", len(dias),
+                       lambda: sum(len(almacen.range(*EventStore.window(vista, dia))) for dia in dias))
+        print(f"    ({filas / len(dias):,.0f} eventos por vista)")
+    _medir("Eliminar uno", operaciones, lambda: [almacen.remove(evento.id) for evento in nuevos])
+    for i in range(series):
+        almacen.add_series(fecha(), f"Serie {i}", "WEEKLY")
+    _medir(f"Consultar la vista Mes con {series:,} series semanales", len(dias),
+           lambda: [almacen.range(*EventStore.window("Mes", dia)) for dia in dias])
+    mes = EventStore.window("Mes", dias[0])
+    _medir("Repetir la consulta de un mes (ventanas de las series en caché)", len(dias),
+           lambda: [almacen.range(*mes) for _ in dias])
+
+    recordatorios = ReminderScheduler(_RaizSinPantalla(), lambda evento: None, clock=lambda: base)
+    eventos = almacen.range()
+    _medir("Programar un recordatorio por evento", len(eventos), lambda: [recordatorios.add(e) for e in eventos])
+    _medir("Cancelar recordatorios", operaciones,
+           lambda: [recordatorios.remove(eventos[i].id) for i in range(0, len(eventos), len(eventos) // operaciones)])
+
+
+if __name__ == "__main__":
+    # Uso: python benchmark_modelos.py [elementos]
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    medir_lista_tareas(cantidad)
+    medir_filtro(cantidad)
+    medir_agenda(cantidad)
@@ -0,0 +1,250 @@
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk
+
+# Colores por defecto, parecidos a los de un Listbox
+FONDO = "white"
+TEXTO = "black"
+FONDO_SELECCION = "#0078d7"
+TEXTO_SELECCION = "white"
+
+
+class ListaVirtual(tk.Frame):
+    """
+    Lista con barra de desplazamiento que solo dibuja las filas visibles.
+    Los elementos se leen de un modelo de Python (cualquier secuencia, por ejemplo
+    una lista) y las filas del Canvas se reciclan al desplazarse: cambiar de
+    posición solo modifica el texto y el color de las filas cuyo contenido cambió.
+    Ofrece curselection() y bind() como un Listbox para reemplazarlo con pocos cambios.
+    """
+
+    def __init__(self, master, modelo=None, formato=str, estilo=None, alto_fila=20, filas=15, ancho=400,
+                 fuente=("Arial", 10), **opciones):
+        """
+        Crea la lista.
+
+        Args:
+            master: Widget contenedor.
+            modelo (list): Secuencia con los elementos a mostrar (se lee, no se copia).
+            formato (callable): Convierte un elemento en el texto de su fila.
+            estilo (callable): Retorna {'bg': ..., 'fg': ...} para un elemento, o None.
+            alto_fila (int): Alto de cada fila en píxeles.
+            filas (int): Filas visibles que se solicitan inicialmente.
+            ancho (int): Ancho inicial en píxeles.
+            fuente (tuple): Fuente del texto.
+        """
+        super().__init__(master, **opciones)
+        lienzo = tk.Canvas(self, width=ancho, height=filas * alto_fila, bg=FONDO, highlightthickness=0)
+        barra = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        lienzo.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        barra.pack(side=tk.RIGHT, fill="y")
+        self._preparar(lienzo, barra, modelo, formato, estilo, alto_fila, fuente)
+
+        lienzo.bind("<Configure>", lambda evento: self._redimensionar(evento.width, evento.height))
+        lienzo.bind("<Button-1>", self._al_hacer_clic)
+        lienzo.bind("<Up>", lambda evento: self._mover_seleccion(-1))
+        lienzo.bind("<Down>", lambda evento: self._mover_seleccion(1))
+        for secuencia in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            lienzo.bind(secuencia, self._al_girar_rueda)
+
+    @classmethod
+    def sin_pantalla(cls, lienzo, barra, modelo, formato=str, estilo=None, alto_fila=20, alto=300, ancho=400):
+        """
+        Crea una lista que dibuja sobre objetos con la interfaz de Canvas y Scrollbar
+        sin ventana (para benchmarks y pruebas sin pantalla).
+        """
+        lista = cls.__new__(cls)
+        lista._preparar(lienzo, barra, modelo, formato, estilo, alto_fila, None)
+        lista._redimensionar(ancho, alto)
+        return lista
+
+    def _preparar(self, lienzo, barra, modelo, formato, estilo, alto_fila, fuente):
+        self._lienzo = lienzo
+        self._barra = barra
+        self.modelo = modelo if modelo is not None else []
+        self.formato = formato
+        self.estilo = estilo
+        self.alto_fila = alto_fila
+        self._fuente = fuente
+        self._primera = 0  # Índice del modelo en la fila superior
+        self._seleccion = None
+        # Filas recicladas: [id del fondo, id del texto, (texto, fondo, color) mostrados]
+        self._filas = []
+        self._ancho = 0
+        self._visibles = 0  # Filas completas que caben en la altura actual
+        self._barra_mostrada = None
+
+    def _redimensionar(self, ancho, alto):
+        """Ajusta la cantidad de filas recicladas al tamaño del Canvas."""
+        necesarias = alto // self.alto_fila + 1
+        while len(self._filas) < necesarias:
+            y = len(self._filas) * self.alto_fila
+            fondo = self._lienzo.create_rectangle(0, y, ancho, y + self.alto_fila, fill=FONDO, outline=FONDO)
+            texto = self._lienzo.create_text(4, y + self.alto_fila // 2, anchor="w", text="", fill=TEXTO,
+                                             font=self._fuente)
+            self._filas.append([fondo, texto, ("", FONDO, TEXTO)])
+        if ancho != self._ancho:
+            self._ancho = ancho
+            for i, (fondo, _, _) in enumerate(self._filas):
+                self._lienzo.coords(fondo, 0, i * self.alto_fila, ancho, (i + 1) * self.alto_fila)
+        self._visibles = max(1, alto // self.alto_fila)
+        self.actualizar()
+
+    def actualizar(self):
+        """
+        Vuelve a dibujar las filas visibles. Se llama después de modificar el modelo.
+        """
+        total = len(self.modelo)
+        if self._seleccion is not None and self._seleccion >= total:
+            self._seleccion = None
+        self._primera = max(0, min(self._primera, total - self._visibles))
+        modelo, formato, estilo = self.modelo, self.formato, self.estilo
+        configurar = self._lienzo.itemconfigure
+        for desplazamiento, fila in enumerate(self._filas):
+            indice = self._primera + desplazamiento
+            if indice < total:
+                elemento = modelo[indice]
+                if indice == self._seleccion:
+                    fondo, color = FONDO_SELECCION, TEXTO_SELECCION
+                else:
+                    estilo_fila = estilo(elemento) if estilo else None
+                    fondo = estilo_fila.get("bg", FONDO) if estilo_fila else FONDO
+                    color = estilo_fila.get("fg", TEXTO) if estilo_fila else TEXTO
+                mostrar = (formato(elemento), fondo, color)
+            else:
+                mostrar = ("", FONDO, TEXTO)
+            anterior = fila[2]
+            if mostrar != anterior:
+                # Solo se toca lo que cambió respecto a lo que ya muestra esta fila
+                if mostrar[0] != anterior[0] or mostrar[2] != anterior[2]:
+                    configurar(fila[1], text=mostrar[0], fill=mostrar[2])
+                if mostrar[1] != anterior[1]:
+                    configurar(fila[0], fill=mostrar[1], outline=mostrar[1])
+                fila[2] = mostrar
+        posicion = (self._primera / total, min(1.0, (self._primera + self._visibles) / total)) if total else (0.0, 1.0)
+        if posicion != self._barra_mostrada:
+            self._barra_mostrada = posicion
+            self._barra.set(*posicion)
+
+    def yview(self, *argumentos):
+        """
+        Desplaza la lista (protocolo de Scrollbar: "moveto", fracción o "scroll", n, "units"/"pages").
+        """
+        if not argumentos:
+            return self._barra_mostrada
+        if argumentos[0] == "moveto":
+            self._primera = int(float(argumentos[1]) * len(self.modelo))
+        elif argumentos[0] == "scroll":
+            paso = self._visibles if argumentos[2] == "pages" else 1
+            self._primera += int(argumentos[1]) * paso
+        self.actualizar()
+
+    def ver(self, indice):
+        """
+        Desplaza la lista lo mínimo para que el elemento sea visible.
+        """
+        if indice < self._primera:
+            self._primera = indice
+        elif indice >= self._primera + self._visibles:
+            self._primera = indice - self._visibles + 1
+        self.actualizar()
+
+    def curselection(self):
+        """
+        Retorna una tupla con el índice seleccionado (vacía si no hay selección), como Listbox.
+        """
+        return () if self._seleccion is None else (self._seleccion,)
+
+    def selection_set(self, indice):
+        self._seleccion = indice
+        self.actualizar()
+
+    def selection_clear(self, *argumentos):
+        self._seleccion = None
+        self.actualizar()
+
+    def bind(self, secuencia=None, funcion=None, agregar=None):
+        """
+        Asocia eventos al área de las filas (por ejemplo '<Double-1>'), como en un Listbox.
+        """
+        return self._lienzo.bind(secuencia, funcion, agregar)
+
+    def _al_hacer_clic(self, evento):
+        self._lienzo.focus_set()
+        indice = self._primera + evento.y // self.alto_fila
+        if indice < len(self.modelo):
+            self.selection_set(indice)
+
+    def _mover_seleccion(self, paso):
+        if self.modelo:
+            actual = self._seleccion if self._seleccion is not None else self._primera - paso
+            self._seleccion = max(0, min(len(self.modelo) - 1, actual + paso))
+            self.ver(self._seleccion)
+
+    def _al_girar_rueda(self, evento):
+        if evento.num == 4 or getattr(evento, "delta", 0) > 0:
+            self.yview("scroll", -3, "units")
+        else:
+            self.yview("scroll", 3, "units")
+
+
+# --- Benchmark sin pantalla ---
+
+class LienzoSinPantalla:
+    """
+    Sustituto de Canvas y Scrollbar que solo cuenta las llamadas a Tk.
+    """
+
+    def __init__(self):
+        self.llamadas = 0
+        self._siguiente_id = 0
+
+    def _crear(self, *argumentos, **opciones):
+        self.llamadas += 1
+        self._siguiente_id += 1
+        return self._siguiente_id
+
+    create_rectangle = create_text = _crear
+
+    def itemconfigure(self, *argumentos, **opciones):
+        self.llamadas += 1
+
+    def coords(self, *argumentos):
+        self.llamadas += 1
+
+    def set(self, *argumentos):
+        self.llamadas += 1
+
+
+def medir_desplazamiento(elementos=1_000_000, pasos=2_000):
+    """
+    Mide el coste de desplazarse por una lista virtual de un millón de tareas:
+    rueda del ratón (3 filas), página y saltos con la barra, en tiempo de Python
+    y llamadas a Tk por paso. A 60 fps cada cuadro dispone de 16,7 ms.
+
+    Args:
+        elementos (int): Tareas en el modelo.
+        pasos (int): Desplazamientos de cada tipo.
+    """
+    tareas = [(f"Tarea {i}", i % 3 == 0) for i in range(elementos)]
+    lienzo = LienzoSinPantalla()
+    lista = ListaVirtual.sin_pantalla(lienzo, lienzo, tareas,
+                                      formato=lambda tarea: f"✔ {tarea[0]}" if tarea[1] else tarea[0],
+                                      estilo=lambda tarea: {"bg": "#d9d9d9", "fg": "gray"} if tarea[1] else None)
+    print(f"Desplazamiento en una lista virtual de {elementos:,} elementos ({len(lista._filas)} filas dibujadas):")
+    for nombre, mover in (("Rueda (3 filas)", lambda i: lista.yview("scroll", 3, "units")),
+                          ("Página", lambda i: lista.yview("scroll", 1, "pages")),
+                          ("Salto con la barra", lambda i: lista.yview("moveto", (i * 7919 % pasos) / pasos))):
+        lista.yview("moveto", 0)
+        lienzo.llamadas = 0
+        inicio = time.perf_counter()
+        for i in range(pasos):
+            mover(i)
+        duracion = (time.perf_counter() - inicio) / pasos
+        print(f"  - {nombre}: {duracion * 1e6:,.0f} µs y {lienzo.llamadas / pasos:.1f} llamadas a Tk por paso "
+              f"(presupuesto de un cuadro a 60 fps: 16,7 ms)")
+
+
+if __name__ == "__main__" and "--benchmark" in sys.argv:
+    medir_desplazamiento()
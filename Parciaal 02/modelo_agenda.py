@@ -0,0 +1,648 @@
+import bisect
+import calendar
+import csv
+import heapq
+import itertools
+import math
+import os
+import queue
+import threading
+import time
+from datetime import MAXYEAR, datetime, timedelta, timezone
+
+# Formatos de fecha y hora usados en la interfaz.
+DATE_FORMAT = "%d/%m/%Y"
+TIME_FORMAT = "%H:%M"
+
+
+class Event:
+    """Evento de la agenda: identificador único, fecha y hora (datetime) y descripción."""
+    __slots__ = ("id", "start", "description")
+
+    def __init__(self, event_id, start, description):
+        self.id = event_id
+        self.start = start
+        self.description = description
+
+    def values(self):
+        """Valores de la fila del TreeView: (fecha, hora, descripción)."""
+        return self.start.strftime(DATE_FORMAT), self.start.strftime(TIME_FORMAT), self.description
+
+
+def _days_in_month(year, month):
+    """Días del mes, también para años que datetime no admite."""
+    return calendar.mdays[month] + (month == 2 and calendar.isleap(year))
+
+
+class Series:
+    """
+    Evento que se repite, al estilo de RRULE: frecuencia diaria, semanal o mensual
+    cada 'interval' periodos, con fin opcional por fecha (until) o por número de
+    repeticiones (count) y fechas excluidas (como EXDATE). Las repeticiones no se
+    guardan: se generan bajo demanda solo para la ventana visible y se recuerdan
+    por ventana hasta que la serie se modifica.
+    """
+    FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY")
+    CACHED_WINDOWS = 16
+    MAX_COUNT = 100_000  # Repeticiones como máximo con 'count' (unos 270 años diarios)
+
+    def __init__(self, series_id, start, description, freq, interval=1, until=None, count=None):
+        self.check_rule(freq, interval, count)
+        self.id = series_id
+        self.start = start
+        self.description = description
+        self.freq = freq
+        self.interval = interval
+        self.until = until
+        self.count = count
+        self.exdates = set()
+        self._cache = {}  # (inicio, fin) -> lista de Event de esa ventana
+        self._last = None  # Última repetición cuando hay 'count' (se calcula una vez)
+
+    @classmethod
+    def check_rule(cls, freq, interval, count=None):
+        """
+        Lanza ValueError si la frecuencia, el intervalo (entero positivo) o el número
+        de repeticiones (None, o de 1 a MAX_COUNT) no son válidos.
+        """
+        if freq not in cls.FREQUENCIES:
+            raise ValueError(f"Frecuencia no válida: {freq}")
+        # Con 0 las repeticiones no avanzan y con un valor negativo retroceden sin fin
+        if not isinstance(interval, int) or isinstance(interval, bool) or interval < 1:
+            raise ValueError(f"Intervalo no válido: {interval}")
+        if count is not None and (not isinstance(count, int) or isinstance(count, bool)
+                                  or not 1 <= count <= cls.MAX_COUNT):
+            raise ValueError(f"Número de repeticiones no válido: {count}")
+
+    def invalidate(self):
+        """Olvida las ventanas calculadas (se llama al modificar la serie)."""
+        self._cache.clear()
+        self._last = None
+
+    def occurrences(self, start=None, end=None):
+        """
+        Genera perezosamente las fechas de las repeticiones con start <= fecha < end.
+        """
+        last = self.last()
+        if last is not None and (end is None or last < end):
+            end = last + timedelta(microseconds=1)
+        for moment in self._moments(start, end):
+            if moment not in self.exdates:
+                yield moment
+
+    def _moments(self, start, end):
+        """Fechas de la regla en [start, end), saltando directamente al primer periodo de la ventana."""
+        lower = self.start if start is None or start < self.start else start
+        if self.freq == "MONTHLY":
+            months = (lower.year - self.start.year) * 12 + lower.month - self.start.month
+            k = max(0, -(-months // self.interval)) * self.interval
+            while True:
+                year, month = self._year_month(k)
+                k += self.interval
+                if year > MAXYEAR:
+                    return  # Fuera del calendario de datetime
+                if self.start.day > _days_in_month(year, month):
+                    continue  # El mes no tiene ese día (por ejemplo, 31 de abril)
+                moment = self.start.replace(year=year, month=month)
+                if end is not None and moment >= end:
+                    return
+                if moment >= lower:
+                    yield moment
+        else:
+            step = self._step()
+            try:
+                moment = self.start + -(-(lower - self.start) // step) * step
+                while end is None or moment < end:
+                    yield moment
+                    moment += step
+            except OverflowError:
+                return  # Pasó de datetime.max
+
+    def _step(self):
+        return timedelta(days=self.interval * (7 if self.freq == "WEEKLY" else 1))
+
+    def _year_month(self, k):
+        """Año y mes del periodo k, contado en meses desde el de inicio."""
+        year, month = divmod(self.start.month - 1 + k, 12)
+        return self.start.year + year, month + 1
+
+    def _month(self, k):
+        """Repetición del mes k, o None si ese mes no tiene el día o pasa del año 9999."""
+        year, month = self._year_month(k)
+        if year > MAXYEAR or self.start.day > _days_in_month(year, month):
+            return None
+        return self.start.replace(year=year, month=month)
+
+    def last(self):
+        """Fecha de la última repetición, o None si la serie no termina."""
+        if self.count is None and self.until is None:
+            return None
+        if self._last is None:
+            # Se calcula sin recorrer las repeticiones; 'count' cuenta también las
+            # fechas excluidas, como en RRULE
+            self._last = self._last_before(datetime.max if self.until is None else self.until)
+            if self.count is not None:
+                self._last = min(self._last, self._last_by_count())
+        return self._last
+
+    def _last_by_count(self):
+        """Fecha de la repetición número 'count', sin recorrer las anteriores."""
+        if self.freq != "MONTHLY":
+            try:
+                return self.start + (self.count - 1) * self._step()
+            except OverflowError:
+                return datetime.max  # Se queda en la última fecha que admite datetime
+        # Los meses sin ese día se repiten con periodo de 400 años (4800 meses): se
+        # cuentan los válidos de un ciclo y se salta por ciclos completos
+        cycle = 4800 // math.gcd(self.interval, 4800)
+        valid = [j for j in range(cycle)
+                 if self.start.day <= _days_in_month(*self._year_month(j * self.interval))]
+        laps, rest = divmod(self.count - 1, len(valid))
+        return self._month((laps * cycle + valid[rest]) * self.interval) or datetime.max
+
+    def _last_before(self, limit):
+        """Última repetición de la regla con fecha <= limit (la de inicio si no hay ninguna)."""
+        if limit < self.start:
+            return self.start
+        if self.freq != "MONTHLY":
+            step = self._step()
+            return self.start + (limit - self.start) // step * step
+        months = (limit.year - self.start.year) * 12 + limit.month - self.start.month
+        k = months // self.interval * self.interval
+        while k >= 0:
+            moment = self._month(k)
+            if moment is not None and moment <= limit:
+                return moment
+            k -= self.interval
+        return self.start
+
+    def expand(self, start, end):
+        """
+        Repeticiones de la ventana [start, end) como eventos, usando la caché de ventanas.
+        """
+        key = (start, end)
+        events = self._cache.get(key)
+        if events is None:
+            events = [Event(f"{self.id}:{moment:%Y%m%d%H%M}", moment, self.description)
+                      for moment in self.occurrences(start, end)]
+            if len(self._cache) >= self.CACHED_WINDOWS:
+                del self._cache[next(iter(self._cache))]
+            self._cache[key] = events
+        return events
+
+
+class EventStore:
+    """
+    Almacén de eventos ordenado por fecha y hora. Mantiene una lista ordenada de
+    claves (inicio, id) para consultar rangos en O(log n) con bisect, y un
+    diccionario por id para borrar exactamente el evento elegido aunque haya
+    otros con los mismos datos. Los eventos que se repiten se guardan como series
+    y se expanden solo para el rango consultado.
+    """
+    # Hasta dónde se muestran las series sin fin cuando el rango no tiene final
+    HORIZON = timedelta(days=365)
+
+    def __init__(self):
+        self._keys = []  # (inicio, id) ordenadas
+        self._by_id = {}
+        self._series = {}
+        self._ids = itertools.count(1)
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def add(self, start, description):
+        """
+        Agrega un evento.
+
+        Args:
+            start (datetime): Fecha y hora del evento.
+            description (str): Descripción.
+
+        Returns:
+            Event: El evento creado, con su id único.
+        """
+        event = Event(next(self._ids), start, description)
+        self._by_id[event.id] = event
+        bisect.insort(self._keys, (start, event.id))
+        return event
+
+    def add_many(self, items):
+        """
+        Agrega muchos eventos de una vez: se ordena el bloque nuevo y se mezcla con las
+        claves existentes copiando tramos (O(n) en C y O(k log n) comparaciones),
+        en lugar de un insort por evento.
+
+        Args:
+            items (list): Pares (datetime, descripción).
+
+        Returns:
+            list: Los eventos creados.
+        """
+        created = [Event(next(self._ids), start, description) for start, description in items]
+        for event in created:
+            self._by_id[event.id] = event
+        new_keys = sorted((event.start, event.id) for event in created)
+        keys = self._keys
+        if not keys or not new_keys or new_keys[0] > keys[-1]:
+            keys.extend(new_keys)
+        else:
+            merged, previous = [], 0
+            for key in new_keys:
+                position = bisect.bisect_left(keys, key, previous)
+                merged.extend(keys[previous:position])
+                merged.append(key)
+                previous = position
+            merged.extend(keys[previous:])
+            self._keys = merged
+        return created
+
+    def add_series(self, start, description, freq, interval=1, until=None, count=None):
+        """
+        Agrega un evento que se repite.
+
+        Args:
+            start (datetime): Primera repetición.
+            description (str): Descripción.
+            freq (str): "DAILY", "WEEKLY" o "MONTHLY".
+            interval (int): Cada cuántos periodos se repite.
+            until (datetime): Última fecha posible, o None.
+            count (int): Número de repeticiones (de 1 a Series.MAX_COUNT), o None.
+
+        Returns:
+            Series: La serie creada.
+        """
+        series = Series(next(self._ids), start, description, freq, interval, until, count)
+        self._series[series.id] = series
+        return series
+
+    def edit_series(self, series_id, **changes):
+        """
+        Modifica una serie (start, description, freq, interval, until, count) e
+        invalida sus ventanas ya expandidas.
+        """
+        series = self._series[series_id]
+        Series.check_rule(changes.get("freq", series.freq), changes.get("interval", series.interval),
+                          changes.get("count", series.count))
+        for name, value in changes.items():
+            setattr(series, name, value)
+        series.invalidate()
+        return series
+
+    def exclude(self, series_id, moment):
+        """Quita una sola repetición de una serie."""
+        series = self._series[series_id]
+        series.exdates.add(moment)
+        series.invalidate()
+
+    def get(self, event_id):
+        return self._by_id.get(event_id) or self._series.get(event_id)
+
+    def remove(self, event_id):
+        """
+        Elimina un evento o una serie completa por id.
+
+        Returns:
+            Event, Series or None: Lo eliminado, o None si no existe.
+        """
+        if event_id in self._series:
+            return self._series.pop(event_id)
+        event = self._by_id.pop(event_id, None)
+        if event is not None:
+            del self._keys[bisect.bisect_left(self._keys, (event.start, event_id))]
+        return event
+
+    def _expansions(self, start, end):
+        """Repeticiones de cada serie que cae en el rango (cada lista, ordenada)."""
+        if end is None:
+            # Las series sin fin se muestran hasta un horizonte (desde hoy, por días para reutilizar la caché)
+            today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            end = max(today, start or today) + self.HORIZON
+        return [series.expand(start, end) for series in self._series.values()
+                if series.start < end and (start is None or series.last() is None or series.last() >= start)]
+
+    def range(self, start=None, end=None):
+        """
+        Eventos con start <= inicio < end, en orden cronológico (None = sin límite),
+        incluidas las repeticiones de las series en ese rango.
+        """
+        low = 0 if start is None else bisect.bisect_left(self._keys, (start,))
+        high = len(self._keys) if end is None else bisect.bisect_left(self._keys, (end,))
+        singles = [self._by_id[event_id] for _, event_id in self._keys[low:high]]
+        expansions = self._expansions(start, end)
+        if not expansions:
+            return singles
+        return list(heapq.merge(singles, *expansions, key=lambda event: event.start))
+
+    def position(self, event, start=None, end=None):
+        """Posición de un evento simple dentro del rango [start, end) (para insertarlo en su fila)."""
+        low = 0 if start is None else bisect.bisect_left(self._keys, (start,))
+        position = bisect.bisect_left(self._keys, (event.start, event.id)) - low
+        for occurrences in self._expansions(start, end):
+            position += bisect.bisect_left(occurrences, event.start, key=lambda item: item.start)
+        return position
+
+    @staticmethod
+    def window(view, day):
+        """
+        Límites [inicio, fin) de la vista "Día", "Semana" (lunes a domingo), "Mes" o "Todo"
+        que contiene la fecha dada.
+        """
+        day = datetime(day.year, day.month, day.day)
+        if view == "Día":
+            return day, day + timedelta(days=1)
+        if view == "Semana":
+            monday = day - timedelta(days=day.weekday())
+            return monday, monday + timedelta(days=7)
+        if view == "Mes":
+            first = day.replace(day=1)
+            return first, (first + timedelta(days=32)).replace(day=1)
+        return None, None
+
+
+class ReminderScheduler:
+    """
+    Avisa de los eventos cuando llega su hora. Guarda las próximas alarmas en un
+    montículo ordenado por hora y mantiene un solo temporizador root.after armado
+    para la más cercana, así que sin alarmas pendientes no consume CPU aunque haya
+    miles de eventos futuros. De cada serie solo se programa la próxima repetición.
+    """
+    MAX_DELAY_MS = 3_600_000  # Se revisa al menos cada hora (por cambios de hora del sistema)
+
+    def __init__(self, root, notify, clock=datetime.now):
+        """
+        Args:
+            root: Ventana de Tk (o cualquier objeto con after y after_cancel).
+            notify (callable): Recibe el Event cuya hora llegó.
+            clock (callable): Retorna la hora actual.
+        """
+        self.root = root
+        self.notify = notify
+        self.clock = clock
+        self._heap = []  # [hora, secuencia, id, Event o Series]; id None = entrada anulada
+        self._entries = {}  # id de evento o serie -> su entrada en el montículo
+        self._sequence = itertools.count()
+        self._timer = None
+        self._armed_for = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, item):
+        """
+        Programa un Event (si es futuro) o la próxima repetición de una Series.
+        """
+        self.remove(item.id, arm=False)
+        if isinstance(item, Series):
+            moment = next(item.occurrences(self.clock() + timedelta(microseconds=1)), None)
+        else:
+            moment = item.start if item.start > self.clock() else None
+        if moment is not None:
+            entry = [moment, next(self._sequence), item.id, item]
+            self._entries[item.id] = entry
+            heapq.heappush(self._heap, entry)
+        self._arm()
+
+    def remove(self, item_id, arm=True):
+        """
+        Cancela la alarma de un evento o serie (borrado perezoso en el montículo).
+        """
+        entry = self._entries.pop(item_id, None)
+        if entry is not None:
+            entry[2] = None
+            if arm:
+                self._arm()
+
+    def _arm(self):
+        """Deja armado un único temporizador para la alarma más cercana."""
+        heap = self._heap
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)
+        if len(heap) > 2 * len(self._entries) + 64:
+            # Demasiadas entradas anuladas: se reconstruye el montículo
+            self._heap = heap = [entry for entry in heap if entry[2] is not None]
+            heapq.heapify(heap)
+        due = heap[0][0] if heap else None
+        if due == self._armed_for and self._timer is not None:
+            return
+        if self._timer is not None:
+            self.root.after_cancel(self._timer)
+            self._timer = None
+        self._armed_for = due
+        if due is not None:
+            delay = (due - self.clock()).total_seconds() * 1000
+            self._timer = self.root.after(int(max(0, min(delay, self.MAX_DELAY_MS))), self._fire)
+
+    def _fire(self):
+        """Avisa de todas las alarmas vencidas, reprograma las series y vuelve a armar el temporizador."""
+        self._timer = None
+        self._armed_for = None
+        now = self.clock()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            moment, _, item_id, item = heapq.heappop(self._heap)
+            if item_id is None:
+                continue
+            del self._entries[item_id]
+            if isinstance(item, Series):
+                due.append(Event(f"{item.id}:{moment:%Y%m%d%H%M}", moment, item.description))
+                self.add(item)
+            else:
+                due.append(item)
+        self._arm()
+        for event in due:
+            self.notify(event)
+
+
+def _parse_ics_datetime(value, params):
+    """Convierte un DTSTART/UNTIL de iCalendar en datetime local sin zona."""
+    if "VALUE=DATE" in params or len(value) == 8:
+        return datetime.strptime(value[:8], "%Y%m%d")
+    moment = datetime.strptime(value[:15], "%Y%m%dT%H%M%S")
+    if value.endswith("Z"):
+        moment = moment.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    return moment
+
+
+def _unfold_ics(lines):
+    """Une las líneas plegadas de un .ics (las que empiezan con espacio continúan la anterior)."""
+    unfolded = None
+    for raw in itertools.chain(lines, [""]):
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t"):
+            unfolded += line[1:]
+            continue
+        if unfolded is not None:
+            yield unfolded
+        unfolded = line
+
+
+def _ics_vevents(lines):
+    fields = None
+    for line in _unfold_ics(lines):
+        if line == "BEGIN:VEVENT":
+            fields = {}
+        elif line == "END:VEVENT" and fields is not None:
+            yield fields
+            fields = None
+        elif fields is not None and ":" in line:
+            name, value = line.split(":", 1)
+            name, _, params = name.partition(";")
+            fields[name.upper()] = (value, params.upper())
+
+
+def read_ics(lines):
+    """
+    Genera los eventos (inicio, descripción, regla) de un calendario iCalendar (.ics).
+    La regla es None o un dict para EventStore.add_series a partir de RRULE
+    (FREQ DAILY/WEEKLY/MONTHLY/YEARLY, INTERVAL, COUNT, UNTIL; BYDAY y similares
+    no se aplican). Genera None por cada VEVENT que no se puede interpretar.
+    """
+    for fields in _ics_vevents(lines):
+        try:
+            start = _parse_ics_datetime(*fields["DTSTART"])
+            summary = fields.get("SUMMARY", ("(sin título)", ""))[0]
+            summary = summary.replace("\\n", " ").replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\")
+            rule = None
+            if "RRULE" in fields:
+                parts = dict(part.split("=", 1) for part in fields["RRULE"][0].split(";") if "=" in part)
+                freq, interval = parts["FREQ"].upper(), int(parts.get("INTERVAL", 1))
+                count = int(parts["COUNT"]) if "COUNT" in parts else None
+                if freq == "YEARLY" and interval >= 1:
+                    freq, interval = "MONTHLY", interval * 12
+                # Misma validación que add_series: la fila cuenta como no válida
+                Series.check_rule(freq, interval, count)
+                rule = {"freq": freq, "interval": interval, "count": count,
+                        "until": _parse_ics_datetime(parts["UNTIL"], "") if "UNTIL" in parts else None}
+            yield start, summary, rule
+        except (KeyError, ValueError):
+            yield None
+
+
+def read_csv(lines):
+    """Genera (inicio, descripción, None) o None por cada fila fecha,hora,descripción de un .csv."""
+    for row in csv.reader(lines):
+        try:
+            date, hour, description = row[0].strip(), row[1].strip(), ",".join(row[2:]).strip()
+            yield datetime.strptime(f"{date} {hour}", f"{DATE_FORMAT} {TIME_FORMAT}"), description, None
+        except (IndexError, ValueError):
+            yield None
+
+
+class EventImporter:
+    """
+    Importa un calendario grande (.ics o .csv) sin congelar la ventana: un hilo
+    lee y convierte el fichero y entrega bloques por una cola acotada; el hilo de
+    Tk los recoge con root.after, gastando como mucho 'budget_ms' por turno, y los
+    añade al almacén. Se puede cancelar en cualquier momento (lo ya importado se conserva).
+    """
+
+    def __init__(self, root, store, on_events, on_progress, on_done, chunk_size=500, budget_ms=15):
+        """
+        Args:
+            root: Ventana de Tk (o cualquier objeto con after).
+            store (EventStore): Almacén donde se agregan los eventos.
+            on_events (callable): Recibe cada lista de Event/Series agregados (para el TreeView y avisos).
+            on_progress (callable): Recibe la fracción leída del fichero (0 a 1).
+            on_done (callable): Recibe (importados, inválidos, cancelado, mensaje de error o None).
+            chunk_size (int): Eventos por bloque.
+            budget_ms (int): Milisegundos máximos de trabajo por turno del bucle de Tk.
+        """
+        self.root = root
+        self.store = store
+        self.on_events = on_events
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.chunk_size = chunk_size
+        self.budget_ms = budget_ms
+        self._chunks = None
+        self._cancelled = threading.Event()
+        self.imported = 0
+        self.invalid = 0
+        self.series = 0  # Series importadas (se muestran al terminar)
+
+    @property
+    def running(self):
+        return self._chunks is not None
+
+    def start(self, path):
+        """Empieza a importar un fichero .ics o .csv."""
+        self._chunks = queue.Queue(maxsize=8)  # Acotada: el lector espera si Tk va más lento
+        self._cancelled.clear()
+        self.imported = self.invalid = self.series = 0
+        threading.Thread(target=self._read, args=(path, self._chunks), daemon=True).start()
+        self.root.after(0, self._drain)
+
+    def cancel(self):
+        """Detiene la importación; los eventos ya agregados se conservan."""
+        self._cancelled.set()
+
+    def _read(self, path, chunks):
+        """Hilo lector: convierte el fichero y deja bloques en la cola."""
+        def put(item):
+            while not self._cancelled.is_set():
+                try:
+                    chunks.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        try:
+            size = max(1, os.path.getsize(path))
+            read = 0
+
+            def lines(handle):
+                nonlocal read
+                for raw in handle:
+                    read += len(raw)
+                    yield raw.decode("utf-8-sig", errors="replace")
+
+            with open(path, "rb") as handle:
+                parser = read_ics if path.lower().endswith(".ics") else read_csv
+                chunk, invalid = [], 0
+                for item in parser(lines(handle)):
+                    if item is None:
+                        invalid += 1
+                    else:
+                        chunk.append(item)
+                    if len(chunk) >= self.chunk_size:
+                        if not put(("events", chunk, invalid, read / size)):
+                            return
+                        chunk, invalid = [], 0
+                put(("events", chunk, invalid, 1.0))
+                put(("done", None))
+        except Exception as error:  # OSError, csv.Error, UnicodeError...: sin esto el hilo muere en silencio
+            put(("done", str(error)))
+
+    def _drain(self):
+        """Turno del bucle de Tk: agrega bloques hasta agotar el presupuesto de tiempo."""
+        chunks = self._chunks
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        try:
+            while time.perf_counter() < deadline:
+                if self._cancelled.is_set():
+                    self._finish(True, None)
+                    return
+                message = chunks.get_nowait()
+                if message[0] == "done":
+                    self._finish(False, message[1])
+                    return
+                _, items, invalid, fraction = message
+                singles = [(start, description) for start, description, rule in items if rule is None]
+                added = self.store.add_many(singles)
+                series = [self.store.add_series(start, description, **rule)
+                          for start, description, rule in items if rule is not None]
+                added += series
+                self.series += len(series)
+                self.imported += len(added)
+                self.invalid += invalid
+                self.on_events(added)
+                self.on_progress(fraction)
+        except queue.Empty:
+            pass
+        self.root.after(10, self._drain)
+
+    def _finish(self, cancelled, error):
+        self._chunks = None
+        self.on_done(self.imported, self.invalid, cancelled, error)
@@ -0,0 +1,356 @@
+import bisect
+import re
+
+# Palabras de un texto para el índice del filtro (letras, dígitos y _)
+_PALABRA = re.compile(r"\w+")
+
+
+def palabras(texto):
+    """Palabras de un texto en minúsculas (casefold), en el orden en que aparecen."""
+    return _PALABRA.findall(texto.casefold())
+
+
+class ListaTareas:
+    """
+    Lista de tareas independiente de la interfaz. Cada tarea es una tupla
+    (texto, completada). Se lee como una secuencia (len, índices e iteración),
+    así que ListaVirtual y AlmacenTareas la usan directamente, y lleva la cuenta
+    de completadas para consultarla en O(1).
+
+    Cada tarea tiene además un id estable, creciente en el orden de la lista, y
+    un índice de palabras para consultar por prefijo (ver FiltroTareas) que, una
+    vez creado, se mantiene con cada cambio.
+    """
+
+    def __init__(self, tareas=(), indexar=False):
+        """
+        Args:
+            tareas (iterable): Tareas iniciales (texto, completada).
+            indexar (bool): Crear ya el índice de palabras, para que las tareas se indexen
+                a medida que se agregan; si no, se crea entero en la primera consulta por prefijo.
+        """
+        self._tareas = list(tareas)
+        self.completadas = sum(1 for _, completada in self._tareas if completada)
+        self._ids = list(range(len(self._tareas)))  # Ordenados: se buscan con bisect
+        self._siguiente_id = len(self._tareas)
+        # Palabra -> id de su única tarea o set de ids (se crea en la primera consulta).
+        # La mayoría de las palabras únicas (números, nombres) no necesitan un set.
+        self._indice = None
+        self._grupos = None  # Dos primeras letras -> set de palabras, para buscar por prefijo
+        if indexar:
+            self._crear_indice()
+
+    def __len__(self):
+        return len(self._tareas)
+
+    def __getitem__(self, indice):
+        return self._tareas[indice]
+
+    def __iter__(self):
+        return iter(self._tareas)
+
+    @property
+    def pendientes(self):
+        return len(self._tareas) - self.completadas
+
+    def agregar(self, texto):
+        """
+        Añade una tarea pendiente al final.
+
+        Args:
+            texto (str): Texto de la tarea (se quitan los espacios de los extremos).
+
+        Returns:
+            int: Índice de la tarea nueva.
+
+        Raises:
+            ValueError: Si el texto está vacío.
+        """
+        texto = texto.strip()
+        if not texto:
+            raise ValueError("La tarea no puede estar vacía.")
+        self._tareas.append((texto, False))
+        self._ids.append(self._siguiente_id)
+        self._indexar(self._siguiente_id, texto)
+        self._siguiente_id += 1
+        return len(self._tareas) - 1
+
+    def insertar(self, posicion, tareas):
+        """
+        Inserta un bloque de tareas (texto, completada) a partir de una posición,
+        por ejemplo las que se van cargando de un fichero. Las tareas que quedan
+        detrás reciben ids nuevos para que los ids sigan en el orden de la lista.
+        """
+        tareas = list(tareas)
+        posicion = min(posicion, len(self._tareas))
+        cola = self._ids[posicion:]
+        for tarea_id, (texto, _) in zip(cola, self._tareas[posicion:]):
+            self._desindexar(tarea_id, texto)
+        self._tareas[posicion:posicion] = tareas
+        self._ids[posicion:] = range(self._siguiente_id, self._siguiente_id + len(tareas) + len(cola))
+        self._siguiente_id += len(tareas) + len(cola)
+        for tarea_id, (texto, _) in zip(self._ids[posicion:], self._tareas[posicion:]):
+            self._indexar(tarea_id, texto)
+        self.completadas += sum(1 for _, completada in tareas if completada)
+
+    def alternar(self, indice):
+        """
+        Marca una tarea como completada o la vuelve a dejar pendiente.
+
+        Returns:
+            bool: El nuevo estado de la tarea.
+
+        Raises:
+            IndexError: Si no existe la tarea.
+        """
+        texto, completada = self._tareas[indice]
+        self._tareas[indice] = (texto, not completada)
+        self.completadas += -1 if completada else 1
+        return not completada
+
+    def eliminar(self, indice):
+        """
+        Elimina una tarea.
+
+        Returns:
+            tuple: La tarea eliminada (texto, completada).
+
+        Raises:
+            IndexError: Si no existe la tarea.
+        """
+        tarea = self._tareas.pop(indice)
+        self._desindexar(self._ids.pop(indice), tarea[0])
+        if tarea[1]:
+            self.completadas -= 1
+        return tarea
+
+    def limpiar(self):
+        """Elimina todas las tareas."""
+        self._tareas.clear()
+        self._ids.clear()
+        self.completadas = 0
+        if self._indice is not None:
+            self._crear_indice()
+
+    def buscar(self, texto, completada=None):
+        """
+        Índices de las tareas cuyo texto contiene 'texto' (sin distinguir mayúsculas),
+        opcionalmente solo las completadas (True) o las pendientes (False).
+        """
+        texto = texto.casefold()
+        return [indice for indice, (contenido, estado) in enumerate(self._tareas)
+                if texto in contenido.casefold() and (completada is None or estado == completada)]
+
+    # --- Ids e índice de palabras ---
+
+    def id_en(self, indice):
+        """Id estable de la tarea en esa posición."""
+        return self._ids[indice]
+
+    def posicion(self, tarea_id):
+        """
+        Posición actual de una tarea por su id, en O(log n).
+
+        Raises:
+            KeyError: Si no existe la tarea.
+        """
+        posicion = bisect.bisect_left(self._ids, tarea_id)
+        if posicion == len(self._ids) or self._ids[posicion] != tarea_id:
+            raise KeyError(tarea_id)
+        return posicion
+
+    def con_prefijo(self, prefijo):
+        """
+        Ids de las tareas con alguna palabra que empieza por 'prefijo' (en minúsculas).
+        El set retornado puede ser el del índice: no se debe modificar.
+        """
+        if self._indice is None:
+            self._crear_indice()
+        if len(prefijo) >= 2:
+            grupos = [self._grupos.get(prefijo[:2], ())]
+        else:
+            grupos = [grupo for clave, grupo in self._grupos.items() if clave.startswith(prefijo)]
+        ids, conjuntos = set(), []
+        for grupo in grupos:
+            for palabra in grupo:
+                if palabra.startswith(prefijo):
+                    entrada = self._indice[palabra]
+                    if type(entrada) is int:
+                        ids.add(entrada)
+                    else:
+                        conjuntos.append(entrada)
+        if len(conjuntos) == 1 and not ids:
+            return conjuntos[0]
+        return ids.union(*conjuntos)
+
+    def _crear_indice(self):
+        self._indice, self._grupos = {}, {}
+        for tarea_id, (texto, _) in zip(self._ids, self._tareas):
+            self._indexar(tarea_id, texto)
+
+    def _indexar(self, tarea_id, texto):
+        if self._indice is None:
+            return
+        indice = self._indice
+        for palabra in palabras(texto):
+            entrada = indice.get(palabra)
+            if entrada is None:
+                indice[palabra] = tarea_id
+                grupo = self._grupos.get(palabra[:2])
+                if grupo is None:
+                    grupo = self._grupos[palabra[:2]] = set()
+                grupo.add(palabra)
+            elif type(entrada) is int:
+                if entrada != tarea_id:  # La misma palabra puede repetirse en un texto
+                    indice[palabra] = {entrada, tarea_id}
+            else:
+                entrada.add(tarea_id)
+
+    def _desindexar(self, tarea_id, texto):
+        if self._indice is None:
+            return
+        indice = self._indice
+        for palabra in palabras(texto):
+            entrada = indice.get(palabra)
+            if type(entrada) is set:
+                entrada.discard(tarea_id)
+                if len(entrada) == 1:
+                    indice[palabra] = entrada.pop()
+            elif entrada == tarea_id:
+                del indice[palabra]
+                grupo = self._grupos[palabra[:2]]
+                grupo.discard(palabra)
+                if not grupo:
+                    del self._grupos[palabra[:2]]
+
+
+class FiltroTareas:
+    """
+    Vista filtrada de una ListaTareas para filtrar mientras se escribe. Una tarea
+    coincide si cada palabra de la consulta es el comienzo de alguna palabra de
+    su texto. Si la consulta nueva solo alarga la anterior (por ejemplo "com" ->
+    "comp"), se reduce el resultado anterior en lugar de buscar de nuevo, y al
+    borrar letras se recuperan los resultados ya calculados de esa misma escritura.
+
+    Se lee como una secuencia (las tareas visibles, en el orden de la lista), así
+    que se puede pasar como modelo a ListaVirtual. Mientras se usa, los cambios de
+    la lista deben hacerse a través del filtro para que el resultado siga al día.
+    """
+
+    def __init__(self, tareas):
+        """
+        Args:
+            tareas (ListaTareas): Lista que se filtra.
+        """
+        self.tareas = tareas
+        self.consulta = ""
+        self._terminos = ()
+        self._resultado = None  # Ids visibles en orden, o None si no hay filtro
+        self._anteriores = []  # [(términos, resultado)] de las consultas que se fueron alargando
+
+    def __len__(self):
+        return len(self.tareas) if self._resultado is None else len(self._resultado)
+
+    def __getitem__(self, indice):
+        if self._resultado is None:
+            return self.tareas[indice]
+        return self.tareas[self.tareas.posicion(self._resultado[indice])]
+
+    def filtrar(self, consulta):
+        """
+        Cambia la consulta. Retorna True si cambió el resultado.
+        """
+        self.consulta = consulta
+        terminos = tuple(palabras(consulta))
+        if terminos == self._terminos:
+            return False
+        if not terminos:
+            self._terminos, self._resultado, self._anteriores = (), None, []
+            return True
+        # Al borrar letras se vuelve a un resultado anterior de la misma escritura
+        while self._anteriores and not _alarga(terminos, self._anteriores[-1][0]):
+            self._anteriores.pop()
+        if self._anteriores and self._anteriores[-1][0] == terminos:
+            self._terminos, self._resultado = self._anteriores.pop()
+        elif self._resultado is not None and _alarga(terminos, self._terminos):
+            self._anteriores.append((self._terminos, self._resultado))
+            self._resultado = self._reducir(self._resultado, [termino for termino in terminos
+                                                              if termino not in self._terminos])
+        elif self._anteriores:
+            self._resultado = self._reducir(self._anteriores[-1][1], [termino for termino in terminos
+                                                                      if termino not in self._anteriores[-1][0]])
+        else:
+            self._resultado = self._buscar(terminos)
+        self._terminos = terminos
+        return True
+
+    def _buscar(self, terminos):
+        """Consulta completa con el índice: intersección de los ids de cada término."""
+        conjuntos = sorted((self.tareas.con_prefijo(termino) for termino in terminos), key=len)
+        return sorted(conjuntos[0].intersection(*conjuntos[1:]))
+
+    def _reducir(self, resultado, terminos):
+        """Deja del resultado anterior (ya ordenado) solo los ids que tienen los términos nuevos."""
+        for termino in terminos:
+            conjunto = self.tareas.con_prefijo(termino)
+            resultado = [tarea_id for tarea_id in resultado if tarea_id in conjunto]
+        return resultado
+
+    def coincide(self, texto):
+        """Indica si un texto cumple la consulta actual."""
+        contenidas = palabras(texto)
+        return all(any(palabra.startswith(termino) for palabra in contenidas) for termino in self._terminos)
+
+    def posicion_en_lista(self, indice):
+        """Posición en la ListaTareas de la tarea visible en 'indice'."""
+        if self._resultado is None:
+            return indice
+        return self.tareas.posicion(self._resultado[indice])
+
+    # --- Cambios de la lista a través del filtro ---
+
+    def agregar(self, texto):
+        """
+        Añade una tarea (ver ListaTareas.agregar). Si cumple la consulta aparece al final.
+
+        Returns:
+            int or None: Índice visible de la tarea nueva, o None si queda oculta por el filtro.
+        """
+        indice = self.tareas.agregar(texto)
+        self._anteriores = []
+        if self._resultado is None:
+            return indice
+        if not self.coincide(self.tareas[indice][0]):
+            return None
+        self._resultado.append(self.tareas.id_en(indice))
+        return len(self._resultado) - 1
+
+    def alternar(self, indice):
+        """Marca o desmarca la tarea visible en 'indice'. Retorna el nuevo estado."""
+        return self.tareas.alternar(self.posicion_en_lista(indice))
+
+    def eliminar(self, indice):
+        """Elimina la tarea visible en 'indice'. Retorna la tarea eliminada."""
+        tarea = self.tareas.eliminar(self.posicion_en_lista(indice))
+        if self._resultado is not None:
+            del self._resultado[indice]
+        self._anteriores = []
+        return tarea
+
+    def insertar(self, posicion, tareas):
+        """
+        Inserta un bloque de tareas (ver ListaTareas.insertar). Como cambian los ids
+        de las tareas siguientes, con un filtro activo se repite la consulta.
+        """
+        self.tareas.insertar(posicion, tareas)
+        self._anteriores = []
+        if self._resultado is not None:
+            self._resultado = self._buscar(self._terminos)
+
+
+def _alarga(terminos, anteriores):
+    """
+    Indica si la consulta 'terminos' solo puede reducir el resultado de 'anteriores':
+    cada término anterior es el comienzo de alguno de los nuevos.
+    """
+    return all(any(termino.startswith(anterior) for termino in terminos) for anterior in anteriores)
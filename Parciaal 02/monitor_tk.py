@@ -0,0 +1,177 @@
+import atexit
+import os
+import sys
+import time
+import tkinter as tk
+
+# Límites superiores (ms) de los grupos del histograma
+GRUPOS_MS = (1, 4, 8, 16, 33, 50, 100, 250, 1000, float("inf"))
+
+
+class _Estadistica:
+    """Histograma y totales de una serie de duraciones en milisegundos."""
+
+    def __init__(self):
+        self.cuenta = 0
+        self.total = 0.0
+        self.maximo = 0.0
+        self.grupos = [0] * len(GRUPOS_MS)
+
+    def agregar(self, ms):
+        self.cuenta += 1
+        self.total += ms
+        self.maximo = max(self.maximo, ms)
+        for i, limite in enumerate(GRUPOS_MS):
+            if ms < limite:
+                self.grupos[i] += 1
+                break
+
+    def percentil(self, p):
+        """Límite superior del grupo donde cae el percentil p (estimación del histograma)."""
+        objetivo, acumulado = p * self.cuenta, 0
+        for limite, cantidad in zip(GRUPOS_MS, self.grupos):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                return limite
+        return GRUPOS_MS[-1]
+
+
+class MonitorTk:
+    """
+    Mide cuánto bloquean el bucle de eventos de Tk los callbacks de una aplicación.
+    Al activarse envuelve todos los callbacks de Python que Tk ejecuta (command de
+    botones, bind y after) midiendo su duración, y arma un latido con after cada
+    'intervalo_ms' para medir el retraso del bucle. Los cuadros lentos se anotan
+    al momento y al salir se imprime un resumen con histogramas.
+    """
+    _activo = None  # Solo un monitor a la vez: envuelve tkinter.CallWrapper
+
+    def __init__(self, root, intervalo_ms=50, umbral_ms=50, salida=None):
+        """
+        Args:
+            root: Ventana principal (tk.Tk).
+            intervalo_ms (int): Periodo del latido.
+            umbral_ms (float): Retraso o duración a partir de la cual un cuadro se considera lento.
+            salida: Fichero de texto para el registro (por defecto, sys.stderr).
+        """
+        self.root = root
+        self.intervalo_ms = intervalo_ms
+        self.umbral_ms = umbral_ms
+        self.salida = salida or sys.stderr
+        self.callbacks = {}  # Nombre del callback -> _Estadistica
+        self.retraso = _Estadistica()
+        self.cuadros_lentos = 0
+        self._mas_lento = None  # (ms, nombre) del callback más lento desde el último latido
+        self._esperado = None
+        self._llamar_original = None
+        self._resumen_impreso = False
+
+    def iniciar(self):
+        """
+        Empieza a medir: envuelve los callbacks de Tk y arma el latido.
+        """
+        if MonitorTk._activo is not None:
+            MonitorTk._activo.detener()
+        MonitorTk._activo = self
+        self._llamar_original = tk.CallWrapper.__call__
+        monitor = self
+
+        def llamar_medido(envoltorio, *argumentos):
+            funcion = _funcion_original(envoltorio.func)
+            if funcion == monitor._latido:
+                return monitor._llamar_original(envoltorio, *argumentos)
+            inicio = time.perf_counter()
+            try:
+                return monitor._llamar_original(envoltorio, *argumentos)
+            finally:
+                monitor.registrar(_nombre_callback(funcion), (time.perf_counter() - inicio) * 1000)
+
+        tk.CallWrapper.__call__ = llamar_medido
+        self._esperado = time.perf_counter() + self.intervalo_ms / 1000
+        self.root.after(self.intervalo_ms, self._latido)
+        atexit.register(self.imprimir_resumen)
+        return self
+
+    def detener(self):
+        """
+        Deja de envolver los callbacks (el latido se apaga en el siguiente turno).
+        """
+        if MonitorTk._activo is self:
+            tk.CallWrapper.__call__ = self._llamar_original
+            MonitorTk._activo = None
+
+    def registrar(self, nombre, ms):
+        """
+        Anota la duración de un callback.
+        """
+        estadistica = self.callbacks.get(nombre)
+        if estadistica is None:
+            estadistica = self.callbacks[nombre] = _Estadistica()
+        estadistica.agregar(ms)
+        if self._mas_lento is None or ms > self._mas_lento[0]:
+            self._mas_lento = (ms, nombre)
+
+    def _latido(self):
+        """Mide cuánto tarde llegó el latido respecto a lo programado."""
+        ahora = time.perf_counter()
+        retraso = max(0.0, (ahora - self._esperado) * 1000)
+        self.retraso.agregar(retraso)
+        if retraso >= self.umbral_ms:
+            self.cuadros_lentos += 1
+            culpable = f" (callback más lento: {self._mas_lento[1]}, {self._mas_lento[0]:.1f} ms)" if self._mas_lento else ""
+            print(f"[monitor] Cuadro lento: el bucle de Tk se retrasó {retraso:.1f} ms{culpable}", file=self.salida)
+        self._mas_lento = None
+        if MonitorTk._activo is self:
+            self._esperado = ahora + self.intervalo_ms / 1000
+            self.root.after(self.intervalo_ms, self._latido)
+
+    def imprimir_resumen(self):
+        """
+        Imprime el histograma del retraso del bucle y de cada callback.
+        """
+        if self._resumen_impreso:
+            return
+        self._resumen_impreso = True
+        encabezado = " ".join(f"{'<' + format(limite, 'g') if limite != float('inf') else '>=1000':>7}"
+                              for limite in GRUPOS_MS)
+        print("\n[monitor] Resumen del bucle de eventos de Tk (ms)", file=self.salida)
+        print(f"  {'':<44} {'veces':>7} {'media':>7} {'p99':>7} {'máx':>8}   {encabezado}", file=self.salida)
+        filas = [("Retraso del latido", self.retraso)]
+        filas += sorted(self.callbacks.items(), key=lambda par: par[1].total, reverse=True)
+        for nombre, estadistica in filas:
+            if not estadistica.cuenta:
+                continue
+            grupos = " ".join(f"{cantidad:>7}" for cantidad in estadistica.grupos)
+            print(f"  {nombre[:44]:<44} {estadistica.cuenta:>7} {estadistica.total / estadistica.cuenta:>7.2f} "
+                  f"{format(estadistica.percentil(0.99), 'g'):>7} {estadistica.maximo:>8.1f}   {grupos}",
+                  file=self.salida)
+        print(f"  Cuadros lentos (>= {self.umbral_ms} ms): {self.cuadros_lentos}", file=self.salida)
+
+
+def _funcion_original(funcion):
+    """Función del usuario detrás de un callback (Misc.after la envuelve en 'callit')."""
+    codigo = getattr(funcion, "__code__", None)
+    if codigo is not None and codigo.co_name == "callit" and "func" in codigo.co_freevars:
+        return dict(zip(codigo.co_freevars, funcion.__closure__))["func"].cell_contents
+    return funcion
+
+
+def _nombre_callback(funcion):
+    """Nombre legible de un callback (con fichero y línea si es una lambda)."""
+    codigo = getattr(funcion, "__code__", None)
+    nombre = getattr(funcion, "__qualname__", type(funcion).__name__)
+    if codigo is not None and nombre.endswith("<lambda>"):
+        nombre += f" ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})"
+    return nombre
+
+
+def activar_si_se_pide(root, **opciones):
+    """
+    Activa el monitor si se ejecutó con --monitor o con la variable de entorno MONITOR_TK=1.
+
+    Returns:
+        MonitorTk or None: El monitor activo, o None.
+    """
+    if "--monitor" in sys.argv or os.environ.get("MONITOR_TK") == "1":
+        return MonitorTk(root, **opciones).iniciar()
+    return None
@@ -1,3 +1,43 @@
+import asyncio
+import bisect
+import contextlib
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import unicodedata
+import weakref
+from array import array
+from datetime import date, timedelta
+
+try:
+    import numpy as np  # Opcional: acelera las consultas de AnaliticaVentas
+except ImportError:
+    np = None
+
+try:
+    import resource  # Solo en sistemas Unix: memoria máxima del proceso
+except ImportError:
+    resource = None
+
+try:
+    import fcntl  # Bloqueo de ficheros entre procesos en Unix
+except ImportError:
+    fcntl = None
+    import msvcrt  # Equivalente en Windows
+
+# Estados de un pedido. Los finales sacan al pedido de los índices de pedidos activos.
+ESTADOS_VALIDOS = ["Pendiente", "Preparando", "Listo", "Entregado", "Cancelado"]
+ESTADOS_ACTIVOS = ["Pendiente", "Preparando", "Listo"]
+ESTADOS_FINALES = ["Entregado", "Cancelado"]
+
+
 class Plato:
     """
     Representa un plato del menú del restaurante.
@@ -12,9 +52,41 @@ class Plato:
             descripcion (str): Una breve descripción del plato.
         """
         self.nombre = nombre
+        # Registro de pedidos abiertos que contienen este plato; un cambio de
+        # precio ajusta sus totales sin recalcularlos. Las referencias son débiles:
+        # un pedido abandonado (que nadie más guarda) no queda vivo por el plato.
+        self._pedidos_abiertos = weakref.WeakSet()
+        self._indices_menu = []  # IndiceMenu que ordenan este plato por precio
+        self.precio_en_centavos = 0
         self.precio = precio
         self.descripcion = descripcion
 
+    @property
+    def precio(self):
+        """
+        Precio del plato en dólares. Internamente se guarda en centavos enteros.
+        """
+        return self.precio_en_centavos / 100
+
+    @precio.setter
+    def precio(self, nuevo_precio):
+        """
+        Cambia el precio y lo propaga a los pedidos abiertos que contienen el plato
+        y a los índices de menú.
+
+        Args:
+            nuevo_precio (float): El nuevo precio en dólares.
+        """
+        nuevos_centavos = round(nuevo_precio * 100)
+        anteriores = self.precio_en_centavos
+        diferencia = nuevos_centavos - anteriores
+        self.precio_en_centavos = nuevos_centavos
+        if diferencia:
+            for pedido in self._pedidos_abiertos:
+                pedido._total_centavos += diferencia * pedido.items[self]
+            for indice in self._indices_menu:
+                indice._reubicar(self, anteriores)
+
     def __str__(self):
         """
         Retorna una representación legible del objeto Plato.
@@ -25,19 +97,26 @@ class Pedido:
     """
     Representa un pedido realizado por un cliente.
     """
-    def __init__(self, id_pedido, cliente):
+    def __init__(self, id_pedido, cliente, prioridad=0, restaurante=None):
         """
         Inicializa un nuevo objeto Pedido.
 
         Args:
             id_pedido (str): Un identificador único para el pedido.
             cliente (Cliente): El objeto Cliente que realiza el pedido.
+            prioridad (int): Prioridad en cocina; un valor mayor se prepara antes.
+            restaurante (Restaurante): Restaurante cuyos índices se actualizan al cambiar el estado.
         """
         self.id_pedido = id_pedido
         self.cliente = cliente
         self.items = {}  # Diccionario para almacenar {Plato: cantidad}
-        self.total = 0.0
+        self._total_centavos = 0  # Total mantenido de forma incremental en centavos enteros
         self.estado = "Pendiente" # Estados posibles: "Pendiente", "Preparando", "Listo", "Entregado", "Cancelado"
+        self.prioridad = prioridad
+        self.creado_en = time.time()
+        self._restaurante = restaurante
+        self._entrada_cocina = None  # Entrada de este pedido en la cola de cocina, si está en ella
+        self._contabilizado = False  # True cuando ya se registró en la analítica de ventas
 
     def agregar_item(self, plato, cantidad):
         """
@@ -48,12 +127,20 @@ class Pedido:
             cantidad (int): La cantidad de ese plato.
         """
         if cantidad > 0:
-            self.items[plato] = self.items.get(plato, 0) + cantidad
-            self.calcular_total()
+            self._sumar_item(plato, cantidad)
             print(f"'{cantidad}x {plato.nombre}' agregado al pedido {self.id_pedido}.")
         else:
             print("La cantidad debe ser mayor que cero.")
 
+    def _sumar_item(self, plato, cantidad):
+        """
+        Agrega una cantidad ya validada de un plato, sin mensajes.
+        """
+        if plato not in self.items and self.estado not in ESTADOS_FINALES:
+            plato._pedidos_abiertos.add(self)
+        self.items[plato] = self.items.get(plato, 0) + cantidad
+        self._total_centavos += plato.precio_en_centavos * cantidad
+
     def remover_item(self, plato, cantidad):
         """
         Remueve una cantidad específica de un plato del pedido.
@@ -64,20 +151,41 @@ class Pedido:
         """
         if plato in self.items:
             if self.items[plato] <= cantidad:
+                self._total_centavos -= plato.precio_en_centavos * self.items[plato]
                 del self.items[plato]
+                plato._pedidos_abiertos.discard(self)
                 print(f"'{plato.nombre}' removido completamente del pedido {self.id_pedido}.")
             else:
                 self.items[plato] -= cantidad
+                self._total_centavos -= plato.precio_en_centavos * cantidad
                 print(f"'{cantidad}x {plato.nombre}' removido del pedido {self.id_pedido}.")
-            self.calcular_total()
         else:
             print(f"'{plato.nombre}' no está en el pedido {self.id_pedido}.")
 
     def calcular_total(self):
         """
-        Calcula el precio total del pedido.
+        Recalcula desde cero el precio total del pedido (el total ya se mantiene
+        actualizado al agregar o remover items).
+        """
+        self._total_centavos = sum(plato.precio_en_centavos * cantidad for plato, cantidad in self.items.items())
+
+    @property
+    def total_en_centavos(self):
+        """
+        Total del pedido en centavos enteros, exacto, para facturación.
+        """
+        return self._total_centavos
+
+    @property
+    def total(self):
+        """
+        Total del pedido en dólares.
         """
-        self.total = sum(plato.precio * cantidad for plato, cantidad in self.items.items())
+        return self._total_centavos / 100
+
+    @total.setter
+    def total(self, valor):
+        self._total_centavos = round(valor * 100)
 
     def actualizar_estado(self, nuevo_estado):
         """
@@ -86,13 +194,29 @@ class Pedido:
         Args:
             nuevo_estado (str): El nuevo estado del pedido.
         """
-        estados_validos = ["Pendiente", "Preparando", "Listo", "Entregado", "Cancelado"]
-        if nuevo_estado in estados_validos:
-            self.estado = nuevo_estado
+        if nuevo_estado in ESTADOS_VALIDOS:
+            self._cambiar_estado(nuevo_estado)
             print(f"Estado del pedido {self.id_pedido} actualizado a: {self.estado}.")
         else:
             print(f"Error: Estado '{nuevo_estado}' no válido.")
 
+    def _cambiar_estado(self, nuevo_estado):
+        """
+        Aplica un cambio a un estado ya validado y actualiza índices y registros, sin mensajes.
+        """
+        anterior = self.estado
+        self.estado = nuevo_estado
+        if nuevo_estado in ESTADOS_FINALES and anterior not in ESTADOS_FINALES:
+            # El total de un pedido cerrado queda fijo aunque cambien los precios
+            for plato in self.items:
+                plato._pedidos_abiertos.discard(self)
+        elif anterior in ESTADOS_FINALES and nuevo_estado not in ESTADOS_FINALES:
+            for plato in self.items:
+                plato._pedidos_abiertos.add(self)
+            self.calcular_total()
+        if self._restaurante is not None:
+            self._restaurante._reindexar_pedido(self, anterior)
+
     def __str__(self):
         """
         Retorna una representación legible del objeto Pedido.
@@ -126,22 +250,150 @@ class Cliente:
         """
         return f"Cliente: {self.nombre} (Tel: {self.telefono})"
 
+class IndiceMenu:
+    """
+    Índice de búsqueda del menú: trigramas de nombre y descripción para buscar
+    subcadenas, palabras ordenadas para prefijos cortos y una lista de precios
+    ordenada para filtros por rango. Los resultados de las consultas se guardan en
+    una caché que se vacía con cada cambio del menú.
+    """
+    def __init__(self, capacidad_cache=1_024):
+        """
+        Inicializa un índice vacío.
+
+        Args:
+            capacidad_cache (int): Consultas distintas que se recuerdan.
+        """
+        self._orden = {}  # Plato -> posición de inserción (los resultados salen en orden de menú)
+        self._textos = {}  # Plato -> nombre y descripción normalizados
+        self._trigramas = {}  # Trigrama -> set de platos
+        self._palabras = []  # (palabra, posición, plato) ordenadas, para prefijos de 1 o 2 letras
+        self._precios = []  # (centavos, posición) ordenados
+        self._por_posicion = []  # Posición -> plato
+        self.capacidad_cache = capacidad_cache
+        self._cache = {}
+
+    @staticmethod
+    def normalizar(texto):
+        """
+        Pasa un texto a minúsculas y sin tildes ("César" -> "cesar").
+        """
+        descompuesto = unicodedata.normalize("NFKD", texto.lower())
+        return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+    def agregar(self, plato):
+        """
+        Indexa un plato.
+
+        Args:
+            plato (Plato): El plato agregado al menú.
+        """
+        posicion = len(self._por_posicion)
+        self._orden[plato] = posicion
+        self._por_posicion.append(plato)
+        texto = self.normalizar(f"{plato.nombre} {plato.descripcion}")
+        self._textos[plato] = texto
+        for i in range(len(texto) - 2):
+            self._trigramas.setdefault(texto[i:i + 3], set()).add(plato)
+        for palabra in set(texto.split()):
+            bisect.insort(self._palabras, (palabra, posicion, plato))
+        bisect.insort(self._precios, (plato.precio_en_centavos, posicion))
+        plato._indices_menu.append(self)
+        self._cache.clear()
+
+    def _reubicar(self, plato, centavos_anteriores):
+        """Mueve un plato en la lista de precios tras un cambio de precio."""
+        posicion = self._orden[plato]
+        del self._precios[bisect.bisect_left(self._precios, (centavos_anteriores, posicion))]
+        bisect.insort(self._precios, (plato.precio_en_centavos, posicion))
+        self._cache.clear()
+
+    def _recordar(self, clave, resultado):
+        if self.capacidad_cache > 0:
+            if len(self._cache) >= self.capacidad_cache:
+                del self._cache[next(iter(self._cache))]  # La consulta más antigua
+            self._cache[clave] = resultado
+        return resultado
+
+    def buscar(self, texto):
+        """
+        Platos cuyo nombre o descripción contiene el texto (sin distinguir
+        mayúsculas ni tildes). Con una o dos letras busca palabras que empiezan así.
+
+        Args:
+            texto (str): Lo escrito en el buscador.
+
+        Returns:
+            tuple: Los platos encontrados, en orden de menú.
+        """
+        clave = ("texto", texto)
+        if clave in self._cache:
+            return self._cache[clave]
+        consulta = self.normalizar(texto).strip()
+        if not consulta:
+            encontrados = self._por_posicion
+        elif len(consulta) < 3:
+            inicio = bisect.bisect_left(self._palabras, (consulta,))
+            fin = bisect.bisect_left(self._palabras, (consulta + "\uffff",))
+            posiciones = {posicion for _, posicion, _ in self._palabras[inicio:fin]}
+            encontrados = [self._por_posicion[p] for p in sorted(posiciones)]
+        else:
+            # Se cruzan los conjuntos de trigramas empezando por el más pequeño
+            conjuntos = sorted((self._trigramas.get(consulta[i:i + 3], ()) for i in range(len(consulta) - 2)), key=len)
+            candidatos = set(conjuntos[0]).intersection(*conjuntos[1:]) if conjuntos[0] else ()
+            encontrados = sorted((p for p in candidatos if consulta in self._textos[p]), key=self._orden.__getitem__)
+        return self._recordar(clave, tuple(encontrados))
+
+    def por_precio(self, minimo=None, maximo=None):
+        """
+        Platos con precio entre minimo y maximo (ambos incluidos), del más barato al más caro.
+
+        Args:
+            minimo (float): Precio mínimo en dólares, o None.
+            maximo (float): Precio máximo en dólares, o None.
+
+        Returns:
+            tuple: Los platos en el rango.
+        """
+        clave = ("precio", minimo, maximo)
+        if clave in self._cache:
+            return self._cache[clave]
+        inicio = 0 if minimo is None else bisect.bisect_left(self._precios, (round(minimo * 100),))
+        fin = len(self._precios) if maximo is None else bisect.bisect_left(self._precios, (round(maximo * 100) + 1,))
+        return self._recordar(clave, tuple(self._por_posicion[p] for _, p in self._precios[inicio:fin]))
+
+
 class Restaurante:
     """
     Gestiona el menú, los clientes y los pedidos del restaurante.
     """
-    def __init__(self, nombre):
+    def __init__(self, nombre, asignador_ids=None):
         """
         Inicializa un nuevo objeto Restaurante.
 
         Args:
             nombre (str): El nombre del restaurante.
+            asignador_ids (AsignadorIdsPedidos): Secuencia compartida de números de pedido
+                para varios procesos; si es None se usa un contador propio.
         """
         self.nombre = nombre
         self.menu = {}  # Diccionario para almacenar platos, usando nombre como clave
+        self.indice_menu = IndiceMenu()  # Búsqueda por texto y precio, mantenida por agregar_plato_menu
         self.clientes = {} # Diccionario para almacenar clientes, usando teléfono como clave
         self.pedidos = {} # Diccionario para almacenar pedidos, usando id_pedido como clave
         self._next_pedido_id = 1 # Contador interno para generar IDs de pedidos
+        self._asignador_ids = asignador_ids
+        # Índices de pedidos activos, mantenidos por Pedido.actualizar_estado:
+        # en orden de creación y agrupados por estado. Los pedidos entregados o
+        # cancelados salen de ellos y de la cola de cocina.
+        self._activos = {}
+        self._por_estado = {estado: {} for estado in ESTADOS_ACTIVOS}
+        # Cola de cocina: montículo de pedidos pendientes por (-prioridad, creación)
+        self._cola_cocina = []
+        self._retirados_cocina = 0  # Entradas anuladas que siguen en el montículo
+        self._secuencia = itertools.count()
+        self.analitica = None  # AnaliticaVentas opcional (ver activar_analitica)
+        self.archivo = None  # ArchivoPedidos opcional (ver activar_archivo)
 
     def agregar_plato_menu(self, plato):
         """
@@ -154,6 +406,7 @@ class Restaurante:
             print(f"Error: El plato '{plato.nombre}' ya existe en el menú.")
         else:
             self.menu[plato.nombre] = plato
+            self.indice_menu.agregar(plato)
             print(f"Plato '{plato.nombre}' agregado al menú.")
 
     def registrar_cliente(self, cliente):
@@ -169,12 +422,13 @@ class Restaurante:
             self.clientes[cliente.telefono] = cliente
             print(f"Cliente '{cliente.nombre}' registrado.")
 
-    def crear_pedido(self, telefono_cliente):
+    def crear_pedido(self, telefono_cliente, prioridad=0):
         """
         Crea un nuevo pedido para un cliente.
 
         Args:
             telefono_cliente (str): El número de teléfono del cliente que realiza el pedido.
+            prioridad (int): Prioridad en cocina; un valor mayor se prepara antes.
 
         Returns:
             Pedido or None: El objeto Pedido creado, o None si el cliente no existe.
@@ -184,12 +438,25 @@ class Restaurante:
             print(f"Error: Cliente con teléfono {telefono_cliente} no encontrado.")
             return None
 
-        pedido_id = f"PED-{self._next_pedido_id:04d}"
-        self._next_pedido_id += 1
-        nuevo_pedido = Pedido(pedido_id, cliente)
+        nuevo_pedido = self._nuevo_pedido(cliente, prioridad)
+        print(f"Pedido {nuevo_pedido.id_pedido} creado para {cliente.nombre}.")
+        return nuevo_pedido
+
+    def _nuevo_pedido(self, cliente, prioridad=0):
+        """
+        Crea y registra un pedido para un cliente ya validado, sin mensajes.
+        """
+        if self._asignador_ids is None:
+            pedido_id = f"PED-{self._next_pedido_id:04d}"
+            self._next_pedido_id += 1
+        else:
+            pedido_id = f"PED-{self._asignador_ids.siguiente():04d}"
+        nuevo_pedido = Pedido(pedido_id, cliente, prioridad, self)
         self.pedidos[pedido_id] = nuevo_pedido
         cliente.pedidos.append(nuevo_pedido)
-        print(f"Pedido {pedido_id} creado para {cliente.nombre}.")
+        self._activos[pedido_id] = nuevo_pedido
+        self._por_estado["Pendiente"][pedido_id] = nuevo_pedido
+        self._encolar_cocina(nuevo_pedido)
         return nuevo_pedido
 
     def mostrar_menu(self):
@@ -203,12 +470,37 @@ class Restaurante:
         else:
             print("El menú está vacío.")
 
+    def buscar_platos(self, texto):
+        """
+        Busca platos del menú por parte del nombre o de la descripción.
+
+        Args:
+            texto (str): Texto a buscar (sin distinguir mayúsculas ni tildes).
+
+        Returns:
+            tuple: Los platos encontrados, en orden de menú.
+        """
+        return self.indice_menu.buscar(texto)
+
+    def platos_por_precio(self, minimo=None, maximo=None):
+        """
+        Retorna los platos del menú en un rango de precios, del más barato al más caro.
+
+        Args:
+            minimo (float): Precio mínimo en dólares, o None.
+            maximo (float): Precio máximo en dólares, o None.
+
+        Returns:
+            tuple: Los platos en el rango.
+        """
+        return self.indice_menu.por_precio(minimo, maximo)
+
     def mostrar_pedidos_activos(self):
         """
         Muestra todos los pedidos que no están en estado 'Entregado' o 'Cancelado'.
         """
         print("\n--- Pedidos Activos ---")
-        activos = [p for p in self.pedidos.values() if p.estado not in ["Entregado", "Cancelado"]]
+        activos = list(self._activos.values())
         if activos:
             for pedido in activos:
                 print(f"\n{pedido}")
@@ -216,8 +508,1427 @@ class Restaurante:
         else:
             print("No hay pedidos activos en este momento.")
 
+    def activar_analitica(self, analitica=None):
+        """
+        Empieza a registrar cada pedido entregado en un motor de analítica de ventas.
+
+        Args:
+            analitica (AnaliticaVentas): Motor a usar; si es None se crea uno nuevo.
+
+        Returns:
+            AnaliticaVentas: El motor activo.
+        """
+        self.analitica = analitica or AnaliticaVentas()
+        return self.analitica
+
+    def activar_archivo(self, directorio, **opciones):
+        """
+        Empieza a mover a disco los pedidos entregados o cancelados. Desde entonces
+        Restaurante.pedidos y Cliente.pedidos solo conservan los pedidos en curso;
+        los finalizados se consultan con buscar_pedido e historial_pedidos.
+
+        Args:
+            directorio (str): Carpeta de los segmentos del archivo (se crea si no existe).
+            **opciones: Parámetros de ArchivoPedidos.
+
+        Returns:
+            ArchivoPedidos: El archivo activo.
+        """
+        self.archivo = ArchivoPedidos(directorio, **opciones)
+        # Al reabrir un archivo existente se continúa la numeración de pedidos
+        self._next_pedido_id = max(self._next_pedido_id, self.archivo.ultimo_numero + 1)
+        for pedido in [p for p in self.pedidos.values() if p.estado in ESTADOS_FINALES]:
+            self._archivar(pedido)
+        return self.archivo
+
+    def _archivar(self, pedido):
+        """
+        Escribe un pedido finalizado en el archivo y lo saca de la memoria. El objeto
+        queda desvinculado: cambiarle el estado ya no afecta al restaurante.
+        """
+        self.archivo.archivar(pedido)
+        del self.pedidos[pedido.id_pedido]
+        with contextlib.suppress(ValueError):
+            pedido.cliente.pedidos.remove(pedido)
+        pedido._restaurante = None
+
+    def buscar_pedido(self, id_pedido):
+        """
+        Busca un pedido en memoria o, si ya fue archivado, en disco.
+
+        Args:
+            id_pedido (str): El identificador del pedido.
+
+        Returns:
+            Pedido or None: El pedido (una copia de solo lectura si viene del archivo), o None.
+        """
+        pedido = self.pedidos.get(id_pedido)
+        if pedido is None and self.archivo is not None:
+            registro = self.archivo.buscar(id_pedido)
+            if registro is not None:
+                pedido = self._reconstruir_pedido(registro)
+        return pedido
+
+    def historial_pedidos(self, telefono_cliente=None):
+        """
+        Recorre los pedidos finalizados, leyendo los archivados por streaming desde
+        disco sin cargarlos todos en memoria.
+
+        Args:
+            telefono_cliente (str): Si se indica, solo los pedidos de ese cliente.
+
+        Yields:
+            Pedido: Cada pedido entregado o cancelado, en orden de finalización.
+        """
+        if self.archivo is not None:
+            for registro in self.archivo.recorrer():
+                if telefono_cliente is None or registro[1] == telefono_cliente:
+                    yield self._reconstruir_pedido(registro)
+        for pedido in list(self.pedidos.values()):
+            if pedido.estado in ESTADOS_FINALES and telefono_cliente in (None, pedido.cliente.telefono):
+                yield pedido
+
+    def _reconstruir_pedido(self, registro):
+        """
+        Crea un Pedido desvinculado a partir de un registro del archivo, con los
+        precios que tenía al cerrarse.
+        """
+        id_pedido, telefono, nombre, estado, prioridad, creado_en, total_centavos, lineas = registro
+        cliente = self.clientes.get(telefono) or Cliente(nombre, telefono)
+        pedido = Pedido(id_pedido, cliente, prioridad)
+        pedido.estado = estado
+        pedido.creado_en = creado_en
+        pedido._contabilizado = True
+        for nombre_plato, cantidad, centavos in lineas:
+            plato = self.menu.get(nombre_plato)
+            if plato is None or plato.precio_en_centavos != centavos:
+                plato = Plato(nombre_plato, centavos / 100, plato.descripcion if plato else "")
+            pedido.items[plato] = cantidad
+        pedido._total_centavos = total_centavos
+        return pedido
+
+    def pedidos_por_estado(self, estado):
+        """
+        Retorna los pedidos activos en un estado, en orden de creación, sin recorrer
+        el historial completo.
+
+        Args:
+            estado (str): "Pendiente", "Preparando" o "Listo".
+
+        Returns:
+            list: Los objetos Pedido en ese estado.
+        """
+        return list(self._por_estado.get(estado, {}).values())
+
+    def contar_pedidos_activos(self):
+        """
+        Retorna el número de pedidos activos por estado.
+
+        Returns:
+            dict: {estado: cantidad} para cada estado activo.
+        """
+        return {estado: len(pedidos) for estado, pedidos in self._por_estado.items()}
+
+    def ver_siguiente_pedido(self):
+        """
+        Retorna el próximo pedido que debe prepararse sin sacarlo de la cola.
+
+        Returns:
+            Pedido or None: El pedido pendiente más prioritario (y más antiguo), o None.
+        """
+        cola = self._cola_cocina
+        while cola and cola[0][-1] is None:
+            heapq.heappop(cola)
+            self._retirados_cocina -= 1
+        return cola[0][-1] if cola else None
+
+    def tomar_siguiente_pedido(self):
+        """
+        Saca de la cola de cocina el próximo pedido y lo pasa a "Preparando", en O(log n).
+
+        Returns:
+            Pedido or None: El pedido a preparar, o None si no hay pendientes.
+        """
+        pedido = self.ver_siguiente_pedido()
+        if pedido is not None:
+            pedido.actualizar_estado("Preparando")
+        return pedido
+
+    def _encolar_cocina(self, pedido):
+        entrada = [-pedido.prioridad, pedido.creado_en, next(self._secuencia), pedido]
+        pedido._entrada_cocina = entrada
+        heapq.heappush(self._cola_cocina, entrada)
+
+    def _retirar_de_cocina(self, pedido):
+        # Borrado perezoso: la entrada se anula y se descarta al llegar a la cima.
+        pedido._entrada_cocina[-1] = None
+        pedido._entrada_cocina = None
+        self._retirados_cocina += 1
+        if self._retirados_cocina > len(self._cola_cocina) // 2:
+            self._cola_cocina = [e for e in self._cola_cocina if e[-1] is not None]
+            heapq.heapify(self._cola_cocina)
+            self._retirados_cocina = 0
+
+    def _reindexar_pedido(self, pedido, estado_anterior):
+        """
+        Mueve un pedido entre los índices tras un cambio de estado (lo llama Pedido.actualizar_estado).
+
+        Args:
+            pedido (Pedido): El pedido que cambió de estado.
+            estado_anterior (str): El estado que tenía antes del cambio.
+        """
+        id_pedido = pedido.id_pedido
+        if estado_anterior in self._por_estado:
+            self._por_estado[estado_anterior].pop(id_pedido, None)
+        if pedido.estado in self._por_estado:
+            self._por_estado[pedido.estado][id_pedido] = pedido
+            if id_pedido not in self._activos:
+                # Pedido finalizado que se reabre (caso raro): se reconstruye el
+                # índice para conservar el orden de creación.
+                self._activos[id_pedido] = pedido
+                self._activos = {i: p for i, p in self.pedidos.items() if i in self._activos}
+        else:
+            self._activos.pop(id_pedido, None)
+
+        if pedido.estado == "Entregado" and self.analitica is not None:
+            self.analitica.registrar_pedido(pedido)
+
+        if pedido.estado == "Pendiente":
+            if pedido._entrada_cocina is None:
+                self._encolar_cocina(pedido)
+        elif pedido._entrada_cocina is not None:
+            if self._cola_cocina and self._cola_cocina[0] is pedido._entrada_cocina:
+                # Caso habitual (tomar_siguiente_pedido): sale por la cima en O(log n)
+                heapq.heappop(self._cola_cocina)
+                pedido._entrada_cocina = None
+            else:
+                self._retirar_de_cocina(pedido)
+
+        if pedido.estado in ESTADOS_FINALES and self.archivo is not None:
+            self._archivar(pedido)
+
+
+class RecepcionPedidos:
+    """
+    Canal asíncrono (asyncio) de recepción de pedidos para horas punta.
+    Los clientes envían pedidos a una cola de recepción acotada; un validador los
+    comprueba contra el menú y los clientes registrados, los crea en el Restaurante
+    y los pasa a la cocina a través de otra cola acotada y con prioridad. Cada
+    cocinero toma el pedido más prioritario de esa cola, así que los pedidos
+    creados fuera del canal no le quitan turno a ninguno de sus clientes.
+    Si alguna cola se llena, quien envía espera (contrapresión).
+    """
+    def __init__(self, restaurante, capacidad_recepcion=1000, capacidad_cocina=200, cocineros=4,
+                 tiempo_preparacion=0.0):
+        """
+        Inicializa el canal de recepción.
+
+        Args:
+            restaurante (Restaurante): El restaurante que recibe los pedidos.
+            capacidad_recepcion (int): Máximo de pedidos esperando validación.
+            capacidad_cocina (int): Máximo de pedidos aceptados esperando a un cocinero.
+            cocineros (int): Número de tareas que preparan pedidos en paralelo.
+            tiempo_preparacion (float): Segundos simulados de preparación por pedido.
+        """
+        self.restaurante = restaurante
+        self.capacidad_recepcion = capacidad_recepcion
+        self.capacidad_cocina = capacidad_cocina
+        self.cocineros = cocineros
+        self.tiempo_preparacion = tiempo_preparacion
+        self._recepcion = None
+        self._cocina = None
+        self._tareas = []
+        self._esperando = {}  # Clave: id_pedido, Valor: Future del cliente que lo envió
+        self._secuencia = itertools.count()  # Desempate FIFO entre pedidos de igual prioridad
+
+    async def iniciar(self):
+        """
+        Crea las colas y lanza las tareas del validador y de los cocineros.
+        """
+        self._recepcion = asyncio.Queue(self.capacidad_recepcion)
+        self._cocina = asyncio.PriorityQueue(self.capacidad_cocina)
+        self._tareas = [asyncio.create_task(self._validar())]
+        self._tareas += [asyncio.create_task(self._cocinar()) for _ in range(self.cocineros)]
+
+    async def detener(self):
+        """
+        Espera a que se procesen los pedidos ya recibidos y detiene las tareas.
+        """
+        await self._recepcion.join()
+        await self._cocina.join()
+        for tarea in self._tareas:
+            tarea.cancel()
+        await asyncio.gather(*self._tareas, return_exceptions=True)
+        self._tareas = []
+
+    async def enviar_pedido(self, telefono_cliente, items, prioridad=0):
+        """
+        Envía un pedido y espera a que esté listo.
+
+        Args:
+            telefono_cliente (str): Teléfono del cliente registrado.
+            items (list): Lista de tuplas (nombre del plato, cantidad).
+            prioridad (int): Prioridad en cocina; un valor mayor se prepara antes.
+
+        Returns:
+            Pedido: El pedido en estado "Listo".
+
+        Raises:
+            ValueError: Si el cliente, algún plato o alguna cantidad no son válidos.
+            TypeError: Si items no es una lista de pares (plato, cantidad).
+        """
+        futuro = asyncio.get_running_loop().create_future()
+        await self._recepcion.put((telefono_cliente, items, prioridad, futuro))
+        return await futuro
+
+    def _validar_solicitud(self, telefono_cliente, items):
+        cliente = self.restaurante.clientes.get(telefono_cliente)
+        if cliente is None:
+            raise ValueError(f"Cliente con teléfono {telefono_cliente} no encontrado.")
+        if not items:
+            raise ValueError("El pedido no tiene items.")
+        lineas = []
+        for nombre_plato, cantidad in items:
+            plato = self.restaurante.menu.get(nombre_plato)
+            if plato is None:
+                raise ValueError(f"El plato '{nombre_plato}' no está en el menú.")
+            if not isinstance(cantidad, int) or isinstance(cantidad, bool):
+                raise ValueError(f"La cantidad de '{nombre_plato}' debe ser un número entero.")
+            if cantidad <= 0:
+                raise ValueError("La cantidad debe ser mayor que cero.")
+            lineas.append((plato, cantidad))
+        return cliente, lineas
+
+    async def _validar(self):
+        while True:
+            telefono_cliente, items, prioridad, futuro = await self._recepcion.get()
+            try:
+                cliente, lineas = self._validar_solicitud(telefono_cliente, items)
+            except (ValueError, TypeError) as error:
+                # Una solicitud mal formada solo falla para su cliente; el validador sigue
+                futuro.set_exception(error)
+            else:
+                pedido = self.restaurante._nuevo_pedido(cliente, prioridad)
+                for plato, cantidad in lineas:
+                    pedido._sumar_item(plato, cantidad)
+                self._esperando[pedido.id_pedido] = futuro
+                await self._cocina.put((-prioridad, next(self._secuencia), pedido))
+            finally:
+                self._recepcion.task_done()
+
+    async def _cocinar(self):
+        while True:
+            _, _, pedido = await self._cocina.get()
+            try:
+                futuro = self._esperando.pop(pedido.id_pedido, None)
+                if pedido.estado != "Pendiente":
+                    # Cancelado o tomado por otra vía mientras esperaba turno
+                    if futuro is not None and not futuro.done():
+                        futuro.set_exception(ValueError(f"El pedido {pedido.id_pedido} ya no está pendiente."))
+                    continue
+                pedido._cambiar_estado("Preparando")
+                if self.tiempo_preparacion:
+                    await asyncio.sleep(self.tiempo_preparacion)
+                pedido._cambiar_estado("Listo")
+                if futuro is not None and not futuro.done():
+                    futuro.set_result(pedido)
+            finally:
+                self._cocina.task_done()
+
+
+class AnaliticaVentas:
+    """
+    Analítica de ventas sobre pedidos entregados, en formato columnar.
+    Cada línea de pedido se añade a arreglos compactos (plato, cantidad, centavos,
+    momento, cliente) con platos y clientes codificados como enteros. Las consultas
+    agrupan sobre esas columnas (con NumPy si está instalado) y los resúmenes
+    diarios se actualizan de forma incremental al registrar cada pedido.
+    """
+    def __init__(self, dias_retenidos=90):
+        """
+        Inicializa el motor de analítica vacío.
+
+        Args:
+            dias_retenidos (int): Días que se conservan en el resumen diario.
+        """
+        self.dias_retenidos = dias_retenidos
+        self._nombres_platos = []  # Índice: ID de plato, Valor: nombre
+        self._ids_platos = {}
+        self._telefonos = []  # Índice: ID de cliente, Valor: teléfono
+        self._ids_clientes = {}
+        # Columnas: una fila por línea de pedido
+        self.plato = array("I")
+        self.cantidad = array("I")
+        self.centavos = array("q")
+        self.momento = array("d")
+        self.cliente = array("I")
+        self._ordenado = True  # Si 'momento' es no decreciente se filtra por rango con bisect
+        self.pedidos = 0
+        self.ingresos_centavos = 0
+        self._resumen_diario = {}  # Clave: date, Valor: [ingresos en centavos, pedidos, unidades]
+
+    @staticmethod
+    def _codificar(valor, ids, valores):
+        id_valor = ids.get(valor)
+        if id_valor is None:
+            id_valor = ids[valor] = len(valores)
+            valores.append(valor)
+        return id_valor
+
+    def registrar_pedido(self, pedido, momento=None):
+        """
+        Añade las líneas de un pedido entregado a las columnas y al resumen diario.
+
+        Args:
+            pedido (Pedido): El pedido entregado.
+            momento (float): Marca de tiempo de la venta; por defecto, ahora.
+        """
+        if pedido._contabilizado:
+            return
+        pedido._contabilizado = True
+        momento = time.time() if momento is None else momento
+        if self.momento and momento < self.momento[-1]:
+            self._ordenado = False
+        id_cliente = self._codificar(pedido.cliente.telefono, self._ids_clientes, self._telefonos)
+        unidades = 0
+        for plato, cantidad in pedido.items.items():
+            self.plato.append(self._codificar(plato.nombre, self._ids_platos, self._nombres_platos))
+            self.cantidad.append(cantidad)
+            self.centavos.append(plato.precio_en_centavos * cantidad)
+            self.momento.append(momento)
+            self.cliente.append(id_cliente)
+            unidades += cantidad
+
+        self.pedidos += 1
+        self.ingresos_centavos += pedido.total_en_centavos
+        dia = date.fromtimestamp(momento)
+        resumen = self._resumen_diario.get(dia)
+        if resumen is None:
+            resumen = self._resumen_diario[dia] = [0, 0, 0]
+            limite = dia - timedelta(days=self.dias_retenidos)
+            for viejo in [d for d in self._resumen_diario if d <= limite]:
+                del self._resumen_diario[viejo]
+        resumen[0] += pedido.total_en_centavos
+        resumen[1] += 1
+        resumen[2] += unidades
+
+    def _rango(self, desde, hasta):
+        """Índices [inicio, fin) de las filas con desde <= momento < hasta (si están ordenadas)."""
+        inicio = 0 if desde is None else bisect.bisect_left(self.momento, desde)
+        fin = len(self.momento) if hasta is None else bisect.bisect_left(self.momento, hasta)
+        return inicio, fin
+
+    def _sumar_por(self, claves, valores, cantidad_claves, desde=None, hasta=None):
+        """Suma 'valores' agrupando por 'claves' (group-by), opcionalmente en un rango de tiempo."""
+        if self._ordenado or (desde is None and hasta is None):
+            inicio, fin = self._rango(desde, hasta)
+            filtro = None
+        else:
+            inicio, fin = 0, len(self.momento)
+            filtro = (desde or float("-inf"), hasta or float("inf"))
+        if np is not None:
+            columna_claves = np.frombuffer(claves, dtype=f"u{claves.itemsize}")[inicio:fin]
+            columna_valores = np.frombuffer(valores, dtype=f"i{valores.itemsize}" if valores.typecode == "q"
+                                            else f"u{valores.itemsize}")[inicio:fin]
+            if filtro is not None:
+                momentos = np.frombuffer(self.momento, dtype=np.float64)
+                mascara = (momentos >= filtro[0]) & (momentos < filtro[1])
+                columna_claves, columna_valores = columna_claves[mascara], columna_valores[mascara]
+            return np.bincount(columna_claves, weights=columna_valores, minlength=cantidad_claves)
+        totales = [0] * cantidad_claves
+        if filtro is None:
+            for clave, valor in zip(claves[inicio:fin], valores[inicio:fin]):
+                totales[clave] += valor
+        else:
+            for clave, valor, momento in zip(claves, valores, self.momento):
+                if filtro[0] <= momento < filtro[1]:
+                    totales[clave] += valor
+        return totales
+
+    @staticmethod
+    def _mayores(totales, k):
+        """Índices de los k mayores totales, de mayor a menor."""
+        if np is not None:
+            totales = np.asarray(totales)
+            k = min(k, len(totales))
+            if k == 0:
+                return []
+            indices = np.argpartition(-totales, k - 1)[:k]
+            return [int(i) for i in indices[np.argsort(-totales[indices], kind="stable")]]
+        return heapq.nlargest(k, range(len(totales)), key=totales.__getitem__)
+
+    def platos_mas_vendidos(self, k=5, por="cantidad", desde=None, hasta=None):
+        """
+        Retorna los k platos más vendidos.
+
+        Args:
+            k (int): Cuántos platos retornar.
+            por (str): "cantidad" (unidades) o "ingresos" (dólares).
+            desde (float): Marca de tiempo mínima (incluida), opcional.
+            hasta (float): Marca de tiempo máxima (excluida), opcional.
+
+        Returns:
+            list: Tuplas (nombre del plato, unidades o dólares), de mayor a menor.
+        """
+        valores = self.cantidad if por == "cantidad" else self.centavos
+        totales = self._sumar_por(self.plato, valores, len(self._nombres_platos), desde, hasta)
+        if por == "cantidad":
+            return [(self._nombres_platos[i], int(totales[i])) for i in self._mayores(totales, k) if totales[i]]
+        return [(self._nombres_platos[i], int(totales[i]) / 100) for i in self._mayores(totales, k) if totales[i]]
+
+    def gasto_por_cliente(self, k=10, desde=None, hasta=None):
+        """
+        Retorna los k clientes que más han gastado.
+
+        Args:
+            k (int): Cuántos clientes retornar.
+            desde (float): Marca de tiempo mínima (incluida), opcional.
+            hasta (float): Marca de tiempo máxima (excluida), opcional.
+
+        Returns:
+            list: Tuplas (teléfono del cliente, dólares gastados), de mayor a menor.
+        """
+        totales = self._sumar_por(self.cliente, self.centavos, len(self._telefonos), desde, hasta)
+        return [(self._telefonos[i], int(totales[i]) / 100) for i in self._mayores(totales, k) if totales[i]]
+
+    def ticket_promedio(self):
+        """
+        Retorna el importe medio por pedido entregado, en dólares.
+        """
+        return self.ingresos_centavos / self.pedidos / 100 if self.pedidos else 0.0
+
+    def resumen_diario(self):
+        """
+        Retorna el resumen de los días retenidos, en orden cronológico.
+
+        Returns:
+            list: Tuplas (fecha, ingresos en dólares, pedidos, ticket promedio, unidades).
+        """
+        return [(dia, ingresos / 100, pedidos, ingresos / pedidos / 100, unidades)
+                for dia, (ingresos, pedidos, unidades) in sorted(self._resumen_diario.items())]
+
+
+class ArchivoPedidos:
+    """
+    Archivo frío de pedidos finalizados. Cada pedido se añade como una línea JSON
+    compacta al segmento actual (pedidos-NNNNNN.log, solo de anexado) y su posición
+    a un índice binario (pedidos-NNNNNN.idx) de 16 bytes por pedido. En memoria solo
+    se mantienen páginas de 256 posiciones (arrays) indexadas por el número del
+    pedido, creadas solo para los tramos de números usados: con números repartidos
+    en bloques entre procesos no se reserva memoria para los huecos. Buscar un
+    pedido es O(1) más una lectura de disco. Al reabrir se descarta un
+    registro final a medio escribir y se completa el índice a partir del log.
+    """
+    _BITS_DESPLAZAMIENTO = 40  # Posición = segmento << 40 | desplazamiento en bytes
+    _BITS_PAGINA = 8  # Números de pedido por página del índice en memoria: 256
+
+    def __init__(self, directorio, bytes_por_segmento=64 * 2 ** 20):
+        """
+        Abre (o crea) el archivo en un directorio y carga sus índices.
+
+        Args:
+            directorio (str): Carpeta de los segmentos.
+            bytes_por_segmento (int): Tamaño a partir del cual se empieza un segmento nuevo.
+        """
+        self.directorio = directorio
+        self.bytes_por_segmento = bytes_por_segmento
+        os.makedirs(directorio, exist_ok=True)
+        # Número >> _BITS_PAGINA -> array de 256 posiciones + 1 (0 = no archivado)
+        self._paginas = {}
+        # Identificadores que no siguen el formato PED-n: solo se indexan en memoria
+        # durante la sesión (recorrer() los sigue viendo tras reabrir)
+        self._otras_posiciones = {}
+        self.ultimo_numero = 0
+        self.total = 0
+        segmentos = sorted(int(nombre[8:14]) for nombre in os.listdir(directorio)
+                           if nombre.startswith("pedidos-") and nombre.endswith(".log"))
+        for segmento in segmentos:
+            self._cargar_indice(segmento)
+        self._segmento = segmentos[-1] if segmentos else 1
+        self._abrir_segmento()
+
+    def _ruta(self, segmento, extension):
+        return os.path.join(self.directorio, f"pedidos-{segmento:06d}.{extension}")
+
+    def _cargar_indice(self, segmento):
+        """
+        Carga el índice de un segmento tras una posible escritura interrumpida: recorta
+        el log hasta su último salto de línea, descarta las entradas incompletas o que
+        apuntan más allá del final y reconstruye desde el log las que no llegaron al .idx.
+        """
+        ruta_log = self._ruta(segmento, "log")
+        tamano_log = self._recortar_cola(ruta_log)
+        datos = b""
+        with contextlib.suppress(FileNotFoundError):
+            with open(self._ruta(segmento, "idx"), "rb") as archivo_indice:
+                datos = archivo_indice.read()
+        entradas = array("Q")
+        entradas.frombytes(datos[:len(datos) - len(datos) % 16])
+        validas = array("Q")
+        ultimo = None  # Desplazamiento del último registro indexado
+        for i in range(0, len(entradas), 2):
+            numero, desplazamiento = entradas[i], entradas[i + 1]
+            if desplazamiento < tamano_log:
+                self._indexar(numero, segmento << self._BITS_DESPLAZAMIENTO | desplazamiento)
+                validas.extend((numero, desplazamiento))
+                ultimo = desplazamiento if ultimo is None else max(ultimo, desplazamiento)
+        faltantes = array("Q")
+        with open(ruta_log, "rb") as archivo_log:
+            if ultimo is not None:
+                archivo_log.seek(ultimo)
+                archivo_log.readline()
+            desplazamiento = archivo_log.tell()
+            for linea in archivo_log:
+                numero = self._numero(json.loads(linea)[0])
+                if numero is not None:
+                    self._indexar(numero, segmento << self._BITS_DESPLAZAMIENTO | desplazamiento)
+                    faltantes.extend((numero, desplazamiento))
+                desplazamiento += len(linea)
+        if len(validas) * 8 != len(datos):
+            # Entradas rotas o huérfanas: se reescribe el índice para que no se anexe detrás
+            with open(self._ruta(segmento, "idx"), "wb") as archivo_indice:
+                archivo_indice.write((validas + faltantes).tobytes())
+        elif faltantes:
+            with open(self._ruta(segmento, "idx"), "ab") as archivo_indice:
+                archivo_indice.write(faltantes.tobytes())
+
+    @staticmethod
+    def _recortar_cola(ruta, bloque=64 * 1024):
+        """
+        Trunca un log tras su último salto de línea (un registro a medio escribir) y
+        retorna el tamaño resultante.
+        """
+        with open(ruta, "r+b") as archivo_log:
+            fin = archivo_log.seek(0, os.SEEK_END)
+            tamano = fin
+            while tamano > 0:
+                inicio = max(0, tamano - bloque)
+                archivo_log.seek(inicio)
+                salto = archivo_log.read(tamano - inicio).rfind(b"\n")
+                if salto >= 0:
+                    tamano = inicio + salto + 1
+                    break
+                tamano = inicio
+            if tamano != fin:
+                archivo_log.truncate(tamano)
+        return tamano
+
+    def _indexar(self, numero, posicion):
+        pagina = self._paginas.get(numero >> self._BITS_PAGINA)
+        if pagina is None:
+            pagina = self._paginas[numero >> self._BITS_PAGINA] = array("Q", bytes(8 << self._BITS_PAGINA))
+        indice = numero & ((1 << self._BITS_PAGINA) - 1)
+        if not pagina[indice]:
+            self.total += 1
+        pagina[indice] = posicion + 1
+        self.ultimo_numero = max(self.ultimo_numero, numero)
+
+    def _posicion(self, numero):
+        """Posición archivada de un número de pedido, o None."""
+        pagina = self._paginas.get(numero >> self._BITS_PAGINA)
+        posicion = 0 if pagina is None else pagina[numero & ((1 << self._BITS_PAGINA) - 1)]
+        return posicion - 1 if posicion else None
+
+    @staticmethod
+    def _numero(id_pedido):
+        """Número de un identificador PED-n, o None si tiene otro formato."""
+        prefijo, _, numero = id_pedido.partition("-")
+        return int(numero) if prefijo == "PED" and numero.isdigit() else None
+
+    def _abrir_segmento(self):
+        self._log = open(self._ruta(self._segmento, "log"), "ab")
+        self._indice = open(self._ruta(self._segmento, "idx"), "ab")
+        self._tamano = self._log.tell()
+
+    def archivar(self, pedido):
+        """
+        Añade un pedido finalizado al segmento actual.
+
+        Args:
+            pedido (Pedido): El pedido entregado o cancelado.
+        """
+        if self._tamano >= self.bytes_por_segmento:
+            self._log.close()
+            self._indice.close()
+            self._segmento += 1
+            self._abrir_segmento()
+        registro = [pedido.id_pedido, pedido.cliente.telefono, pedido.cliente.nombre, pedido.estado,
+                    pedido.prioridad, pedido.creado_en, pedido.total_en_centavos,
+                    [[plato.nombre, cantidad, plato.precio_en_centavos] for plato, cantidad in pedido.items.items()]]
+        linea = (json.dumps(registro, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        desplazamiento = self._tamano
+        self._log.write(linea)
+        self._tamano += len(linea)
+        posicion = self._segmento << self._BITS_DESPLAZAMIENTO | desplazamiento
+        numero = self._numero(pedido.id_pedido)
+        if numero is None:
+            if pedido.id_pedido not in self._otras_posiciones:
+                self.total += 1
+            self._otras_posiciones[pedido.id_pedido] = posicion
+        else:
+            self._indexar(numero, posicion)
+            self._indice.write(array("Q", (numero, desplazamiento)).tobytes())
+
+    def buscar(self, id_pedido):
+        """
+        Lee de disco el registro de un pedido archivado.
+
+        Args:
+            id_pedido (str): El identificador del pedido.
+
+        Returns:
+            list or None: El registro [id, teléfono, nombre, estado, prioridad, creado_en,
+            total en centavos, [[plato, cantidad, centavos], ...]], o None.
+        """
+        numero = self._numero(id_pedido)
+        if numero is None:
+            posicion = self._otras_posiciones.get(id_pedido)
+        else:
+            posicion = self._posicion(numero)
+        if posicion is None:
+            return None
+        segmento = posicion >> self._BITS_DESPLAZAMIENTO
+        if segmento == self._segmento:
+            self._log.flush()
+        with open(self._ruta(segmento, "log"), "rb") as archivo_log:
+            archivo_log.seek(posicion & ((1 << self._BITS_DESPLAZAMIENTO) - 1))
+            linea = archivo_log.readline()
+        return json.loads(linea) if linea.endswith(b"\n") else None
+
+    def recorrer(self):
+        """
+        Lee por streaming todos los registros, segmento a segmento.
+
+        Yields:
+            list: Cada registro, en orden de archivo.
+        """
+        self._log.flush()
+        for segmento in range(1, self._segmento + 1):
+            with contextlib.suppress(FileNotFoundError):
+                with open(self._ruta(segmento, "log"), "rb") as archivo_log:
+                    for linea in archivo_log:
+                        if linea.endswith(b"\n"):  # Una última línea sin salto quedó a medio escribir
+                            yield json.loads(linea)
+
+    def __contains__(self, id_pedido):
+        numero = self._numero(id_pedido)
+        if numero is None:
+            return id_pedido in self._otras_posiciones
+        return self._posicion(numero) is not None
+
+    def __len__(self):
+        return self.total
+
+    def cerrar(self):
+        """
+        Vuelca y cierra los ficheros del segmento actual.
+        """
+        self._log.close()
+        self._indice.close()
+
+
+class AsignadorIdsPedidos:
+    """
+    Reparte números de pedido únicos entre varios procesos. Cada proceso reserva
+    bloques de números consecutivos de una secuencia compartida (un fichero con
+    bloqueo o un multiprocessing.Value) y los entrega localmente sin coordinarse,
+    así que solo hay contención una vez por bloque. Los números no son
+    consecutivos entre procesos y los sobrantes de un bloque se pierden al salir.
+    """
+    def __init__(self, ruta=None, bloque=1_000, compartido=None):
+        """
+        Inicializa el asignador.
+
+        Args:
+            ruta (str): Fichero de la secuencia (guarda el próximo número libre). Permite
+                coordinar procesos independientes y conserva la numeración entre ejecuciones.
+            bloque (int): Cantidad de números reservados de una vez.
+            compartido (multiprocessing.Value): Secuencia en memoria compartida ("q") heredada
+                por procesos hijos. Si no se indica ni ruta ni compartido se crea una.
+        """
+        self.ruta = ruta
+        self.bloque = bloque
+        self.compartido = compartido if ruta is not None or compartido is not None else multiprocessing.Value("q", 1)
+        self._siguiente = 0
+        self._limite = 0  # Bloque local: [_siguiente, _limite)
+        self._descriptor = None
+        self._pid = os.getpid()
+
+    def __getstate__(self):
+        # Al pasar a otro proceso no se copian el bloque local ni el descriptor abierto
+        estado = self.__dict__.copy()
+        estado.update(_siguiente=0, _limite=0, _descriptor=None, _pid=None)
+        return estado
+
+    def siguiente(self):
+        """
+        Retorna el próximo número de pedido de este proceso.
+
+        Returns:
+            int: Un número que ningún otro proceso recibirá.
+        """
+        if self._siguiente == self._limite or self._pid != os.getpid():
+            self._reservar_bloque()
+        numero = self._siguiente
+        self._siguiente += 1
+        return numero
+
+    def _reservar_bloque(self):
+        """
+        Toma el siguiente bloque de la secuencia compartida. Tras un fork se descarta
+        el bloque heredado del padre, que también lo está usando.
+        """
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._descriptor = None
+        if self.ruta is None:
+            with self.compartido.get_lock():
+                inicio = self.compartido.value
+                self.compartido.value = inicio + self.bloque
+        else:
+            if self._descriptor is None:
+                # Un descriptor por proceso: flock se asocia al fichero abierto, no al proceso
+                self._descriptor = os.open(self.ruta, os.O_RDWR | os.O_CREAT, 0o644)
+            inicio = self._avanzar_fichero()
+        self._siguiente, self._limite = inicio, inicio + self.bloque
+
+    def _avanzar_fichero(self):
+        """Lee y avanza el próximo número libre del fichero con un bloqueo exclusivo."""
+        descriptor = self._descriptor
+        if fcntl is not None:
+            fcntl.flock(descriptor, fcntl.LOCK_EX)
+        else:
+            os.lseek(descriptor, 0, os.SEEK_SET)
+            msvcrt.locking(descriptor, msvcrt.LK_LOCK, 1)
+        try:
+            os.lseek(descriptor, 0, os.SEEK_SET)
+            contenido = os.read(descriptor, 32).strip()
+            inicio = int(contenido) if contenido else 1
+            os.lseek(descriptor, 0, os.SEEK_SET)
+            os.ftruncate(descriptor, 0)
+            os.write(descriptor, b"%d\n" % (inicio + self.bloque))
+        finally:
+            if fcntl is not None:
+                fcntl.flock(descriptor, fcntl.LOCK_UN)
+            else:
+                os.lseek(descriptor, 0, os.SEEK_SET)
+                msvcrt.locking(descriptor, msvcrt.LK_UNLCK, 1)
+        return inicio
+
+    def cerrar(self):
+        """
+        Cierra el fichero de la secuencia (si se usa uno).
+        """
+        if self._descriptor is not None:
+            os.close(self._descriptor)
+            self._descriptor = None
+
+
+# --- Benchmarks ---
+
+class _SalidaNula:
+    """Destino de print que descarta el texto (para medir sin el coste de la consola)."""
+
+    def write(self, texto):
+        return len(texto)
+
+    def flush(self):
+        pass
+
+
+def medir_pedidos_activos(pedidos=50_000, activos=200, consultas=200):
+    """
+    Compara filtrar todo el historial de pedidos por estado (como hacía
+    mostrar_pedidos_activos) frente a los índices por estado, y mide la cola de cocina.
+
+    Args:
+        pedidos (int): Pedidos creados durante la jornada.
+        activos (int): Cuántos de ellos siguen activos.
+        consultas (int): Repeticiones de cada consulta.
+    """
+    with contextlib.redirect_stdout(_SalidaNula()):
+        restaurante = Restaurante("Benchmark")
+        restaurante.registrar_cliente(Cliente("Cliente", "555-0000"))
+        creados = [restaurante.crear_pedido("555-0000", prioridad=i % 3) for i in range(pedidos)]
+        for pedido in creados[:pedidos - activos]:
+            pedido.actualizar_estado("Entregado")
+
+        inicio = time.perf_counter()
+        for _ in range(consultas):
+            [p for p in restaurante.pedidos.values() if p.estado not in ["Entregado", "Cancelado"]]
+        recorrido = (time.perf_counter() - inicio) / consultas
+
+        inicio = time.perf_counter()
+        for _ in range(consultas):
+            list(restaurante._activos.values())
+        indice = (time.perf_counter() - inicio) / consultas
+
+        inicio = time.perf_counter()
+        while restaurante.tomar_siguiente_pedido() is not None:
+            pass
+        cocina = (time.perf_counter() - inicio) / activos
+
+    print(f"\nPedidos activos ({pedidos:,} pedidos en el día, {activos} activos):")
+    print(f"  - Recorriendo todos los pedidos: {recorrido * 1000:.2f} ms")
+    print(f"  - Con el índice de activos:      {indice * 1000:.3f} ms")
+    print(f"  - Cola de cocina: {cocina * 1e6:.1f} µs por pedido tomado")
+
+
+def medir_totales(lineas=500, repeticiones=20):
+    """
+    Compara recalcular el total con floats tras cada item (comportamiento anterior)
+    frente al total incremental en centavos, para un pedido grande de catering.
+
+    Args:
+        lineas (int): Platos distintos en el pedido.
+        repeticiones (int): Veces que se arma el pedido completo.
+    """
+    platos = [Plato(f"Plato {i}", 1.10 + i * 0.01, "Catering") for i in range(lineas)]
+    with contextlib.redirect_stdout(_SalidaNula()):
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            items = {}
+            for plato in platos:
+                items[plato] = items.get(plato, 0) + 3
+                total_float = sum(p.precio * c for p, c in items.items())
+        recalculo = (time.perf_counter() - inicio) / repeticiones
+
+        cliente = Cliente("Catering", "555-9999")
+        abiertos = []  # Se conservan para que el cambio de precio los alcance a todos
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            pedido = Pedido("PED-CAT", cliente)
+            for plato in platos:
+                pedido.agregar_item(plato, 3)
+            abiertos.append(pedido)
+        incremental = (time.perf_counter() - inicio) / repeticiones
+        exacto = pedido.total_en_centavos
+
+        inicio = time.perf_counter()
+        for plato in platos:
+            plato.precio += 0.25
+        cambio_precio = (time.perf_counter() - inicio) / lineas
+
+    print(f"\nTotales de un pedido de {lineas} líneas:")
+    print(f"  - Recalculando con floats: {recalculo * 1000:.2f} ms (total {total_float!r})")
+    print(f"  - Incremental en centavos: {incremental * 1000:.2f} ms (total exacto {exacto / 100:.2f})")
+    print(f"  - Cambio de precio propagado a {repeticiones} pedidos abiertos: {cambio_precio * 1e6:.1f} µs por plato")
+
+
+def medir_recepcion_async(clientes=500, pedidos_por_cliente=20, cocineros=8, tiempo_preparacion=0.001):
+    """
+    Generador de carga para RecepcionPedidos: muchos clientes concurrentes envían
+    pedidos a la vez. Reporta pedidos por segundo y latencias p50/p99.
+
+    Args:
+        clientes (int): Clientes concurrentes.
+        pedidos_por_cliente (int): Pedidos que envía cada cliente, uno tras otro.
+        cocineros (int): Tareas de cocina.
+        tiempo_preparacion (float): Segundos simulados de preparación por pedido.
+    """
+    restaurante = Restaurante("Hora punta")
+    with contextlib.redirect_stdout(_SalidaNula()):
+        for i in range(20):
+            restaurante.agregar_plato_menu(Plato(f"Plato {i}", 5 + i * 0.5, "Menú del día"))
+        for i in range(clientes):
+            restaurante.registrar_cliente(Cliente(f"Cliente {i}", f"555-{i:05d}"))
+    nombres = list(restaurante.menu)
+    latencias = []
+
+    async def cliente(indice, recepcion):
+        aleatorio = random.Random(indice)
+        for _ in range(pedidos_por_cliente):
+            items = [(aleatorio.choice(nombres), aleatorio.randint(1, 3)) for _ in range(aleatorio.randint(1, 5))]
+            inicio = time.perf_counter()
+            await recepcion.enviar_pedido(f"555-{indice:05d}", items, prioridad=aleatorio.randint(0, 2))
+            latencias.append(time.perf_counter() - inicio)
+
+    async def principal():
+        recepcion = RecepcionPedidos(restaurante, cocineros=cocineros, tiempo_preparacion=tiempo_preparacion)
+        await recepcion.iniciar()
+        inicio = time.perf_counter()
+        await asyncio.gather(*(cliente(i, recepcion) for i in range(clientes)))
+        duracion = time.perf_counter() - inicio
+        await recepcion.detener()
+        return duracion
+
+    duracion = asyncio.run(principal())
+    latencias.sort()
+    total = len(latencias)
+    print(f"\nRecepción asíncrona ({clientes} clientes, {total:,} pedidos, {cocineros} cocineros):")
+    print(f"  - Rendimiento: {total / duracion:,.0f} pedidos/s")
+    print(f"  - Latencia p50: {latencias[total // 2] * 1000:.1f} ms, p99: {latencias[int(total * 0.99)] * 1000:.1f} ms")
+
+
+def medir_analitica(pedidos=100_000, platos=40, clientes=5_000):
+    """
+    Compara calcular el plato más vendido y el gasto por cliente recorriendo
+    Restaurante.pedidos y sus items frente a AnaliticaVentas.
+
+    Args:
+        pedidos (int): Pedidos entregados en el historial.
+        platos (int): Platos del menú.
+        clientes (int): Clientes registrados.
+    """
+    aleatorio = random.Random(5)
+    restaurante = Restaurante("Analítica")
+    with contextlib.redirect_stdout(_SalidaNula()):
+        menu = [Plato(f"Plato {i}", 3 + i * 0.25, "") for i in range(platos)]
+        for plato in menu:
+            restaurante.agregar_plato_menu(plato)
+        lista_clientes = [Cliente(f"Cliente {i}", f"555-{i:05d}") for i in range(clientes)]
+        for cliente in lista_clientes:
+            restaurante.registrar_cliente(cliente)
+    analitica = restaurante.activar_analitica()
+    inicio = time.perf_counter()
+    for _ in range(pedidos):
+        pedido = restaurante._nuevo_pedido(aleatorio.choice(lista_clientes))
+        for _ in range(aleatorio.randint(1, 4)):
+            pedido._sumar_item(aleatorio.choice(menu), aleatorio.randint(1, 3))
+        pedido._cambiar_estado("Entregado")
+    ingesta = (time.perf_counter() - inicio) / pedidos
+
+    inicio = time.perf_counter()
+    unidades, gasto = {}, {}
+    for pedido in restaurante.pedidos.values():
+        if pedido.estado == "Entregado":
+            gasto[pedido.cliente.telefono] = gasto.get(pedido.cliente.telefono, 0) + pedido.total
+            for plato, cantidad in pedido.items.items():
+                unidades[plato.nombre] = unidades.get(plato.nombre, 0) + cantidad
+    max(unidades.items(), key=lambda par: par[1])
+    heapq.nlargest(10, gasto.items(), key=lambda par: par[1])
+    recorrido = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    analitica.platos_mas_vendidos(1)
+    analitica.gasto_por_cliente(10)
+    columnar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    analitica.resumen_diario()
+    analitica.ticket_promedio()
+    resumen = time.perf_counter() - inicio
+
+    motor = "NumPy" if np is not None else "Python puro"
+    print(f"\nAnalítica de ventas ({pedidos:,} pedidos, {len(analitica.plato):,} líneas, {motor}):")
+    print(f"  - Ingesta: {ingesta * 1e6:.1f} µs por pedido (incluye crear y entregar)")
+    print(f"  - Top platos + gasto por cliente recorriendo pedidos: {recorrido * 1000:.1f} ms")
+    print(f"  - Top platos + gasto por cliente en columnas:         {columnar * 1000:.1f} ms")
+    print(f"  - Resumen diario y ticket promedio: {resumen * 1e6:.0f} µs")
+
+
+def medir_archivo(pedidos=200_000, platos=40, clientes=5_000, consultas=2_000):
+    """
+    Compara la memoria de un historial de pedidos entregados guardado en
+    Restaurante.pedidos frente a moverlo a ArchivoPedidos, y mide las búsquedas
+    por id y el recorrido del historial desde disco.
+
+    Args:
+        pedidos (int): Pedidos entregados en el historial.
+        platos (int): Platos del menú.
+        clientes (int): Clientes registrados.
+        consultas (int): Búsquedas aleatorias por id_pedido.
+    """
+    def llenar(restaurante):
+        aleatorio = random.Random(11)
+        with contextlib.redirect_stdout(_SalidaNula()):
+            menu = [Plato(f"Plato {i}", 3 + i * 0.25, "") for i in range(platos)]
+            for plato in menu:
+                restaurante.agregar_plato_menu(plato)
+            lista_clientes = [Cliente(f"Cliente {i}", f"555-{i:05d}") for i in range(clientes)]
+            for cliente in lista_clientes:
+                restaurante.registrar_cliente(cliente)
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        inicio = time.perf_counter()
+        for _ in range(pedidos):
+            pedido = restaurante._nuevo_pedido(aleatorio.choice(lista_clientes))
+            for _ in range(aleatorio.randint(1, 4)):
+                pedido._sumar_item(aleatorio.choice(menu), aleatorio.randint(1, 3))
+            pedido._cambiar_estado("Entregado")
+        duracion = time.perf_counter() - inicio
+        memoria = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+        return duracion, memoria
+
+    en_memoria = Restaurante("En memoria")
+    duracion_memoria, memoria_memoria = llenar(en_memoria)
+    del en_memoria
+
+    with tempfile.TemporaryDirectory() as directorio:
+        archivado = Restaurante("Archivado")
+        archivado.activar_archivo(directorio)
+        duracion_archivo, memoria_archivo = llenar(archivado)
+
+        aleatorio = random.Random(12)
+        ids = [f"PED-{aleatorio.randint(1, pedidos):04d}" for _ in range(consultas)]
+        inicio = time.perf_counter()
+        for id_pedido in ids:
+            archivado.buscar_pedido(id_pedido)
+        busqueda = (time.perf_counter() - inicio) / consultas
+
+        inicio = time.perf_counter()
+        recorridos = sum(1 for _ in archivado.historial_pedidos())
+        recorrido = time.perf_counter() - inicio
+        tamano = sum(os.path.getsize(os.path.join(directorio, nombre)) for nombre in os.listdir(directorio))
+        archivado.archivo.cerrar()
+
+    print(f"\nArchivo de pedidos finalizados ({pedidos:,} pedidos entregados):")
+    print(f"  - Memoria con todo en Restaurante.pedidos: {memoria_memoria / pedidos:,.0f} B/pedido "
+          f"({duracion_memoria / pedidos * 1e6:.1f} µs por pedido)")
+    print(f"  - Memoria con ArchivoPedidos:              {memoria_archivo / pedidos:,.0f} B/pedido "
+          f"({duracion_archivo / pedidos * 1e6:.1f} µs por pedido, {tamano / pedidos:.0f} B/pedido en disco)")
+    print(f"  - Búsqueda por id en el archivo: {busqueda * 1e6:.1f} µs")
+    print(f"  - Recorrido del historial: {recorridos / recorrido:,.0f} pedidos/s")
+
+
+def medir_menu(platos=5_000, consultas=2_000):
+    """
+    Compara buscar platos por texto y filtrar por precio recorriendo el menú
+    frente a IndiceMenu, con y sin caché (consultas repetidas del buscador).
+
+    Args:
+        platos (int): Platos del menú.
+        consultas (int): Consultas de cada tipo.
+    """
+    aleatorio = random.Random(21)
+    palabras = ["pollo", "carne", "queso", "tomate", "albahaca", "cerdo", "atún", "limón", "salsa",
+                "picante", "crema", "champiñones", "ajo", "arroz", "maíz", "frijoles", "aguacate"]
+    restaurante = Restaurante("Menú grande")
+    with contextlib.redirect_stdout(_SalidaNula()):
+        for i in range(platos):
+            nombre = f"{aleatorio.choice(palabras).title()} {aleatorio.choice(palabras)} {i}"
+            descripcion = " ".join(aleatorio.sample(palabras, 6))
+            restaurante.agregar_plato_menu(Plato(nombre, aleatorio.randint(200, 3000) / 100, descripcion))
+    textos = [aleatorio.choice(palabras)[:aleatorio.randint(1, 6)] for _ in range(consultas)]
+    rangos = [(None, aleatorio.randint(3, 30)) for _ in range(consultas)]
+
+    def recorrer():
+        for texto in textos:
+            buscado = texto.lower()
+            [p for p in restaurante.menu.values() if buscado in p.nombre.lower() or buscado in p.descripcion.lower()]
+        for _, maximo in rangos:
+            [p for p in restaurante.menu.values() if p.precio <= maximo]
+
+    def con_indice():
+        for texto in textos:
+            restaurante.buscar_platos(texto)
+        for minimo, maximo in rangos:
+            restaurante.platos_por_precio(minimo, maximo)
+
+    inicio = time.perf_counter()
+    recorrer()
+    recorrido = (time.perf_counter() - inicio) / (2 * consultas)
+    resultados = []
+    for capacidad in (0, 1_024):  # Sin caché y con la caché ya llena (consultas repetidas)
+        restaurante.indice_menu.capacidad_cache = capacidad
+        con_indice()
+        inicio = time.perf_counter()
+        con_indice()
+        resultados.append((time.perf_counter() - inicio) / (2 * consultas))
+
+    print(f"\nBúsqueda en el menú ({platos:,} platos, {consultas:,} búsquedas y {consultas:,} filtros por precio):")
+    print(f"  - Recorriendo el menú: {recorrido * 1e6:,.0f} µs por consulta")
+    print(f"  - IndiceMenu sin caché: {resultados[0] * 1e6:,.0f} µs por consulta")
+    print(f"  - IndiceMenu con caché: {resultados[1] * 1e6:,.2f} µs por consulta")
+
+
+def _trabajador_ids(asignador, cantidad, resultados):
+    """Genera números de pedido en un proceso hijo y envía los obtenidos (para comprobar duplicados)."""
+    numeros = array("Q", bytes(8 * cantidad))
+    siguiente = asignador.siguiente
+    for i in range(cantidad):
+        numeros[i] = siguiente()
+    asignador.cerrar()
+    resultados.put(numeros.tobytes())
+
+
+def _trabajador_archivo(asignador, directorio, pedidos, resultados):
+    """
+    Archiva en un proceso hijo pedidos numerados por el asignador compartido y envía
+    (archivados, último número, bytes del índice en memoria, si se encuentran todos).
+    """
+    restaurante = Restaurante("Sucursal", asignador_ids=asignador)
+    archivo = restaurante.activar_archivo(directorio)
+    cliente = Cliente("Cliente", "555-00000")
+    with contextlib.redirect_stdout(_SalidaNula()):
+        restaurante.registrar_cliente(cliente)
+    ids = []
+    for _ in range(pedidos):
+        pedido = restaurante._nuevo_pedido(cliente)
+        ids.append(pedido.id_pedido)
+        pedido._cambiar_estado("Entregado")
+    encontrados = all(id_pedido in archivo for id_pedido in ids)
+    indice = sum(len(pagina) * pagina.itemsize for pagina in archivo._paginas.values())
+    archivo.cerrar()
+    asignador.cerrar()
+    resultados.put((len(archivo), archivo.ultimo_numero, indice, encontrados))
+
+
+def medir_asignador_ids(procesos=(1, 2, 4, 8), ids_por_proceso=200_000, bloque=1_000, sucursales=4,
+                        pedidos_por_sucursal=20_000):
+    """
+    Compara repartir números de pedido entre procesos con un bloqueo global por
+    número (bloque=1) frente a reservar bloques, con secuencia en memoria
+    compartida y en fichero, y verifica que no haya duplicados. Después comprueba
+    que varias sucursales (procesos) que archivan pedidos con números repartidos
+    por bloques no reservan memoria de índice para los números de las demás.
+
+    Args:
+        procesos (tuple): Cantidades de procesos a probar.
+        ids_por_proceso (int): Números que genera cada proceso.
+        bloque (int): Tamaño de bloque del asignador.
+        sucursales (int): Procesos que archivan pedidos a la vez.
+        pedidos_por_sucursal (int): Pedidos que archiva cada sucursal.
+    """
+    print(f"\nAsignación de IDs entre procesos ({ids_por_proceso:,} por proceso, millones de IDs/s):")
+    print(f"  {'procesos':>9} {'bloqueo global':>15} {'bloques (Value)':>16} {'bloques (fichero)':>18}")
+    with tempfile.TemporaryDirectory() as directorio:
+        for cantidad in procesos:
+            fila = []
+            for tamano, en_fichero in ((1, False), (bloque, False), (bloque, True)):
+                ruta = os.path.join(directorio, f"secuencia-{cantidad}-{tamano}") if en_fichero else None
+                asignador = AsignadorIdsPedidos(ruta, tamano)
+                resultados = multiprocessing.Queue()
+                hijos = [multiprocessing.Process(target=_trabajador_ids, args=(asignador, ids_por_proceso, resultados))
+                         for _ in range(cantidad)]
+                inicio = time.perf_counter()
+                for hijo in hijos:
+                    hijo.start()
+                numeros = array("Q")
+                for _ in hijos:
+                    numeros.frombytes(resultados.get())
+                duracion = time.perf_counter() - inicio
+                for hijo in hijos:
+                    hijo.join()
+                if len(set(numeros)) != len(numeros):
+                    print("  Error: se repitieron números de pedido.")
+                fila.append(len(numeros) / duracion / 1e6)
+            print(f"  {cantidad:>9} {fila[0]:>15.2f} {fila[1]:>16.2f} {fila[2]:>18.2f}")
+
+        asignador = AsignadorIdsPedidos(bloque=bloque)
+        resultados = multiprocessing.Queue()
+        hijos = [multiprocessing.Process(target=_trabajador_archivo,
+                                         args=(asignador, os.path.join(directorio, f"sucursal-{i}"),
+                                               pedidos_por_sucursal, resultados))
+                 for i in range(sucursales)]
+        for hijo in hijos:
+            hijo.start()
+        sucursal = [resultados.get() for _ in hijos]
+        for hijo in hijos:
+            hijo.join()
+        print(f"  Archivo de {sucursales} sucursales con números por bloques ({pedidos_por_sucursal:,} pedidos cada una):")
+        for archivados, ultimo, indice, encontrados in sucursal:
+            print(f"    - {archivados:,} pedidos, números hasta {ultimo:,}: índice en memoria "
+                  f"{indice / archivados:.1f} B/pedido (denso hasta el último: {8 * ultimo / archivados:.1f})")
+            if not encontrados or archivados != pedidos_por_sucursal:
+                print("    Error: faltan pedidos en el archivo de la sucursal.")
+            if indice > 16 * archivados:
+                print("    Error: el índice reserva memoria para los números de otras sucursales.")
+
+
+class _MuestraLatencias:
+    """
+    Muestra aleatoria de tamaño fijo (muestreo de reservorio) de latencias en
+    nanosegundos, para estimar percentiles sin guardar millones de valores.
+    """
+    def __init__(self, aleatorio, capacidad=10_000):
+        self._aleatorio = aleatorio
+        self.capacidad = capacidad
+        self.valores = []
+        self.total = 0
+        self.suma = 0
+
+    def agregar(self, nanosegundos):
+        self.total += 1
+        self.suma += nanosegundos
+        if len(self.valores) < self.capacidad:
+            self.valores.append(nanosegundos)
+        else:
+            posicion = self._aleatorio.randrange(self.total)
+            if posicion < self.capacidad:
+                self.valores[posicion] = nanosegundos
+
+    def percentil(self, p):
+        if not self.valores:
+            return 0
+        ordenados = sorted(self.valores)
+        return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+class SimuladorRestaurante:
+    """
+    Simulación determinista de una jornada del restaurante con los métodos públicos
+    (crear_pedido, agregar_item, actualizar_estado a través de la cola de cocina).
+    Genera clientes y pedidos con popularidad de platos tipo Zipf, mantiene un
+    número fijo de pedidos en cocina y mide rendimiento, memoria y latencia por
+    operación con la salida por consola suprimida.
+    """
+    def __init__(self, clientes=1_000, platos=60, semilla=42, en_cocina=50, prob_cancelacion=0.03,
+                 medir_memoria=False, directorio_archivo=None):
+        """
+        Inicializa el simulador.
+
+        Args:
+            clientes (int): Clientes registrados.
+            platos (int): Platos del menú.
+            semilla (int): Semilla del generador aleatorio (misma semilla, misma jornada).
+            en_cocina (int): Pedidos que se acumulan antes de que la cocina los procese.
+            prob_cancelacion (float): Probabilidad de que un pedido se cancele.
+            medir_memoria (bool): Usar tracemalloc (más preciso pero ralentiza la simulación).
+            directorio_archivo (str): Si se indica, los pedidos finalizados se archivan ahí.
+        """
+        self.clientes = clientes
+        self.platos = platos
+        self.semilla = semilla
+        self.en_cocina = en_cocina
+        self.prob_cancelacion = prob_cancelacion
+        self.medir_memoria = medir_memoria
+        self.directorio_archivo = directorio_archivo
+
+    def ejecutar(self, pedidos):
+        """
+        Ejecuta la jornada completa con la cantidad de pedidos indicada.
+
+        Args:
+            pedidos (int): Pedidos a simular.
+
+        Returns:
+            dict: Resultados (pedidos/s, memoria, latencias por operación).
+        """
+        aleatorio = random.Random(self.semilla)
+        latencias = {nombre: _MuestraLatencias(random.Random(self.semilla + i))
+                     for i, nombre in enumerate(("crear_pedido", "agregar_item", "actualizar_estado"))}
+        reloj = time.perf_counter_ns
+        if self.medir_memoria:
+            tracemalloc.start()
+            tracemalloc.reset_peak()  # Por si ya se estaba midiendo: el pico es solo de esta jornada
+        pico_previo = self._pico_proceso()
+
+        with contextlib.redirect_stdout(_SalidaNula()):
+            restaurante = Restaurante("Simulación")
+            if self.directorio_archivo is not None:
+                restaurante.activar_archivo(self.directorio_archivo)
+            menu = [Plato(f"Plato {i}", round(4 + aleatorio.random() * 16, 2), f"Descripción {i}")
+                    for i in range(self.platos)]
+            for plato in menu:
+                restaurante.agregar_plato_menu(plato)
+            telefonos = [f"555-{i:07d}" for i in range(self.clientes)]
+            for i, telefono in enumerate(telefonos):
+                restaurante.registrar_cliente(Cliente(f"Cliente {i}", telefono))
+
+            # Popularidad tipo Zipf y distribuciones de líneas y cantidades por pedido
+            pesos_platos = list(itertools.accumulate(1 / (i + 1) ** 1.1 for i in range(self.platos)))
+            lineas_posibles, pesos_lineas = [1, 2, 3, 4, 5, 6], list(itertools.accumulate([30, 30, 20, 10, 6, 4]))
+            cantidades, pesos_cantidades = [1, 2, 3], list(itertools.accumulate([70, 22, 8]))
+            elegir = aleatorio.choices
+
+            inicio = time.perf_counter()
+            for numero in range(pedidos):
+                telefono = telefonos[(int(aleatorio.paretovariate(1.5)) - 1) % self.clientes]
+                t = reloj()
+                pedido = restaurante.crear_pedido(telefono, prioridad=1 if aleatorio.random() < 0.1 else 0)
+                latencias["crear_pedido"].agregar(reloj() - t)
+                for _ in range(elegir(lineas_posibles, cum_weights=pesos_lineas)[0]):
+                    plato = elegir(menu, cum_weights=pesos_platos)[0]
+                    cantidad = elegir(cantidades, cum_weights=pesos_cantidades)[0]
+                    t = reloj()
+                    pedido.agregar_item(plato, cantidad)
+                    latencias["agregar_item"].agregar(reloj() - t)
+                if (numero + 1) % self.en_cocina == 0 or numero == pedidos - 1:
+                    self._procesar_cocina(restaurante, aleatorio, latencias["actualizar_estado"])
+            duracion = time.perf_counter() - inicio
+            if restaurante.archivo is not None:
+                restaurante.archivo.cerrar()
+
+        resultado = {
+            "pedidos": pedidos,
+            "segundos": duracion,
+            "pedidos_por_segundo": pedidos / duracion,
+            "latencias": {nombre: (muestra.suma / muestra.total, muestra.percentil(0.5), muestra.percentil(0.99))
+                          for nombre, muestra in latencias.items() if muestra.total},
+        }
+        if self.medir_memoria:
+            actual, pico = tracemalloc.get_traced_memory()
+            resultado["bytes_por_pedido"] = actual / pedidos
+            resultado["memoria_maxima"] = pico
+            tracemalloc.stop()
+        if pico_previo is not None:
+            # El pico del proceso solo crece: se informa cuánto lo elevó esta jornada
+            resultado["crecimiento_memoria"] = self._pico_proceso() - pico_previo
+        return resultado
+
+    @staticmethod
+    def _pico_proceso():
+        """Memoria máxima del proceso hasta ahora en bytes, o None si no se puede consultar."""
+        if resource is None:
+            return None
+        # ru_maxrss está en KiB en Linux y en bytes en macOS
+        escala = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * escala
+
+    def _procesar_cocina(self, restaurante, aleatorio, muestra):
+        """Lleva todos los pedidos pendientes por Preparando, Listo y Entregado (o Cancelado)."""
+        reloj = time.perf_counter_ns
+        while True:
+            t = reloj()
+            pedido = restaurante.tomar_siguiente_pedido()
+            if pedido is None:
+                break
+            muestra.agregar(reloj() - t)
+            for estado in (("Cancelado",) if aleatorio.random() < self.prob_cancelacion else ("Listo", "Entregado")):
+                t = reloj()
+                pedido.actualizar_estado(estado)
+                muestra.agregar(reloj() - t)
+
+
+def ejecutar_simulaciones(escalas=(1_000, 10_000, 100_000), **opciones):
+    """
+    Ejecuta el simulador para varias escalas e imprime una tabla de resultados,
+    para detectar a partir de qué volumen empeora el rendimiento. La memoria es
+    la de cada escala: bytes por pedido (con medir_memoria=True) o, si no, cuánto
+    creció el pico del proceso durante esa escala; por eso conviene pasar las
+    escalas de menor a mayor.
+
+    Args:
+        escalas (tuple): Cantidades de pedidos a simular (de 1k a 10M).
+        **opciones: Parámetros de SimuladorRestaurante.
+    """
+    print("\nSimulación de jornadas del restaurante:")
+    print(f"  {'pedidos':>10} {'pedidos/s':>10} {'memoria':>10}   latencia media / p50 / p99 (µs)")
+    for pedidos in escalas:
+        resultado = SimuladorRestaurante(**opciones).ejecutar(pedidos)
+        if "bytes_por_pedido" in resultado:
+            memoria = f"{resultado['bytes_por_pedido']:.0f} B/ped"
+        elif "crecimiento_memoria" in resultado:
+            memoria = f"+{resultado['crecimiento_memoria'] / 2 ** 20:.0f} MiB"
+        else:
+            memoria = "-"
+        print(f"  {pedidos:>10,} {resultado['pedidos_por_segundo']:>10,.0f} {memoria:>10}")
+        for nombre, (media, p50, p99) in resultado["latencias"].items():
+            print(f"  {'':>32} {nombre:<18} {media / 1000:6.2f} / {p50 / 1000:6.2f} / {p99 / 1000:6.2f}")
+
+
+def ejecutar_benchmarks():
+    """
+    Ejecuta los benchmarks del sistema de pedidos.
+    """
+    medir_pedidos_activos()
+    medir_totales()
+    medir_recepcion_async()
+    medir_analitica()
+    medir_archivo()
+    medir_asignador_ids()
+    medir_menu()
+    ejecutar_simulaciones()
+
 # --- Ejemplo de Uso del Sistema de Pedidos de Restaurante ---
-if __name__ == "__main__":
+if __name__ == "__main__" and "--benchmark" in sys.argv:
+    ejecutar_benchmarks()
+elif __name__ == "__main__" and "--simulacion" in sys.argv:
+    # Ejemplo: python EjemplosMundoReal_POO.py --simulacion 1000 100000 10000000
+    ejecutar_simulaciones(tuple(int(n) for n in sys.argv[sys.argv.index("--simulacion") + 1:]) or (1_000, 10_000, 100_000))
+elif __name__ == "__main__":
     mi_restaurante = Restaurante("La Cuchara de Oro")
 
     # Crear objetos Plato y agregarlos al menú